@@ -0,0 +1,30 @@
+"""
+Add memo_queue.next_attempt_at for retry scheduling.
+
+The worker only claims pending items whose next_attempt_at has passed and
+pushes it back with exponential backoff after each failure; items that
+fail MEMO_SYNC_MAX_TRIES times move to status 'dead'. Existing rows get
+now(), so everything already pending stays due immediately.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '20261018_add_memo_queue_retry'
+down_revision = '20261018_add_memo_sync_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('memo_queue', sa.Column(
+        'next_attempt_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False,
+    ))
+    op.create_index(
+        'ix_memo_queue_pending_due', 'memo_queue', ['next_attempt_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_memo_queue_pending_due', table_name='memo_queue')
+    op.drop_column('memo_queue', 'next_attempt_at')
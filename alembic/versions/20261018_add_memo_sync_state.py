@@ -0,0 +1,36 @@
+"""
+Add memo_sync_state (single-row runtime state of memo_sync_worker).
+
+Replaces memo_sync_state.json: the worker upserts this row and every API
+process reads the same values for /api/memo-sync-status.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '20261018_add_memo_sync_state'
+down_revision = '20261018_coalesce_memo_queue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'memo_sync_state',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('running', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('listening', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('processed', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('failed', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('last_run_started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_run_finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_batch_size', sa.Integer(), nullable=True),
+        sa.Column('last_batch_seconds', sa.Float(), nullable=True),
+        sa.Column('effective_batch_size', sa.Integer(), nullable=True),
+        sa.Column('effective_wait_ms', sa.Integer(), nullable=True),
+        sa.Column('last_wakeup_notifies', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('memo_sync_state')
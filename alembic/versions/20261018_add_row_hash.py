@@ -0,0 +1,27 @@
+"""
+Add daily_sheet_rows.row_hash (per-row content hash).
+
+daily_sheets.sheet_hash is now the sum (mod 2^256) of the row hashes so that a
+single-row PATCH can update it in O(1). Existing rows start with NULL; the API
+falls back to a full recompute for a date the first time it meets a NULL
+row_hash, and the next upload of that date fills every row in.
+
+This is the first revision of the chain. The tables it alters were created
+outside Alembic, so an existing database with no alembic_version row upgrades
+straight from here. The text[] draft (alembic/drafts/) is not part of the chain.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '20261018_add_row_hash'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('daily_sheet_rows', sa.Column('row_hash', sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('daily_sheet_rows', 'row_hash')
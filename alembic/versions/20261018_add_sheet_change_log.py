@@ -0,0 +1,36 @@
+"""
+Add daily_sheet_changes (per-date row change log) and
+daily_sheets.changes_since_version.
+
+The log backs /api/daily-sheet/changes. changes_since_version is the oldest
+version a delta can be served from; it starts NULL (no log yet) and is moved
+forward when old entries are compacted or a restore rewrites the whole sheet.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '20261018_add_sheet_change_log'
+down_revision = '20261018_add_row_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('daily_sheets', sa.Column('changes_since_version', sa.Integer(), nullable=True))
+    op.create_table(
+        'daily_sheet_changes',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('sheet_date', sa.Date(), sa.ForeignKey('daily_sheets.date', ondelete='CASCADE'), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('site', sa.Text(), nullable=False),
+        sa.Column('reservation_date', sa.Text(), nullable=True),
+        sa.Column('op', sa.Text(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_daily_sheet_changes_date_version', 'daily_sheet_changes', ['sheet_date', 'version'])
+
+
+def downgrade():
+    op.drop_index('ix_daily_sheet_changes_date_version', table_name='daily_sheet_changes')
+    op.drop_table('daily_sheet_changes')
+    op.drop_column('daily_sheets', 'changes_since_version')
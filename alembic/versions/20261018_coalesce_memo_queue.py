@@ -0,0 +1,67 @@
+"""
+Coalesce pending memo_queue items per booking.
+
+Adds a partial unique index on (site, reservation_date, phone) for pending
+items so the API can merge a new memo edit into the existing pending item
+with INSERT ... ON CONFLICT. Existing duplicates are collapsed first, into
+the newest item of each group: the memo of the last 'replace' followed by
+the later 'append' memos in order. The collapsed items are kept as
+status 'coalesced'.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '20261018_coalesce_memo_queue'
+down_revision = '20261018_add_sheet_change_log'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE TEMP TABLE memo_queue_merge AS
+        WITH numbered AS (
+            SELECT id, site, reservation_date, phone, memo, mode,
+                   row_number() OVER w AS rn,
+                   count(*) OVER (PARTITION BY site, reservation_date, phone) AS n
+            FROM memo_queue
+            WHERE status = 'pending'
+            WINDOW w AS (PARTITION BY site, reservation_date, phone ORDER BY added_at, id)
+        ), marked AS (
+            SELECT *,
+                   max(CASE WHEN mode = 'replace' THEN rn END)
+                       OVER (PARTITION BY site, reservation_date, phone) AS last_replace
+            FROM numbered
+            WHERE n > 1
+        )
+        SELECT site, reservation_date, phone,
+               (array_agg(id ORDER BY rn DESC))[1] AS keep_id,
+               coalesce(string_agg(NULLIF(memo, ''), E'\\n' ORDER BY rn), '') AS memo,
+               CASE WHEN bool_or(mode = 'replace') THEN 'replace' ELSE 'append' END AS mode
+        FROM marked
+        WHERE last_replace IS NULL OR rn >= last_replace
+        GROUP BY site, reservation_date, phone
+    """)
+    op.execute("""
+        UPDATE memo_queue q
+        SET memo = m.memo, mode = m.mode, updated_at = now()
+        FROM memo_queue_merge m
+        WHERE q.id = m.keep_id
+    """)
+    op.execute("""
+        UPDATE memo_queue q
+        SET status = 'coalesced', completed_at = now(), updated_at = now()
+        FROM memo_queue_merge m
+        WHERE q.status = 'pending'
+          AND q.site = m.site AND q.reservation_date = m.reservation_date AND q.phone = m.phone
+          AND q.id <> m.keep_id
+    """)
+    op.execute("DROP TABLE memo_queue_merge")
+    op.create_index(
+        'uix_memo_queue_pending_key', 'memo_queue', ['site', 'reservation_date', 'phone'],
+        unique=True, postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade():
+    op.drop_index('uix_memo_queue_pending_key', table_name='memo_queue')
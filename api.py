@@ -7,6 +7,7 @@ import traceback
 import subprocess
 import threading
 import hashlib
+import zlib
 import time
 import uuid
 from datetime import datetime, timezone, timedelta
@@ -14,20 +15,39 @@ from typing import Any, Dict, List, Optional
 from fastapi.middleware.cors import CORSMiddleware
 from models import DailySheetUpdatePayload
 from fastapi import FastAPI, Request, HTTPException, Depends, Query
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from email.utils import format_datetime, parsedate_to_datetime
+from sqlalchemy.orm import Session, aliased
 from db import SessionLocal
-from sqlalchemy import select, func
-from db_models import DailySheet, DailySheetRow, MemoQueue, MemoSyncFlag
+from sqlalchemy import select, func, tuple_, case, or_
+from db_models import DailySheet, DailySheetRow, DailySheetChange, MemoQueue, MemoSyncFlag, MemoSyncState
 from sqlalchemy import text
 from fastapi import Body
-from sqlalchemy import delete
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from db import get_db
+from db_async import get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sheet_cache import sheet_cache, date_key
+from sheet_events import sheet_events
+from sheet_invalidation import sheet_invalidation, notify_sql as _notify_sheet_saved_sql, SHEET_CACHE_REVALIDATE_SECONDS
+from memo_sync_worker import merge_memo
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv(dotenv_path=Path(__file__).parent / ".env")
 
-app = FastAPI()
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # 다른 워커/프로세스의 예약표 저장 알림 → 응답 캐시 무효화
+    sheet_invalidation.start()
+    yield
+    sheet_invalidation.stop()
+
+app = FastAPI(lifespan=_lifespan)
 
 KST = timezone(timedelta(hours=9))
 
@@ -45,6 +65,85 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class GzipRequestMiddleware:
+    """
+    Content-Encoding: gzip 요청 본문을 풀어서 전달 (day.py 업로드용, api_client.post_json 참고)
+    - 압축 본문: Content-Length 또는 실제로 받은 바이트가 max_compressed를 넘으면 413
+    - 해제 본문: 청크 단위로 풀면서 max_size를 넘는 순간 413 (gzip 폭탄이 메모리를 다 쓰지 못하게)
+    """
+    def __init__(self, app, max_size: int = 64 * 1024 * 1024, max_compressed: int = 16 * 1024 * 1024,
+                 chunk_size: int = 64 * 1024):
+        self.app = app
+        self.max_size = max_size
+        self.max_compressed = max_compressed
+        self.chunk_size = chunk_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers_map = dict(scope["headers"])
+        if headers_map.get(b"content-encoding", b"").lower() != b"gzip":
+            return await self.app(scope, receive, send)
+
+        def too_large():
+            return JSONResponse({"detail": "요청 본문이 너무 큼"}, status_code=413)(scope, receive, send)
+
+        try:
+            declared = int(headers_map.get(b"content-length", b"0") or 0)
+        except ValueError:
+            declared = 0
+        if declared > self.max_compressed:
+            return await too_large()
+
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        out = []
+        out_len = 0
+        received = 0
+        more_body = True
+        try:
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                data = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                received += len(data)
+                if received > self.max_compressed:
+                    return await too_large()
+                while data:
+                    # max_length로 한 번에 풀리는 양을 제한 → 남은 입력은 unconsumed_tail로 이어서
+                    chunk = inflater.decompress(data, self.chunk_size)
+                    out_len += len(chunk)
+                    if out_len > self.max_size:
+                        return await too_large()
+                    out.append(chunk)
+                    data = inflater.unconsumed_tail
+            tail = inflater.flush()
+            out_len += len(tail)
+            if out_len > self.max_size:
+                return await too_large()
+            out.append(tail)
+            if not inflater.eof:
+                raise zlib.error("gzip 스트림이 끝나지 않음")
+        except zlib.error:
+            return await JSONResponse({"detail": "gzip 본문 해제 실패"}, status_code=400)(scope, receive, send)
+        body = b"".join(out)
+        headers = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        scope = dict(scope, headers=headers)
+        sent = False
+
+        async def replay():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+app.add_middleware(GzipRequestMiddleware)
+
 # 1) .env 로드
 try:
     from dotenv import load_dotenv
@@ -56,25 +155,18 @@ except Exception:
 NAS_FOLDER = os.environ.get("NAS_FOLDER")  # ← .env의 NAS_FOLDER 우선
 BAK_FOLDER = os.path.join(NAS_FOLDER, "bak")
 PY_PATH = os.environ.get("DAYPY_PATH", "/app/day.py")
-MEMO_SYNC_PATH = os.environ.get("MEMO_SYNC_PATH", os.path.join(os.getcwd(), "memo_sync.py"))
 DAY_STATUS_FILE = "day_status.json"
 
-# memo sync 관련
-# 환경변수 MEMO_SYNC_PATH가 없으면 프로젝트 로컬 memo_sync.py 시도
-MEMO_SYNC_STATE_FILE = "memo_sync_state.json"
-MEMO_SYNC_DEBOUNCE_SECONDS = 10 # (초)
+# memo sync 관련: 실제 처리는 상주 워커(memo_sync_worker.py)가 담당, API는 큐 적재/상태 조회만
+# /api/memo-sync-status 응답 캐시 시간(초). 상태는 워커가 memo_sync_state 테이블에 기록
+MEMO_SYNC_STATUS_TTL = float(os.environ.get("MEMO_SYNC_STATUS_TTL", "1"))
 
 DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 proc = None
 proc_lock = threading.Lock()
 
-# memo sync globals
-memo_sync_lock = threading.Lock()
-memo_sync_timer: Optional[threading.Timer] = None
-memo_sync_proc: Optional[subprocess.Popen] = None
-last_memo_edit_ts: Optional[float] = None
-scheduled_run_ts: Optional[float] = None
-memo_sync_running = False
+# memo_queue 적재 시 NOTIFY 채널 (memo_sync_worker.py가 LISTEN)
+MEMO_QUEUE_CHANNEL = os.environ.get("MEMO_QUEUE_CHANNEL", "memo_queue")
 
 from routes_restore import router as restore_router
 
@@ -185,10 +277,16 @@ def restore_daily_sheet_from_json(
         inserted = 0
         for row_json in sheet:
             row_obj = _row_from_json(date, row_json)
+            row_obj.row_hash = compute_row_hash(_row_to_dict(row_obj))
             db.add(row_obj)
             inserted += 1
+        db.flush()
+        ds.sheet_hash = _recompute_sheet_hash(db, date)
+        _reset_sheet_changes(db, ds)
 
         db.commit()
+        sheet_cache.invalidate(date)
+        _publish_sheet_change(date, ds)
         return {
             "ok": True,
             "date": date,
@@ -235,6 +333,7 @@ def memo_queue_list(db: Session = Depends(get_db)):
             "mode": item.mode,
             "status": item.status,
             "tries": item.tries,
+            "next_attempt_at": item.next_attempt_at.isoformat() if item.next_attempt_at else None,
             "added_at": item.added_at.isoformat() if item.added_at else None,
             "updated_at": item.updated_at.isoformat() if item.updated_at else None,
             "completed_at": item.completed_at.isoformat() if item.completed_at else None,
@@ -242,7 +341,7 @@ def memo_queue_list(db: Session = Depends(get_db)):
     return {"queue": [item_to_dict(i) for i in items]}
 
 @app.post("/api/memo-queue-append")
-async def memo_queue_append(request: Request, db: Session = Depends(get_db)):
+async def memo_queue_append(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         body = await request.json()
     except:
@@ -255,25 +354,85 @@ async def memo_queue_append(request: Request, db: Session = Depends(get_db)):
     mode = body.get("mode") or "replace"
     if not site or not reservation_date:
         raise HTTPException(status_code=400, detail="site, reservation_date 필수")
-    item = MemoQueue(
-        id=uuid.uuid4(),
-        site=site,
-        reservation_date=reservation_date,
-        customer_name=customer_name,
-        phone=phone,
-        memo=memo_text,
-        mode=mode,
-        status="pending",
-        tries=0,
-    )
-    db.add(item)
-    db.commit()
-    return {"ok": True, "id": str(item.id)}
+    ids = await _enqueue_memos(db, [_memo_values(site, reservation_date, customer_name, phone, memo_text, mode)])
+    await db.commit()
+    return {"ok": True, "id": str(ids[0])}
+
+def _memo_values(site, reservation_date, customer_name, phone, memo, mode) -> Dict[str, Any]:
+    return {
+        "id": uuid.uuid4(),
+        "site": site,
+        "reservation_date": reservation_date,
+        "customer_name": customer_name or "",
+        "phone": phone or "",
+        "memo": memo,
+        "mode": mode,
+        "status": "pending",
+        "tries": 0,
+    }
+
+def _coalesce_memo_values(values: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # 한 INSERT 안에서 같은 키가 두 번 나오면 ON CONFLICT DO UPDATE가 실패하므로 미리 합침
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for v in values:
+        key = (v["site"], v["reservation_date"], v["phone"])
+        prev = merged.get(key)
+        if prev is None:
+            merged[key] = dict(v)
+        else:
+            memo, mode = merge_memo(prev["memo"], prev["mode"], v["memo"], v["mode"])
+            merged[key] = {**prev, "customer_name": v["customer_name"], "memo": memo, "mode": mode}
+    return list(merged.values())
 
-# ---- 메모 sync flag 갱신 + 디바운스 예약 ----
+def _enqueue_memo_stmt(values: List[Dict[str, Any]]):
+    """
+    memo_queue 적재 = 같은 예약(site, reservation_date, phone)의 pending 항목과 합치기.
+    uix_memo_queue_pending_key(부분 유니크 인덱스)에 걸리면 새 행 대신 기존 pending 행을 갱신:
+    replace는 메모를 덮어쓰고, append는 줄바꿈으로 이어 붙임 (기존이 replace면 replace 유지).
+    added_at은 처음 적재 시각 그대로 → 큐 순서 유지. 처리 중(processing)인 항목과는 합치지 않음.
+    합쳐진 항목은 새 편집이므로 재시도 상태를 초기화 (tries=0, 바로 처리) → 백오프 대기/dead 직전 항목에 묻히지 않음
+    """
+    table = MemoQueue.__table__
+    stmt = pg_insert(table).values(values)
+    ex = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=["site", "reservation_date", "phone"],
+        index_where=table.c.status == "pending",
+        set_={
+            "customer_name": ex.customer_name,
+            "memo": case(
+                (ex.mode == "replace", ex.memo),
+                (ex.memo == "", table.c.memo),
+                (table.c.memo == "", ex.memo),
+                else_=table.c.memo + "\n" + ex.memo,
+            ),
+            "mode": case((ex.mode == "replace", "replace"), else_=table.c.mode),
+            "tries": 0,
+            "next_attempt_at": func.now(),
+            "updated_at": func.now(),
+        },
+    ).returning(table.c.id)
+
+async def _enqueue_memos(db: AsyncSession, values: List[Dict[str, Any]]) -> List[Any]:
+    """메모 작업 적재(+합치기) 후 워커 NOTIFY. 적재/갱신된 큐 항목 id 목록 반환"""
+    values = _coalesce_memo_values(values)
+    if not values:
+        return []
+    ids = list((await db.execute(_enqueue_memo_stmt(values))).scalars().all())
+    await _notify_memo_queue(db, len(ids))
+    return ids
+
+def _notify_memo_queue_sql(count: int):
+    # 트랜잭션 안에서 보내면 커밋될 때 전달되고 롤백되면 사라짐 → 워커는 커밋된 항목만 보고 깨어남
+    return text("SELECT pg_notify(:channel, :payload)").bindparams(channel=MEMO_QUEUE_CHANNEL, payload=str(count))
+
+async def _notify_memo_queue(db: AsyncSession, count: int) -> None:
+    if count:
+        await db.execute(_notify_memo_queue_sql(count))
+
+# ---- 메모 sync flag 갱신 ----
 @app.post("/api/memo-edit-touch")
 def memo_edit_touch(db: Session = Depends(get_db)):
-    global last_memo_edit_ts
     now = datetime.utcnow()
     # DB 플래그 true
     flag = db.query(MemoSyncFlag).get(1)
@@ -283,185 +442,232 @@ def memo_edit_touch(db: Session = Depends(get_db)):
     else:
         flag.sync_required = True
         flag.requested_at = now
+    # 편집 시각은 flag.requested_at에 남음 (uvicorn 워커가 여러 개여도 공유)
     db.commit()
-    # 메모 편집 타임스탬프 저장 및 실행 예약
-    with memo_sync_lock:
-        last_memo_edit_ts = time.time()
-        _schedule_memo_sync_locked()
-        sched_at = utc_to_kst_str(datetime.utcfromtimestamp(scheduled_run_ts)) if scheduled_run_ts else None
     return {
         "ok": True,
         "last_edit_at": now.isoformat(),
-        "scheduled_run_at": sched_at
+        "scheduled_run_at": None
     }
 
+def _memo_queue_counts(db: Session) -> Dict[str, int]:
+    rows = db.query(MemoQueue.status, func.count()).filter(
+        MemoQueue.status.in_(("pending", "processing", "dead"))
+    ).group_by(MemoQueue.status).all()
+    return {status: n for status, n in rows}
+
+_memo_status_lock = threading.Lock()
+_memo_status_cache: Dict[str, Any] = {"at": 0.0, "state": None}
+
 @app.get("/api/memo-sync-status")
-def memo_sync_status():
-    with memo_sync_lock:
-        state = _load_memo_sync_state_file()
-        state["running"] = memo_sync_running
-        state["scheduled_run_at"] = utc_to_kst_str(datetime.utcfromtimestamp(scheduled_run_ts)) if scheduled_run_ts else None
-        state["last_edit_at"] = utc_to_kst_str(datetime.utcfromtimestamp(last_memo_edit_ts)) if last_memo_edit_ts else state.get("last_edit_at")
-        return state
+def memo_sync_status(db: Session = Depends(get_db)):
+    """워커 상태(effective_batch_size/effective_wait_ms/listening 등) + 큐 건수 + 마지막 편집 시각
+    (폴링이 몰려도 DB 조회는 MEMO_SYNC_STATUS_TTL마다 한 번)"""
+    with _memo_status_lock:
+        if _memo_status_cache["state"] is not None and time.monotonic() - _memo_status_cache["at"] < MEMO_SYNC_STATUS_TTL:
+            return dict(_memo_status_cache["state"])
+    state = _load_memo_sync_state(db)
+    with _memo_status_lock:
+        _memo_status_cache.update(at=time.monotonic(), state=state)
+    return dict(state)
+
+def _load_memo_sync_state(db: Session) -> Dict[str, Any]:
+    row = db.get(MemoSyncState, 1)
+    state: Dict[str, Any] = {}
+    if row is not None:
+        for col in MemoSyncState.__table__.columns:
+            if col.name != "id":
+                state[col.name] = getattr(row, col.name)
+        for key in ("last_run_started_at", "last_run_finished_at", "updated_at"):
+            state[key] = utc_to_kst_str(state[key])
+    counts = _memo_queue_counts(db)
+    state["pending"] = counts.get("pending", 0)
+    state["processing"] = counts.get("processing", 0)
+    state["dead"] = counts.get("dead", 0)
+    state["running"] = state["processing"] > 0
+    state["scheduled_run_at"] = None
+    flag = db.get(MemoSyncFlag, 1)
+    if flag and flag.requested_at:
+        state["last_edit_at"] = utc_to_kst_str(flag.requested_at)
+    return state
 
 @app.post("/api/memo-sync-run-now")
-def memo_sync_run_now():
-    with memo_sync_lock:
-        if memo_sync_timer and memo_sync_timer.is_alive():
-            memo_sync_timer.cancel()
-    _run_memo_sync_subprocess()
-    return {"ok": True, "forced": True}
-
-# ------------------ memo sync state helpers ------------------
-def _save_memo_sync_state(extra: Dict[str, Any] = None):
-    state = {
-        "last_edit_at": utc_to_kst_str(datetime.utcfromtimestamp(last_memo_edit_ts)) if last_memo_edit_ts else None,
-        "scheduled_run_at": utc_to_kst_str(datetime.utcfromtimestamp(scheduled_run_ts)) if scheduled_run_ts else None,
-        "running": memo_sync_running,
-    }
-    if extra:
-        state.update(extra)
-    try:
-        with open(MEMO_SYNC_STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logging.error(f"memo_sync_state 저장 실패: {e}")
+def memo_sync_run_now(db: Session = Depends(get_db)):
+    # 워커를 즉시 깨움 (보통은 적재 시 NOTIFY로 이미 처리 중). 백오프 대기 중인 항목도 바로 시도
+    db.query(MemoQueue).filter(
+        MemoQueue.status == "pending", MemoQueue.next_attempt_at > func.now()
+    ).update({MemoQueue.next_attempt_at: func.now()}, synchronize_session=False)
+    db.execute(_notify_memo_queue_sql(0))
+    db.commit()
+    return {"ok": True, "forced": True, "pending": _memo_queue_counts(db).get("pending", 0)}
 
-def _load_memo_sync_state_file() -> Dict[str, Any]:
-    if not os.path.exists(MEMO_SYNC_STATE_FILE):
-        return {}
-    try:
-        with open(MEMO_SYNC_STATE_FILE, encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {}
-
-def _run_memo_sync_subprocess():
-    global memo_sync_proc, memo_sync_running, scheduled_run_ts
-    with memo_sync_lock:
-        now = time.time()
-        if last_memo_edit_ts and now - last_memo_edit_ts < MEMO_SYNC_DEBOUNCE_SECONDS - 0.5:
-            logging.info("[MEMO_SYNC] 최근 수정 감지 → 실행 연기")
-            _schedule_memo_sync_locked()
-            return
-        if memo_sync_running:
-            logging.info("[MEMO_SYNC] 이미 실행 중 → 중복 실행 건너뜀")
-            return
-        memo_sync_running = True
-        scheduled_run_ts = None
-        _save_memo_sync_state({"last_run_started_at": datetime.utcnow().isoformat()})
-
-    def target():
-        global memo_sync_proc, memo_sync_running
-        logging.info(f"[MEMO_SYNC] memo_sync.py 실행 시작: {MEMO_SYNC_PATH}")
-        stdout_text, stderr_text = "", ""
-        rc = None
+@app.post("/api/memo-queue/requeue-dead")
+def memo_queue_requeue_dead(payload: Dict[str, Any] = Body(default={}), db: Session = Depends(get_db)):
+    """
+    dead 항목(MEMO_SYNC_MAX_TRIES번 실패)을 tries=0으로 다시 pending에 넣음 (Camfit 장애 복구 후 일괄 재처리용).
+    body: {"ids": [...]} 생략하면 dead 전체.
+    같은 예약에 이미 pending 항목이 있으면 건너뜀 (그 항목이 더 최근 내용), 같은 예약의 dead가 여러 개면 가장 최근 것만.
+    """
+    ids = (payload or {}).get("ids")
+    if ids is not None:
         try:
-            workdir = os.path.dirname(MEMO_SYNC_PATH) or os.getcwd()
-            env = os.environ.copy()
-            env["PYTHONIOENCODING"] = "utf-8"
-            memo_sync_proc = subprocess.Popen(
-                ['python', MEMO_SYNC_PATH, '--debug'],
-                cwd=workdir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                env=env
-            )
-            stdout_text, stderr_text = memo_sync_proc.communicate()
-            rc = memo_sync_proc.returncode
-            logging.info(f"[MEMO_SYNC] 종료 코드: {rc}")
-            if stdout_text:
-                logging.info(f"[memo_sync stdout]\n{stdout_text[:4000]}...")
-            if stderr_text:
-                logging.error(f"[memo_sync stderr]\n{stderr_text[:4000]}...")
-        except Exception as e:
-            logging.error(f"[MEMO_SYNC] 실행 오류: {e}\n{traceback.format_exc()}")
-        finally:
-            with memo_sync_lock:
-                memo_sync_running = False
-                _save_memo_sync_state({
-                    "last_run_finished_at": datetime.utcnow().isoformat(),
-                    "last_run_returncode": rc,
-                })
-
-    threading.Thread(target=target, daemon=True).start()
-
-def _schedule_memo_sync_locked():
-    global memo_sync_timer, scheduled_run_ts
-    if memo_sync_timer and memo_sync_timer.is_alive():
-        memo_sync_timer.cancel()
-    scheduled_run_ts = time.time() + MEMO_SYNC_DEBOUNCE_SECONDS
-
-    def timer_cb():
-        _run_memo_sync_subprocess()
-
-    memo_sync_timer = threading.Timer(MEMO_SYNC_DEBOUNCE_SECONDS, timer_cb)
-    memo_sync_timer.daemon = True
-    memo_sync_timer.start()
-    _save_memo_sync_state()
+            ids = [uuid.UUID(str(i)) for i in ids]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids 형식 오류")
+    dead = db.query(MemoQueue).filter(MemoQueue.status == "dead")
+    if ids is not None:
+        dead = dead.filter(MemoQueue.id.in_(ids))
+    total = dead.count()
+    pending = aliased(MemoQueue)
+    pick = (
+        select(MemoQueue.id)
+        .where(MemoQueue.status == "dead")
+        .where(~select(pending.id).where(
+            pending.status == "pending",
+            pending.site == MemoQueue.site,
+            pending.reservation_date == MemoQueue.reservation_date,
+            pending.phone == MemoQueue.phone,
+        ).exists())
+        .distinct(MemoQueue.site, MemoQueue.reservation_date, MemoQueue.phone)
+        .order_by(MemoQueue.site, MemoQueue.reservation_date, MemoQueue.phone, MemoQueue.added_at.desc())
+    )
+    if ids is not None:
+        pick = pick.where(MemoQueue.id.in_(ids))
+    try:
+        requeued = db.execute(
+            update(MemoQueue)
+            .where(MemoQueue.id.in_(pick.scalar_subquery()))
+            .values(status="pending", tries=0, next_attempt_at=func.now(), updated_at=func.now(), completed_at=None)
+            .returning(MemoQueue.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.execute(_notify_memo_queue_sql(len(requeued)))
+        db.commit()
+    except IntegrityError:
+        # 그 사이 같은 예약이 새로 적재됨
+        db.rollback()
+        raise HTTPException(status_code=409, detail="동시에 적재된 항목과 겹침, 다시 시도")
+    return {"ok": True, "requeued": len(requeued), "skipped": total - len(requeued),
+            "ids": [str(i) for i in requeued]}
 
 # --------------------------------------------------------------------------------
 # API: Daily Sheet
 # --------------------------------------------------------------------------------
 from sqlalchemy import text  # 이미 있다면 중복 추가 불필요
 
+def _sheet_etag(sheet: DailySheet) -> str:
+    # version은 저장마다 증가하고 sheet_hash는 행 내용을 대표하므로 강한 ETag로 사용
+    return f'"{sheet.version}-{sheet.sheet_hash or ""}"'
+
+def _sheet_last_modified(sheet: DailySheet) -> Optional[str]:
+    dt = sheet.updated_at
+    if not dt:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return format_datetime(dt.astimezone(timezone.utc), usegmt=True)
+
+def _sheet_cache_headers(sheet: DailySheet) -> Dict[str, str]:
+    headers = {"ETag": _sheet_etag(sheet), "Cache-Control": "no-cache"}
+    last_modified = _sheet_last_modified(sheet)
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+def _opaque_tag(tag: str) -> str:
+    # If-None-Match는 약한 비교: W/"x" 와 "x"는 같은 태그 (RFC 9110 8.8.3.2)
+    tag = tag.strip()
+    return tag[2:] if tag[:2] in ("W/", "w/") else tag
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",") if c.strip()]
+    if "*" in candidates:
+        return True
+    target = _opaque_tag(etag)
+    return any(_opaque_tag(c) == target for c in candidates)
+
+def _not_modified_since(if_modified_since: Optional[str], last_modified: Optional[str]) -> bool:
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except Exception:
+        return False
+
+def _is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    # If-None-Match가 있으면 If-Modified-Since는 무시 (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, headers["ETag"])
+    return _not_modified_since(request.headers.get("if-modified-since"), headers.get("Last-Modified"))
+
+def _row_order_by():
+    # 표시용 사이트값(__custom->>'사이트')이 있으면 우선 사용, 없으면 원본 site로 정렬
+    # Postgres JSONB 연산자 사용
+    # Use DB column name 'custom_values' (created by migrations) for ordering
+    order_sql = text(
+        "COALESCE(NULLIF(trim((custom_values->>'사이트')::text), ''), site) ASC"
+    )
+    return order_sql, DailySheetRow.reservation_date.asc(), DailySheetRow.customer_name.asc()
+
+def _sheet_payload(sheet: DailySheet, rows: List[DailySheetRow]) -> Dict[str, Any]:
+    return {
+        "date": sheet.date,
+        "version": sheet.version,
+        "updated_at": sheet.updated_at.isoformat() if sheet.updated_at else None,
+        "top": sheet.top,
+        "headers": sheet.headers,
+        "stats": sheet.stats,
+        "footer": sheet.footer,
+        "optionCols": sheet.option_cols,
+        "sheet_hash": sheet.sheet_hash,
+        "e10": sheet.e10,
+        "sheet": [_row_to_dict(r) for r in rows]
+    }
+
+def _render_json(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 @app.get("/api/daily-sheet")
-def get_daily_sheet(date: str = Query(...), db: Session = Depends(get_db)):
+def get_daily_sheet(request: Request, date: str = Query(...), db: Session = Depends(get_db)):
+    date_obj = _parse_sheet_date(date)
+    date = date_obj.isoformat()  # 캐시 키/로그는 YYYY-MM-DD로 통일
+    # 1) 캐시 적중: 렌더링된 bytes를 DB 조회 없이 그대로 응답
+    #    (다른 워커의 저장은 sheet_invalidation이 NOTIFY로 무효화. 리스너가 끊긴 동안만 TTL마다 version 재확인)
+    cached = sheet_cache.get_latest(date)
+    if cached and not sheet_invalidation.listening and time.monotonic() - cached.checked_at >= SHEET_CACHE_REVALIDATE_SECONDS:
+        current_version = db.query(DailySheet.version).filter(DailySheet.date == date_obj).scalar()
+        if current_version == cached.version:
+            cached.checked_at = time.monotonic()
+        else:
+            sheet_cache.invalidate(date)
+            cached = None
+    if cached:
+        if _is_not_modified(request, cached.headers):
+            return Response(status_code=304, headers=cached.headers)
+        return Response(content=cached.body, media_type="application/json", headers=cached.headers)
+    generation = sheet_cache.generation(date)
     try:
-        sheet = db.get(DailySheet, date)
+        # 2) daily_sheets PK 조회만으로 조건부 요청을 판정 (daily_sheet_rows는 건드리지 않음)
+        sheet = db.get(DailySheet, date_obj)
         if not sheet:
             raise HTTPException(status_code=404, detail=f"{date} 예약표 없음")
+        cache_headers = _sheet_cache_headers(sheet)
+        if _is_not_modified(request, cache_headers):
+            return Response(status_code=304, headers=cache_headers)
 
-        # 표시용 사이트값(__custom->>'사이트')이 있으면 우선 사용, 없으면 원본 site로 정렬
-        # Postgres JSONB 연산자 사용
-        # Use DB column name 'custom_values' (created by migrations) for ordering
-        order_sql = text(
-            "COALESCE(NULLIF(trim((custom_values->>'사이트')::text), ''), site) ASC"
-        )
         rows = (
             db.query(DailySheetRow)
-              .filter(DailySheetRow.sheet_date == date)
-              .order_by(order_sql, DailySheetRow.reservation_date.asc(), DailySheetRow.customer_name.asc())
+              .filter(DailySheetRow.sheet_date == date_obj)
+              .order_by(*_row_order_by())
               .all()
         )
 
-        sheet_data = []
-        for r in rows:
-            sheet_data.append({
-                "사이트": r.site,
-                "상태": r.status,
-                "고객명": r.customer_name,
-                "연락처": r.phone,
-                "예약 인원": r.people,
-                "차량": r.car,
-                "예약일": r.reservation_date,
-                "현장결제 금액": r.현장결제금액,
-                "선결제 금액": r.선결제금액,
-                "총 이용료": r.총이용료,
-                "관리메모": r.관리메모,
-                "요청사항": r.요청사항,
-                "circled": r.circled,
-                "같이온사이트": r.같이온사이트,
-                "__custom": r.custom,
-                "__original": r.original,
-                "__history": r.history
-            })
-        return {
-            "date": sheet.date,
-            "version": sheet.version,
-            "updated_at": sheet.updated_at.isoformat() if sheet.updated_at else None,
-            "top": sheet.top,
-            "headers": sheet.headers,
-            "stats": sheet.stats,
-            "footer": sheet.footer,
-            "optionCols": sheet.option_cols,
-            "sheet_hash": sheet.sheet_hash,
-            "e10": sheet.e10,
-            "sheet": sheet_data
-        }
+        body = _render_json(_sheet_payload(sheet, rows))
+        sheet_cache.put(date, sheet.version, body, cache_headers, generation=generation)
+        return Response(content=body, media_type="application/json", headers=cache_headers)
     except HTTPException:
         # FastAPI HTTPException은 그대로 전달
         raise
@@ -479,25 +685,510 @@ def get_daily_sheet_meta(date: str = Query(...), db: Session = Depends(get_db)):
         "date": date,
         "version": sheet.version,
         "updated_at": sheet.updated_at.isoformat() if sheet.updated_at else None,
-        "sheet_hash": sheet.sheet_hash
+        "sheet_hash": sheet.sheet_hash,
+        "etag": _sheet_etag(sheet)
     }
 
+@app.get("/api/daily-sheet/cache-stats")
+def get_daily_sheet_cache_stats():
+    return {
+        **sheet_cache.stats(),
+        "invalidation_listening": sheet_invalidation.listening,
+        "invalidation_notifications": sheet_invalidation.notifications,
+    }
+
+@app.get("/api/daily-sheet/changes")
+def get_daily_sheet_changes(date: str = Query(...), since_version: int = Query(...), db: Session = Depends(get_db)):
+    """
+    since_version 이후 바뀐 행만 반환 (upserted: 현재 행 내용, deleted: 키 목록).
+    로그가 정리되어 since_version을 덮지 못하면 full=true와 함께 전체 시트를 반환.
+    """
+    date_obj = _parse_sheet_date(date)
+    sheet = db.get(DailySheet, date_obj)
+    if not sheet:
+        raise HTTPException(status_code=404, detail="파일 없음")
+
+    floor = sheet.changes_since_version
+    if floor is None or since_version < floor or since_version > sheet.version:
+        rows = (
+            db.query(DailySheetRow)
+              .filter(DailySheetRow.sheet_date == date_obj)
+              .order_by(*_row_order_by())
+              .all()
+        )
+        return {**_sheet_payload(sheet, rows), "since_version": since_version, "full": True}
+
+    meta = _sheet_payload(sheet, [])
+    meta.pop("sheet")
+    if since_version == sheet.version:
+        return {**meta, "since_version": since_version, "full": False, "upserted": [], "deleted": []}
+
+    changes = (
+        db.query(DailySheetChange)
+          .filter(DailySheetChange.sheet_date == date_obj, DailySheetChange.version > since_version)
+          .order_by(DailySheetChange.version.asc(), DailySheetChange.id.asc())
+          .all()
+    )
+    # 같은 키가 여러 번 바뀌었으면 마지막 op만 의미가 있음
+    last_op: Dict[tuple, str] = {}
+    for c in changes:
+        last_op[(c.site, c.reservation_date)] = c.op
+    upsert_keys = [key for key, op in last_op.items() if op == "upsert"]
+    rows = []
+    if upsert_keys:
+        rows = (
+            db.query(DailySheetRow)
+              .filter(
+                  DailySheetRow.sheet_date == date_obj,
+                  _row_key_filter(upsert_keys),
+              )
+              .order_by(*_row_order_by())
+              .all()
+        )
+    found = {(r.site, r.reservation_date) for r in rows}
+    deleted = [
+        {"사이트": key[0], "예약일": key[1]}
+        for key, op in last_op.items()
+        if op == "delete" or key not in found
+    ]
+    return {
+        **meta,
+        "since_version": since_version,
+        "full": False,
+        "upserted": [_row_to_dict(r) for r in rows],
+        "deleted": deleted,
+    }
+
+SSE_HEARTBEAT_SECONDS = 20
+SSE_MAX_CHANGED_ROWS = 500
+
+def _publish_sheet_change(date, sheet: DailySheet, changes=None) -> None:
+    """저장 커밋 후 호출. changes가 None(또는 너무 많으면)이면 클라이언트는 전체를 다시 받음"""
+    changed_rows = None
+    if changes is not None and len(changes) <= SSE_MAX_CHANGED_ROWS:
+        changed_rows = [{"op": op, "사이트": key[0], "예약일": key[1]} for op, key in changes]
+    sheet_events.publish(date, {
+        "date": str(date),
+        "version": sheet.version,
+        "sheet_hash": sheet.sheet_hash,
+        "changed_rows": changed_rows,
+    })
+
+@app.get("/api/daily-sheet/events")
+async def daily_sheet_events(request: Request, date: str = Query(...)):
+    """
+    Server-Sent Events: 해당 날짜 시트가 저장될 때마다
+    {date, version, sheet_hash, changed_rows} 이벤트를 push (meta 폴링 대체)
+    """
+    async def stream():
+        sub = sheet_events.subscribe(date)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: sheet\nid: {event['version']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            sheet_events.unsubscribe(date, sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+DAILY_SHEETS_MAX_RANGE_DAYS = 62
+
+def _parse_known_versions(known: Optional[str]) -> Dict[str, int]:
+    # "2025-09-28:6,2025-09-29:3" → {"2025-09-28": 6, "2025-09-29": 3}
+    result = {}
+    for part in (known or "").split(","):
+        d, sep, v = part.strip().partition(":")
+        if sep and DATE_RE.match(d):
+            try:
+                result[d] = int(v)
+            except ValueError:
+                continue
+    return result
+
+@app.get("/api/daily-sheets")
+def get_daily_sheets_range(
+    date_from: str = Query(..., alias="from"),
+    date_to: str = Query(..., alias="to"),
+    known: Optional[str] = Query(None, description="클라이언트가 이미 가진 'YYYY-MM-DD:version' 목록(쉼표 구분)"),
+    db: Session = Depends(get_db),
+):
+    """
+    기간 내 예약표를 날짜별 NDJSON 한 줄씩 스트리밍 (달력/주간 보기용).
+    - 메타 1회 + 행 1회 조회로 전체 기간을 가져옴
+    - known에 있는 (date, version)과 같으면 {"date", "version", "unchanged": true}만 보냄
+    """
+    d_from = _parse_sheet_date(date_from)
+    d_to = _parse_sheet_date(date_to)
+    if d_to < d_from:
+        raise HTTPException(status_code=400, detail="from <= to 이어야 함")
+    if (d_to - d_from).days + 1 > DAILY_SHEETS_MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"최대 {DAILY_SHEETS_MAX_RANGE_DAYS}일까지 조회 가능")
+    known_versions = _parse_known_versions(known)
+    generations = {}
+    for i in range((d_to - d_from).days + 1):
+        d = (d_from + timedelta(days=i)).isoformat()
+        generations[d] = sheet_cache.generation(d)
+
+    sheets = (
+        db.query(DailySheet)
+          .filter(DailySheet.date >= d_from, DailySheet.date <= d_to)
+          .order_by(DailySheet.date.asc())
+          .all()
+    )
+    skipped, cached, need_rows = set(), {}, []
+    for sheet in sheets:
+        d = sheet.date.isoformat()
+        if known_versions.get(d) == sheet.version:
+            skipped.add(d)
+            continue
+        entry = sheet_cache.get(d, sheet.version)
+        if entry:
+            cached[d] = entry.body
+        else:
+            need_rows.append(sheet.date)
+
+    rows_by_date: Dict[Any, List[DailySheetRow]] = {d: [] for d in need_rows}
+    if need_rows:
+        rows = (
+            db.query(DailySheetRow)
+              .filter(DailySheetRow.sheet_date.in_(need_rows))
+              .order_by(DailySheetRow.sheet_date.asc(), *_row_order_by())
+              .all()
+        )
+        for r in rows:
+            rows_by_date[r.sheet_date].append(r)
+
+    def generate():
+        for sheet in sheets:
+            d = sheet.date.isoformat()
+            if d in skipped:
+                yield _render_json({"date": d, "version": sheet.version, "unchanged": True}) + b"\n"
+            elif d in cached:
+                yield cached[d] + b"\n"
+            else:
+                body = _render_json(_sheet_payload(sheet, rows_by_date[sheet.date]))
+                sheet_cache.put(d, sheet.version, body, _sheet_cache_headers(sheet), generation=generations[d])
+                yield body + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 @app.get("/api/available-dates")
 def get_available_dates(db: Session = Depends(get_db)):
     dates = db.scalars(select(DailySheet.date)).all()
     dates_sorted = sorted(dates, reverse=True)
     return {"dates": dates_sorted}
 
+# sheet_hash = 행 해시(sha256)들의 합 mod 2^256
+#  - 행 순서와 무관하고, 한 행이 바뀌면 (이전 행 해시 빼기 + 새 행 해시 더하기)로 O(1) 갱신 가능
+SHEET_HASH_MOD = 1 << 256
+
+def compute_row_hash(row: Dict[str, Any]) -> str:
+    raw = json.dumps(row, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def combine_row_hashes(row_hashes) -> str:
+    total = 0
+    for h in row_hashes:
+        total = (total + int(h, 16)) % SHEET_HASH_MOD
+    return f"{total:064x}"
+
+def adjust_sheet_hash(sheet_hash: str, removed=(), added=()) -> str:
+    total = int(sheet_hash, 16)
+    for h in removed:
+        total = (total - int(h, 16)) % SHEET_HASH_MOD
+    for h in added:
+        total = (total + int(h, 16)) % SHEET_HASH_MOD
+    return f"{total:064x}"
+
 def compute_sheet_hash(sheet_rows: List[Dict[str, Any]]) -> str:
     try:
-        raw = json.dumps(sheet_rows, ensure_ascii=False, sort_keys=True)
-        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        return combine_row_hashes(compute_row_hash(r) for r in sheet_rows)
     except Exception:
         return ""
 
+def _recompute_sheet_hash(db: Session, date) -> str:
+    """row_hash가 없는(이전 형식) 행이 섞여 있을 때 쓰는 전체 재계산 경로"""
+    rows = db.query(DailySheetRow).filter(DailySheetRow.sheet_date == date).all()
+    for r in rows:
+        r.row_hash = compute_row_hash(_row_to_dict(r))
+    return combine_row_hashes(r.row_hash for r in rows)
+
+def _has_unhashed_rows(db: Session, date) -> bool:
+    return db.query(DailySheetRow.id).filter(
+        DailySheetRow.sheet_date == date, DailySheetRow.row_hash.is_(None)
+    ).limit(1).first() is not None
+
+def _next_sheet_hash(db: Session, sheet_hash: Optional[str], date, removed, added) -> str:
+    """
+    행 변경 후 sheet_hash: 가능하면 증분(adjust_sheet_hash), 아니면 전체 재계산.
+    row_hash가 없는 행이 남은 날짜는 sheet_hash도 이전 방식(payload 전체 해시)으로 계산된 값이라
+    거기에 더하고 빼도 의미가 없음 → 처음 손댈 때 한 번 재계산(이때 모든 행의 row_hash가 채워짐)
+    """
+    if sheet_hash and all(removed) and not _has_unhashed_rows(db, date):
+        return adjust_sheet_hash(sheet_hash, removed=removed, added=added)
+    return _recompute_sheet_hash(db, date)
+
+# ------------------ 예약표 행 매핑 / diff ------------------
+# (API JSON 키, DailySheetRow 속성) — 응답 dict 순서도 이 순서를 따름
+ROW_FIELDS = [
+    ("사이트", "site"),
+    ("상태", "status"),
+    ("고객명", "customer_name"),
+    ("연락처", "phone"),
+    ("예약 인원", "people"),
+    ("차량", "car"),
+    ("예약일", "reservation_date"),
+    ("현장결제 금액", "현장결제금액"),
+    ("선결제 금액", "선결제금액"),
+    ("총 이용료", "총이용료"),
+    ("관리메모", "관리메모"),
+    ("요청사항", "요청사항"),
+    ("circled", "circled"),
+    ("같이온사이트", "같이온사이트"),
+    ("__custom", "custom"),
+    ("__original", "original"),
+    ("__history", "history"),
+]
+ROW_ATTRS = [attr for _, attr in ROW_FIELDS]
+# uix_sheet_site_resvdate 키 컬럼은 ON CONFLICT 시 갱신 대상에서 제외
+ROW_UPDATE_ATTRS = [attr for attr in ROW_ATTRS if attr not in ("site", "reservation_date")] + ["row_hash"]
+# DB에서 text 컬럼인 속성: 숫자 등이 들어와도 문자열로 저장되므로 해시/비교 전에 맞춰 둠
+ROW_TEXT_ATTRS = [
+    "site", "status", "customer_name", "phone", "people", "car", "reservation_date",
+    "현장결제금액", "선결제금액", "총이용료", "요청사항",
+]
+UPSERT_CHUNK_SIZE = 500
+# DailySheetRow 속성명 → 테이블 컬럼 키 (people → people_raw, 관리메모 → manage_memo 등)
+# Core INSERT/UPDATE(pg_insert, excluded)는 속성명이 아니라 컬럼 키로만 받음
+ROW_COLUMN_KEYS = {
+    attr: DailySheetRow.__mapper__.attrs[attr].columns[0].key
+    for attr in ROW_ATTRS + ["sheet_date", "row_hash"]
+}
+
+def _row_columns(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {ROW_COLUMN_KEYS.get(attr, attr): v for attr, v in values.items()}
+
+def _row_to_dict(r: DailySheetRow) -> Dict[str, Any]:
+    return {key: getattr(r, attr) for key, attr in ROW_FIELDS}
+
+def _normalize_list_field(v):
+    """list/array 형태 필드를 DB 컬럼 타입(text[])에 맞게 문자열 리스트로 표준화"""
+    # None -> empty list
+    if v is None:
+        return []
+    # already a list
+    if isinstance(v, list):
+        return [str(x) for x in v]
+    # JSON encoded string like '["a","b"]'
+    if isinstance(v, str):
+        s = v.strip()
+        if s == "" or s.lower() == "null":
+            return []
+        try:
+            parsed = json.loads(s)
+            if isinstance(parsed, list):
+                return [str(x) for x in parsed]
+        except Exception:
+            # fallback: split on newlines
+            return [part.strip() for part in s.split("\n") if part.strip()]
+    # fallback: single value -> list
+    return [str(v)]
+
+def _normalize_resv_date(resv):
+    # 'YYYY-MM-DD' 형태면 표준 ISO 문자열로, 그 외('9/7 ~ 9/9' 등)는 원문 유지
+    try:
+        from datetime import date as _date
+        if isinstance(resv, str) and resv:
+            return _date.fromisoformat(resv).isoformat()
+    except Exception:
+        pass
+    return resv
+
+def _row_values_from_payload(date_obj, row_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """업로드 JSON 한 행 → daily_sheet_rows 컬럼 값 dict (키는 DailySheetRow 속성명)"""
+    values = {attr: row_dict.get(key) for key, attr in ROW_FIELDS}
+    values["sheet_date"] = date_obj
+    values["site"] = row_dict.get("사이트", "")
+    values["reservation_date"] = _normalize_resv_date(row_dict.get("예약일"))
+    values["관리메모"] = _normalize_list_field(row_dict.get("관리메모"))
+    values["같이온사이트"] = _normalize_list_field(row_dict.get("같이온사이트"))
+    for attr in ROW_TEXT_ATTRS:
+        if values[attr] is not None and not isinstance(values[attr], str):
+            values[attr] = str(values[attr])
+    values["row_hash"] = compute_row_hash({key: values[attr] for key, attr in ROW_FIELDS})
+    return values
+
+def _row_key_filter(keys):
+    """(site, reservation_date) 키 목록 → WHERE 조건.
+    예약일이 NULL인 키는 tuple IN으로 찾을 수 없으므로(NULL = NULL은 참이 아님) IS NULL로 따로 비교"""
+    keyed = [k for k in keys if k[1] is not None]
+    null_sites = [k[0] for k in keys if k[1] is None]
+    conds = []
+    if keyed:
+        conds.append(tuple_(DailySheetRow.site, DailySheetRow.reservation_date).in_(keyed))
+    if null_sites:
+        conds.append(DailySheetRow.site.in_(null_sites) & DailySheetRow.reservation_date.is_(None))
+    return or_(*conds)
+
+def _group_existing_rows(rows):
+    """기존 행 → ({키: 남길 행}, 같은 키로 중복된 나머지 행 목록)
+    예약일 NULL 행은 uix_sheet_site_resvdate가 중복을 막지 못해서 예전 업로드로 여러 개 쌓였을 수 있음 → 하나만 남김"""
+    existing: Dict[tuple, Any] = {}
+    duplicates = []
+    for r in sorted(rows, key=lambda r: r.id):
+        key = (r.site, r.reservation_date)
+        if key in existing:
+            duplicates.append(r)
+        else:
+            existing[key] = r
+    return existing, duplicates
+
+def _upsert_rows(db: Session, rows: List[Dict[str, Any]], ids_by_key: Optional[Dict[tuple, int]] = None) -> None:
+    """
+    INSERT ... ON CONFLICT (uix_sheet_site_resvdate) DO UPDATE 로 일괄 반영.
+    예약일이 NULL인 행은 ON CONFLICT가 걸리지 않으므로 기존 행 id(ids_by_key)로 UPDATE, 없으면 INSERT
+    """
+    table = DailySheetRow.__table__
+    ids_by_key = ids_by_key or {}
+    update_cols = [ROW_COLUMN_KEYS[attr] for attr in ROW_UPDATE_ATTRS]
+    keyed = [_row_columns(v) for v in rows if v["reservation_date"] is not None]
+    for i in range(0, len(keyed), UPSERT_CHUNK_SIZE):
+        stmt = pg_insert(table).values(keyed[i:i + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uix_sheet_site_resvdate",
+            set_={table.c[col]: stmt.excluded[col] for col in update_cols},
+        )
+        db.execute(stmt)
+    new_rows = []
+    for v in rows:
+        if v["reservation_date"] is not None:
+            continue
+        row_id = ids_by_key.get((v["site"], None))
+        cols = _row_columns(v)
+        if row_id is None:
+            new_rows.append(cols)
+        else:
+            db.execute(update(table).where(table.c.id == row_id).values({col: cols[col] for col in update_cols}))
+    if new_rows:
+        db.execute(insert(table), new_rows)
+
+def _sync_sheet_rows(db: Session, date_obj, incoming: Dict[tuple, Dict[str, Any]], load_existing: bool = True):
+    """
+    저장된 행과 업로드 행을 (site, reservation_date) 키로 비교해
+    필요한 INSERT/UPDATE/DELETE만 실행하고 (건수, 변경 목록[(op, key)])을 반환.
+    """
+    existing: Dict[tuple, DailySheetRow] = {}
+    duplicates: List[DailySheetRow] = []
+    if load_existing:
+        existing, duplicates = _group_existing_rows(
+            db.query(DailySheetRow).filter(DailySheetRow.sheet_date == date_obj).all()
+        )
+
+    to_upsert = []
+    inserted = updated = unchanged = 0
+    for key, values in incoming.items():
+        cur = existing.get(key)
+        if cur is None:
+            inserted += 1
+            to_upsert.append(values)
+        elif cur.row_hash != values["row_hash"]:
+            updated += 1
+            to_upsert.append(values)
+        else:
+            unchanged += 1
+    deleted_keys = [key for key in existing if key not in incoming]
+    delete_ids = [existing[key].id for key in deleted_keys] + [r.id for r in duplicates]
+
+    if delete_ids:
+        db.execute(delete(DailySheetRow).where(DailySheetRow.id.in_(delete_ids)))
+    if to_upsert:
+        _upsert_rows(db, to_upsert, {key: r.id for key, r in existing.items()})
+    changes = [("upsert", (v["site"], v["reservation_date"])) for v in to_upsert]
+    changes += [("delete", key) for key in deleted_keys]
+    counts = {"inserted": inserted, "updated": updated, "deleted": len(delete_ids), "unchanged": unchanged}
+    return counts, changes
+
+# ------------------ 행 변경 로그 (delta 조회용) ------------------
+CHANGE_LOG_KEEP_VERSIONS = int(os.environ.get("CHANGE_LOG_KEEP_VERSIONS", "200"))
+
+def _record_sheet_changes(db: Session, sheet: DailySheet, prev_version: int, changes) -> None:
+    """
+    sheet.version(이미 증가된 값)으로 변경 목록을 daily_sheet_changes에 기록하고
+    CHANGE_LOG_KEEP_VERSIONS보다 오래된 로그는 정리(compaction)
+    같은 트랜잭션에서 저장 알림(NOTIFY)도 보냄 → 커밋되면 다른 워커의 응답 캐시 무효화
+    """
+    db.execute(_notify_sheet_saved_sql(sheet.date, sheet.version))
+    if sheet.changes_since_version is None:
+        # 이 날짜의 로그는 지금부터 시작
+        sheet.changes_since_version = prev_version
+    if changes:
+        db.execute(insert(DailySheetChange), [
+            {"sheet_date": sheet.date, "version": sheet.version, "site": key[0], "reservation_date": key[1], "op": op}
+            for op, key in changes
+        ])
+    floor = sheet.version - CHANGE_LOG_KEEP_VERSIONS
+    if floor > sheet.changes_since_version:
+        db.execute(delete(DailySheetChange).where(
+            DailySheetChange.sheet_date == sheet.date,
+            DailySheetChange.version <= floor,
+        ))
+        sheet.changes_since_version = floor
+
+def _reset_sheet_changes(db: Session, sheet: DailySheet) -> None:
+    # 시트 전체가 다시 쓰인 경우: 로그로 표현할 수 없으므로 비우고 현재 version부터 다시 시작
+    db.execute(delete(DailySheetChange).where(DailySheetChange.sheet_date == sheet.date))
+    sheet.changes_since_version = sheet.version
+    db.execute(_notify_sheet_saved_sql(sheet.date, sheet.version))
+
+def _is_unchanged_upload(sheet: DailySheet, new_hash: str, payload, e10) -> bool:
+    """행 해시와 표시 메타(headers/stats/optionCols/e10)가 모두 같으면 재업로드로 판단.
+    top은 스크랩 시각(updated_at)이 매번 바뀌므로 비교하지 않음."""
+    if not new_hash or sheet.sheet_hash != new_hash:
+        return False
+    return (
+        sheet.headers == payload.headers
+        and sheet.stats == payload.stats
+        and sheet.option_cols == payload.optionCols
+        and sheet.e10 == e10
+    )
+
+def _incoming_rows(date_obj, row_models, where: str) -> Dict[tuple, Dict[str, Any]]:
+    """검증된 행 모델 목록 → {(site, reservation_date): 컬럼 값 dict}"""
+    incoming: Dict[tuple, Dict[str, Any]] = {}
+    for row_model in row_models:
+        row_dict = row_model.model_dump(by_alias=True)
+        values = _row_values_from_payload(date_obj, row_dict)
+        key = (values["site"], values["reservation_date"])
+        if key in incoming:
+            # uix_sheet_site_resvdate 중복: 마지막 행 우선
+            logging.warning(f"{where} {date_obj}: 중복 행 키 {key} → 마지막 행으로 대체")
+        incoming[key] = values
+    return incoming
+
 # ------------------ 예약표 저장 (전체) ------------------
+def _parse_sheet_date(date):
+    # asyncpg는 DATE 파라미터에 문자열을 받지 않으므로 datetime.date로 변환
+    try:
+        from datetime import date as _date
+        if isinstance(date, str):
+            return _date.fromisoformat(date_key(date))
+        return date
+    except Exception:
+        raise HTTPException(status_code=400, detail="date 형식 오류, YYYY-MM-DD 필요")
+
 @app.post("/api/update-daily-sheet")
-async def update_daily_sheet(request: Request, db: Session = Depends(get_db)):
+async def update_daily_sheet(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         raw_body = await request.json()
         e10 = raw_body.get("e10", True)  # 프론트에서 넘어오지 않으면 True
@@ -516,17 +1207,18 @@ async def update_daily_sheet(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=422, detail=f"유효성 검증 실패: {e}")
 
     # Normalize date to actual date object to match DB DATE columns
-    try:
-        from datetime import date as _date
-        if isinstance(date, str):
-            date_obj = _date.fromisoformat(date)
-        else:
-            date_obj = date
-    except Exception:
-        raise HTTPException(status_code=400, detail="date 형식 오류, YYYY-MM-DD 필요")
+    date_obj = _parse_sheet_date(date)
+    incoming = _incoming_rows(date_obj, payload.sheet, "update_daily_sheet")
+
+    # 저장될 값 기준 행 해시의 조합 (patch_single_row의 증분 갱신과 같은 방식)
+    new_hash = combine_row_hashes(v["row_hash"] for v in incoming.values())
 
     # Upsert sheet metadata
-    sheet = db.get(DailySheet, date_obj)
+    # 시트 행을 잠근 뒤에 no-op/version 검사 → 동시 저장이 같은 version을 두 번 만들거나 해시 증분을 잃지 않도록
+    sheet = await db.get(DailySheet, date_obj, with_for_update=True)
+    if sheet and _is_unchanged_upload(sheet, new_hash, payload, e10):
+        # 동일 시트 재업로드: 쓰기/버전 증가 없이 종료 (클라이언트 재로딩 방지)
+        return {"ok": True, "unchanged": True, "version": sheet.version, "sheet_hash": sheet.sheet_hash}
     if sheet:
         if sheet.version != payload.version:
             return JSONResponse({"error": "버전 불일치 (다른 사용자가 먼저 저장)", "current_version": sheet.version}, status_code=409)
@@ -537,9 +1229,8 @@ async def update_daily_sheet(request: Request, db: Session = Depends(get_db)):
         sheet.headers = payload.headers
         sheet.stats = payload.stats
         sheet.option_cols = payload.optionCols
-        # 기존 row 삭제 후 재삽입
-        db.query(DailySheetRow).filter(DailySheetRow.sheet_date == date_obj).delete()
         sheet.e10 = e10
+        is_existing = True
     else:
         # 신규 생성 경로
         sheet = DailySheet(
@@ -553,83 +1244,166 @@ async def update_daily_sheet(request: Request, db: Session = Depends(get_db)):
             e10=e10
         )
         db.add(sheet)
-        db.flush()
+        try:
+            await db.flush()
+        except IntegrityError:
+            # 같은 날짜를 동시에 처음 저장 → 먼저 만든 쪽이 이김
+            await db.rollback()
+            return JSONResponse({"error": "버전 불일치 (다른 사용자가 먼저 저장)", "current_version": 1}, status_code=409)
+        is_existing = False
+
+    # 행 diff/upsert 헬퍼는 동기 Session용이라 run_sync로 실행 (asyncpg 위에서 그대로 동작)
+    counts, changes = await db.run_sync(_sync_sheet_rows, date_obj, incoming, is_existing)
+    await db.run_sync(lambda s: _record_sheet_changes(s, sheet, sheet.version - 1 if is_existing else 0, changes))
+
+    sheet.sheet_hash = new_hash
+    await db.commit()
+    sheet_cache.invalidate(date)
+    _publish_sheet_change(date, sheet, changes)
+    return {"ok": True, "unchanged": False, "version": sheet.version, "sheet_hash": sheet.sheet_hash, **counts}
+
+# ------------------ 예약표 저장 (delta) ------------------
+@app.post("/api/daily-sheet/delta")
+async def apply_daily_sheet_delta(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    바뀐 행만 반영 (day.py delta 업로드). version 검사는 전체 저장과 동일.
+    body: {"date", "version", "upserted": [행...], "deleted": [{"사이트", "예약일"}...],
+           "top"?, "headers"?, "stats"?, "optionCols"?, "e10"?}
+    시트가 아직 없으면 404 → 클라이언트는 전체 업로드로 대체
+    """
+    try:
+        raw_body = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="JSON 파싱 오류")
+    date = raw_body.get("date")
+    if not date:
+        raise HTTPException(status_code=400, detail="date 필드 필요")
+    if raw_body.get("version") is None:
+        raise HTTPException(status_code=428, detail="version(현재 파일 버전) 필요")
+    deleted = raw_body.get("deleted") or []
+    if not isinstance(deleted, list) or any(not isinstance(d, dict) or not d.get("사이트") for d in deleted):
+        raise HTTPException(status_code=400, detail="deleted는 {사이트, 예약일} 목록이어야 함")
 
-    sheet_serializable = []
-    for row_model in payload.sheet:
-        row_dict = row_model.model_dump(by_alias=True)
-        sheet_serializable.append(row_dict)
+    date_obj = _parse_sheet_date(date)
+    # version 검사~증가/해시 갱신까지 시트 행 잠금 (동시 저장 직렬화)
+    sheet = await db.get(DailySheet, date_obj, with_for_update=True)
+    if not sheet:
+        raise HTTPException(status_code=404, detail="파일 없음")
+    if sheet.version != raw_body["version"]:
+        return JSONResponse({"error": "버전 불일치 (다른 사용자가 먼저 저장)", "current_version": sheet.version}, status_code=409)
 
-        # convert reservation_date string to date where applicable
-        resv = row_dict.get("예약일")
-        try:
-            from datetime import date as _date
-            if isinstance(resv, str) and resv:
-                resv_val = _date.fromisoformat(resv)
-            else:
-                resv_val = resv
-        except Exception:
-            resv_val = row_dict.get("예약일")
-
-    # Per-row debug info removed (was used during type troubleshooting)
-
-        # Normalize list/array-like fields so they match DB column types (text[])
-        def _normalize_list_field(v):
-            # None -> empty list
-            if v is None:
-                return []
-            # already a list
-            if isinstance(v, list):
-                return [str(x) for x in v]
-            # JSON encoded string like '["a","b"]'
-            if isinstance(v, str):
-                s = v.strip()
-                if s == "" or s.lower() == "null":
-                    return []
-                try:
-                    parsed = json.loads(s)
-                    if isinstance(parsed, list):
-                        return [str(x) for x in parsed]
-                except Exception:
-                    # fallback: split on newlines
-                    return [part.strip() for part in s.split("\n") if part.strip()]
-            # fallback: single value -> list
-            return [str(v)]
-
-        manage_memo_norm = _normalize_list_field(row_dict.get("관리메모"))
-        together_sites_norm = _normalize_list_field(row_dict.get("같이온사이트"))
-    # Normalized list fields (manage_memo / together_sites) will be passed as Python lists
-
-        # Ensure we explicitly pass a datetime.date for sheet_date
-        row_obj = DailySheetRow(
-            sheet_date=date_obj,
-            site=row_dict.get("사이트", ""),
-            status=row_dict.get("상태"),
-            customer_name=row_dict.get("고객명"),
-            phone=row_dict.get("연락처"),
-            people=row_dict.get("예약 인원"),
-            car=row_dict.get("차량"),
-            reservation_date=resv_val,
-            현장결제금액=row_dict.get("현장결제 금액"),
-            선결제금액=row_dict.get("선결제 금액"),
-            총이용료=row_dict.get("총 이용료"),
-            관리메모=manage_memo_norm,
-            요청사항=row_dict.get("요청사항"),
-            circled=row_dict.get("circled"),
-            같이온사이트=together_sites_norm,
-            custom=row_dict.get("__custom"),
-            original=row_dict.get("__original"),
-            history=row_dict.get("__history"),
+    # 표시 메타는 보낸 것만 갱신, 행은 전체 저장과 같은 모델로 검증/정규화 (row_hash가 같게 나오도록)
+    try:
+        payload = DailySheetUpdatePayload(
+            date=date,
+            version=raw_body["version"],
+            top=raw_body.get("top", sheet.top),
+            headers=raw_body.get("headers", sheet.headers),
+            stats=raw_body.get("stats", sheet.stats),
+            optionCols=raw_body.get("optionCols", sheet.option_cols),
+            sheet=raw_body.get("upserted") or [],
         )
-        db.add(row_obj)
-
-    sheet.sheet_hash = compute_sheet_hash(sheet_serializable)
-    db.commit()
-    return {"ok": True, "version": sheet.version, "sheet_hash": sheet.sheet_hash}
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"유효성 검증 실패: {e}")
+    e10 = raw_body.get("e10", sheet.e10)
+    incoming = _incoming_rows(date_obj, payload.sheet, "apply_daily_sheet_delta")
+    deleted_keys = {(d["사이트"], _normalize_resv_date(d.get("예약일"))) for d in deleted} - set(incoming)
+
+    existing: Dict[tuple, Any] = {}
+    duplicates: List[Any] = []
+    keys = list(set(incoming) | deleted_keys)
+    if keys:
+        result = await db.execute(
+            select(DailySheetRow.id, DailySheetRow.site, DailySheetRow.reservation_date, DailySheetRow.row_hash).where(
+                DailySheetRow.sheet_date == date_obj,
+                _row_key_filter(keys),
+            )
+        )
+        existing, duplicates = _group_existing_rows(result.all())
+
+    to_upsert = []
+    removed_hashes, added_hashes = [], []
+    inserted = updated = unchanged = 0
+    for key, values in incoming.items():
+        cur = existing.get(key)
+        if cur is not None and cur.row_hash == values["row_hash"]:
+            unchanged += 1
+            continue
+        if cur is None:
+            inserted += 1
+        else:
+            updated += 1
+            removed_hashes.append(cur.row_hash)
+        added_hashes.append(values["row_hash"])
+        to_upsert.append(values)
+    delete_rows = [existing[key] for key in deleted_keys if key in existing]
+    # 같은 키 중복 행(예약일 NULL)은 정리만 하고 변경 로그에는 남기지 않음 (키는 그대로 존재)
+    removed_hashes += [r.row_hash for r in delete_rows + duplicates]
+
+    meta_changed = not (
+        sheet.headers == payload.headers
+        and sheet.stats == payload.stats
+        and sheet.option_cols == payload.optionCols
+        and sheet.e10 == e10
+    )
+    if not to_upsert and not delete_rows and not duplicates and not meta_changed:
+        return {"ok": True, "unchanged": True, "version": sheet.version, "sheet_hash": sheet.sheet_hash}
+
+    sheet.version += 1
+    sheet.updated_at = datetime.utcnow()
+    sheet.top = payload.top
+    sheet.headers = payload.headers
+    sheet.stats = payload.stats
+    sheet.option_cols = payload.optionCols
+    sheet.e10 = e10
+
+    if delete_rows or duplicates:
+        await db.execute(delete(DailySheetRow).where(DailySheetRow.id.in_([r.id for r in delete_rows + duplicates])))
+    if to_upsert:
+        await db.run_sync(_upsert_rows, to_upsert, {key: r.id for key, r in existing.items()})
+    sheet.sheet_hash = await db.run_sync(_next_sheet_hash, sheet.sheet_hash, date_obj, removed_hashes, added_hashes)
+
+    changes = [("upsert", (v["site"], v["reservation_date"])) for v in to_upsert]
+    changes += [("delete", (r.site, r.reservation_date)) for r in delete_rows]
+    await db.run_sync(lambda s: _record_sheet_changes(s, sheet, sheet.version - 1, changes))
+    await db.commit()
+    sheet_cache.invalidate(date)
+    _publish_sheet_change(date, sheet, changes)
+    return {
+        "ok": True, "unchanged": False, "version": sheet.version, "sheet_hash": sheet.sheet_hash,
+        "inserted": inserted, "updated": updated, "deleted": len(delete_rows) + len(duplicates), "unchanged_rows": unchanged,
+    }
 
 # ------------------ 예약표 partial PATCH ------------------
+def _standardize_memos(new_val) -> List[str]:
+    # 관리메모: 항상 리스트로 표준화
+    if isinstance(new_val, list):
+        return [str(v).strip() for v in new_val if str(v).strip()]
+    if new_val is None:
+        return []
+    txt = str(new_val).strip()
+    return [s.strip() for s in txt.split("\n") if s.strip()] if "\n" in txt else ([txt] if txt else [])
+
+def _apply_row_update(row: DailySheetRow, update_data: Dict[str, Any]):
+    """행 하나에 update를 적용하고 (changed_cols, 적재할 메모 작업 값 또는 None)을 반환"""
+    changed_cols = []
+    memo_item = None
+    if "관리메모" in update_data:
+        std_memos = _standardize_memos(update_data["관리메모"])
+        if row.관리메모 != std_memos:
+            row.관리메모 = std_memos
+            changed_cols.append("관리메모")
+        # E10 사이트는 메모 큐 적재/싱크 제외, 그 외는 메모 큐에 적재(이전 버전 동작 유지)
+        if row.site != "E10":
+            memo_item = _memo_values(
+                row.site, row.reservation_date, row.customer_name, row.phone,
+                "\n".join(std_memos), "replace",
+            )
+    return changed_cols, memo_item
+
+
 @app.patch("/api/daily-sheet/row")
-async def patch_single_row(request: Request, db: Session = Depends(get_db)):
+async def patch_single_row(request: Request, db: AsyncSession = Depends(get_async_db)):
     body = await request.json()
     date = body.get("date")
     version = body.get("version")
@@ -642,109 +1416,41 @@ async def patch_single_row(request: Request, db: Session = Depends(get_db)):
     if not key_site or not key_resvdate:
         raise HTTPException(status_code=400, detail="key.사이트 / key.예약일 필요")
 
-    sheet = db.get(DailySheet, date)
+    date_obj = _parse_sheet_date(date)
+    # version 검사~증가/해시 갱신까지 시트 행 잠금 (동시 PATCH 직렬화)
+    sheet = await db.get(DailySheet, date_obj, with_for_update=True)
     if not sheet:
         raise HTTPException(status_code=404, detail="파일 없음")
     if version != sheet.version:
         return JSONResponse({"error": "버전 불일치", "current_version": sheet.version}, status_code=409)
 
-    row = db.query(DailySheetRow).filter(
-        DailySheetRow.sheet_date == date,
-        DailySheetRow.site == key_site,
-        DailySheetRow.reservation_date == key_resvdate
-    ).first()
+    row = (await db.execute(
+        select(DailySheetRow).where(
+            DailySheetRow.sheet_date == date_obj,
+            DailySheetRow.site == key_site,
+            DailySheetRow.reservation_date == key_resvdate
+        ).limit(1)
+    )).scalars().first()
     if not row:
         raise HTTPException(status_code=404, detail="행을 찾을 수 없음")
 
-    changed_cols = []
-    # 관리메모: 항상 리스트로 표준화
-    if "관리메모" in update_data:
-        # E10 사이트는 메모 큐 적재/싱크 제외
-        if row.site == "E10":
-            new_val = update_data["관리메모"]
-            if isinstance(new_val, list):
-                std_memos = [str(v).strip() for v in new_val if str(v).strip()]
-            elif new_val is None:
-                std_memos = []
-            else:
-                txt = str(new_val).strip()
-                std_memos = [s.strip() for s in txt.split("\n") if s.strip()] if "\n" in txt else ([txt] if txt else [])
-            if row.관리메모 != std_memos:
-                row.관리메모 = std_memos
-                changed_cols.append("관리메모")
-            # 메모 큐 적재는 하지 않음
-        else:
-            new_val = update_data["관리메모"]
-            if isinstance(new_val, list):
-                std_memos = [str(v).strip() for v in new_val if str(v).strip()]
-            elif new_val is None:
-                std_memos = []
-            else:
-                txt = str(new_val).strip()
-                std_memos = [s.strip() for s in txt.split("\n") if s.strip()] if "\n" in txt else ([txt] if txt else [])
-            if row.관리메모 != std_memos:
-                row.관리메모 = std_memos
-                changed_cols.append("관리메모")
-            # 메모 큐에 적재(이전 버전 동작 유지)
-            db.add(MemoQueue(
-                id=uuid.uuid4(),
-                site=row.site,
-                reservation_date=row.reservation_date,
-                customer_name=row.customer_name,
-                phone=row.phone,
-                memo="\n".join(std_memos),
-                mode="replace",
-                status="pending",
-                tries=0,
-            ))
+    changed_cols, memo_item = _apply_row_update(row, update_data)
+    if memo_item is not None:
+        await _enqueue_memos(db, [memo_item])
 
     if changed_cols:
         sheet.version += 1
         sheet.updated_at = datetime.utcnow()
-        # sheet_hash 다시 계산
-        rows = db.query(DailySheetRow).filter(DailySheetRow.sheet_date == date).all()
-        row_dicts = []
-        for r in rows:
-            row_dicts.append({
-                "사이트": r.site,
-                "상태": r.status,
-                "고객명": r.customer_name,
-                "연락처": r.phone,
-                "예약 인원": r.people,
-                "차량": r.car,
-                "예약일": r.reservation_date,
-                "현장결제 금액": r.현장결제금액,
-                "선결제 금액": r.선결제금액,
-                "총 이용료": r.총이용료,
-                "관리메모": r.관리메모,
-                "요청사항": r.요청사항,
-                "circled": r.circled,
-                "같이온사이트": r.같이온사이트,
-                "__custom": r.custom,
-                "__original": r.original,
-                "__history": r.history,
-            })
-        sheet.sheet_hash = compute_sheet_hash(row_dicts)
-        db.commit()
-        updated_row = {
-            "사이트": row.site,
-            "상태": row.status,
-            "고객명": row.customer_name,
-            "연락처": row.phone,
-            "예약 인원": row.people,
-            "차량": row.car,
-            "예약일": row.reservation_date,
-            "현장결제 금액": row.현장결제금액,
-            "선결제 금액": row.선결제금액,
-            "총 이용료": row.총이용료,
-            "관리메모": row.관리메모,
-            "요청사항": row.요청사항,
-            "circled": row.circled,
-            "같이온사이트": row.같이온사이트,
-            "__custom": row.custom,
-            "__original": row.original,
-            "__history": row.history
-        }
+        # sheet_hash 증분 갱신: 바뀐 행만 다시 해시
+        old_row_hash = row.row_hash
+        updated_row = _row_to_dict(row)
+        row.row_hash = compute_row_hash(updated_row)
+        sheet.sheet_hash = await db.run_sync(_next_sheet_hash, sheet.sheet_hash, date_obj, [old_row_hash], [row.row_hash])
+        changes = [("upsert", (row.site, row.reservation_date))]
+        await db.run_sync(lambda s: _record_sheet_changes(s, sheet, sheet.version - 1, changes))
+        await db.commit()
+        sheet_cache.invalidate(date)
+        _publish_sheet_change(date, sheet, changes)
         # 메모 편집 신호를 받는 프런트에 예약 정보 제공을 위해 memo-edit-touch는 클라이언트에서 호출
         return {
             "ok": True,
@@ -754,14 +1460,138 @@ async def patch_single_row(request: Request, db: Session = Depends(get_db)):
             "sheet_hash": sheet.sheet_hash
         }
 
-    db.commit()
+    await db.commit()
     return {"ok": True, "version": sheet.version, "changed_cols": []}
 
+@app.patch("/api/daily-sheet/rows")
+async def patch_rows_batch(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    여러 행을 한 트랜잭션으로 수정 (version 증가/sheet_hash 갱신은 1회)
+    body: {"date", "version", "items": [{"key": {"사이트", "예약일"}, "update": {...}}, ...]}
+    """
+    try:
+        body = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="JSON 파싱 오류")
+    date = body.get("date")
+    version = body.get("version")
+    items = body.get("items") or []
+    if not date or version is None:
+        raise HTTPException(status_code=400, detail="date, version 필수")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="items 필요")
+
+    date_obj = _parse_sheet_date(date)
+    # version 검사~증가/해시 갱신까지 시트 행 잠금 (동시 PATCH 직렬화)
+    sheet = await db.get(DailySheet, date_obj, with_for_update=True)
+    if not sheet:
+        raise HTTPException(status_code=404, detail="파일 없음")
+    if version != sheet.version:
+        return JSONResponse({"error": "버전 불일치", "current_version": sheet.version}, status_code=409)
+
+    keys = set()
+    for item in items:
+        key = (item or {}).get("key") or {}
+        if key.get("사이트") and key.get("예약일"):
+            keys.add((key["사이트"], key["예약일"]))
+    rows_by_key: Dict[tuple, DailySheetRow] = {}
+    if keys:
+        result = await db.execute(
+            select(DailySheetRow).where(
+                DailySheetRow.sheet_date == date_obj,
+                tuple_(DailySheetRow.site, DailySheetRow.reservation_date).in_(list(keys)),
+            )
+        )
+        rows_by_key = {(r.site, r.reservation_date): r for r in result.scalars().all()}
+
+    results = []
+    old_hashes: Dict[tuple, Optional[str]] = {}
+    memo_items = []
+    for item in items:
+        key = (item or {}).get("key") or {}
+        update_data = (item or {}).get("update") or {}
+        row_key = (key.get("사이트"), key.get("예약일"))
+        if not row_key[0] or not row_key[1]:
+            results.append({"key": key, "ok": False, "error": "key.사이트 / key.예약일 필요"})
+            continue
+        row = rows_by_key.get(row_key)
+        if row is None:
+            results.append({"key": key, "ok": False, "error": "행을 찾을 수 없음"})
+            continue
+        changed_cols, memo_item = _apply_row_update(row, update_data)
+        if memo_item is not None:
+            memo_items.append(memo_item)
+        if changed_cols:
+            old_hashes.setdefault(row_key, row.row_hash)
+        results.append({"key": key, "ok": True, "changed_cols": changed_cols})
+
+    if memo_items:
+        await _enqueue_memos(db, memo_items)
+
+    if old_hashes:
+        sheet.version += 1
+        sheet.updated_at = datetime.utcnow()
+        new_hashes = []
+        for row_key in old_hashes:
+            row = rows_by_key[row_key]
+            row.row_hash = compute_row_hash(_row_to_dict(row))
+            new_hashes.append(row.row_hash)
+        sheet.sheet_hash = await db.run_sync(_next_sheet_hash, sheet.sheet_hash, date_obj, list(old_hashes.values()), new_hashes)
+        changes = [("upsert", row_key) for row_key in old_hashes]
+        await db.run_sync(lambda s: _record_sheet_changes(s, sheet, sheet.version - 1, changes))
+        for res in results:
+            if res.get("changed_cols"):
+                row = rows_by_key[(res["key"]["사이트"], res["key"]["예약일"])]
+                res["updated_row"] = _row_to_dict(row)
+    await db.commit()
+    if old_hashes:
+        sheet_cache.invalidate(date)
+        _publish_sheet_change(date, sheet, changes)
+
+    return {
+        "ok": all(r["ok"] for r in results),
+        "version": sheet.version,
+        "sheet_hash": sheet.sheet_hash,
+        "changed_rows": len(old_hashes),
+        "queued_memos": len(memo_items),
+        "results": results,
+    }
+
 # --------------------------- day.py 실행 ---------------------------
+# 상주 스크래핑 워커(scrape_worker.py) 주소. 설정되어 있으면 day.py 프로세스 대신 워커에 작업 전달
+# 주소는 loopback만, authkey는 필수 (기본값 없음 — 소켓 메시지가 pickle이라 authkey가 곧 코드 실행 권한)
+SCRAPE_WORKER_ADDR = os.environ.get("SCRAPE_WORKER_ADDR")
+SCRAPE_WORKER_AUTHKEY = (os.environ.get("SCRAPE_WORKER_AUTHKEY") or "").encode("utf-8")
+
+def _send_to_scrape_worker(msg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """워커에 메시지 전송. 워커 미설정/미기동이면 None"""
+    if not SCRAPE_WORKER_ADDR:
+        return None
+    if not SCRAPE_WORKER_AUTHKEY:
+        logging.error("SCRAPE_WORKER_ADDR는 있지만 SCRAPE_WORKER_AUTHKEY 미설정 → 워커 사용 안 함")
+        return None
+    from multiprocessing.connection import Client
+    host, _, port = SCRAPE_WORKER_ADDR.rpartition(":")
+    try:
+        with Client((host or "127.0.0.1", int(port)), authkey=SCRAPE_WORKER_AUTHKEY) as conn:
+            conn.send(msg)
+            return conn.recv()
+    except Exception as e:
+        logging.error(f"scrape worker 연결 실패 → day.py 프로세스로 대체: {e}")
+        return None
+
 @app.post("/api/run-day-py")
 async def run_day_py(request: Request):
     global proc
     logging.info("/api/run-day-py called")
+    worker_res = await asyncio.to_thread(_send_to_scrape_worker, {"cmd": "scrape"})
+    if worker_res is not None and worker_res.get("status") == "dead":
+        logging.error(f"scrape worker 작업 스레드 중단 → day.py 프로세스로 대체: {worker_res.get('error')}")
+        worker_res = None
+    if worker_res is not None:
+        if not worker_res.get("ok"):
+            return JSONResponse(content={"status": "이미 실행 중", "worker": True}, status_code=409)
+        return {"status": "실행 시작", "worker": True}
     with proc_lock:
         if proc and proc.poll() is None:
             return JSONResponse(content={"status": "이미 실행 중"}, status_code=409)
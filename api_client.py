@@ -0,0 +1,94 @@
+"""
+day.py → API 서버 HTTP 클라이언트 (연결 재사용 + 재시도 + gzip 업로드).
+
+- 모듈 전역 requests.Session 하나를 공유 → keep-alive로 매 요청 TCP/TLS 연결 비용 제거
+  (병렬 수집 스레드에서 같이 써도 되도록 커넥션 풀 크기를 SCRAPE_POOL_SIZE보다 넉넉하게)
+- 연결 실패는 모든 요청, 읽기 타임아웃/502·503·504는 GET/HEAD만 지수 백오프로 최대 API_RETRIES회 재시도
+  (POST/PATCH 업로드는 서버가 이미 커밋했을 수 있음 → 다시 보내면 자기 저장과 409 충돌 → 병합/재업로드/충돌 백업.
+   요청이 서버에 닿기 전인 연결 실패만 재시도하고, 나머지는 호출한 쪽이 version을 다시 확인해서 판단)
+- API_GZIP_MIN_BYTES 이상인 JSON 본문은 gzip으로 압축해서 전송 (서버의 GzipRequestMiddleware가 해제)
+- 버전 조회는 시트 전체 대신 /api/daily-sheet/meta 사용
+
+환경 변수:
+    API_BASE            기본 http://localhost:8000
+    API_RETRIES         기본 3
+    API_BACKOFF         기본 0.5 (초, 0.5 → 1 → 2 ...)
+    API_GZIP_MIN_BYTES  기본 1024 (0이면 압축 안 함)
+"""
+import gzip
+import json
+import logging
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE = os.environ.get("API_BASE", "http://localhost:8000")
+API_RETRIES = int(os.environ.get("API_RETRIES", "3"))
+API_BACKOFF = float(os.environ.get("API_BACKOFF", "0.5"))
+API_GZIP_MIN_BYTES = int(os.environ.get("API_GZIP_MIN_BYTES", "1024"))
+
+
+def _build_session():
+    retry = Retry(
+        total=API_RETRIES,
+        connect=API_RETRIES,
+        read=API_RETRIES,
+        status=API_RETRIES,
+        backoff_factor=API_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        # 읽기/상태 재시도는 멱등 요청만 (연결 재시도는 요청을 보내기 전이라 메서드와 무관)
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    s = requests.Session()
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers.update({"Accept-Encoding": "gzip"})
+    return s
+
+
+session = _build_session()
+
+
+def api_url(path):
+    return f"{API_BASE}{path}"
+
+
+def get(path, **kwargs):
+    kwargs.setdefault("timeout", 10)
+    return session.get(api_url(path), **kwargs)
+
+
+def post_json(path, payload, timeout=20, **kwargs):
+    """JSON 본문을 (크면 gzip으로) POST"""
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if API_GZIP_MIN_BYTES > 0 and len(body) >= API_GZIP_MIN_BYTES:
+        raw_len = len(body)
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+        logging.debug(f"POST {path} gzip {raw_len} -> {len(body)} bytes")
+    headers.update(kwargs.pop("headers", {}) or {})
+    return session.post(api_url(path), data=body, headers=headers, timeout=timeout, **kwargs)
+
+
+def post_file(path, file_path, field="file", timeout=30):
+    with open(file_path, "rb") as f:
+        return session.post(api_url(path), files={field: f}, timeout=timeout)
+
+
+def fetch_sheet_version(date_str):
+    """서버의 현재 시트 version (시트가 없으면 0, 조회 실패 시에도 0)"""
+    try:
+        r = get("/api/daily-sheet/meta", params={"date": date_str}, timeout=8)
+        if r.status_code == 404:
+            return 0
+        if r.ok:
+            return r.json().get("version", 0) or 0
+        logging.error(f"{date_str} 버전 조회 실패: HTTP {r.status_code}")
+    except Exception as e:
+        logging.error(f"{date_str} 버전 조회 실패: {e}")
+    return 0
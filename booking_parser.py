@@ -0,0 +1,227 @@
+"""
+예약표 HTML 파서 (WebDriver 없이 동작).
+
+- day.py가 저장하는 page_source(dom_source_*.html)나 표 outerHTML(dom_table_sample_*.html)을
+  extract_reservation_data와 같은 (headers, rows)로 변환
+- 표 셀 텍스트는 innerText와 비슷하게 만듦: 소스 공백은 하나로 접고, <br>/블록 태그 경계는 줄바꿈, &nbsp;는 공백
+- day.py의 EXTRACT_MODE=html에서도 사용 (화면이 안정된 뒤 page_source를 한 번만 받아서 로컬 파싱)
+
+    python booking_parser.py /app/dom_source_2025-09-28_first.html
+"""
+import json
+import re
+import sys
+from html.parser import HTMLParser
+
+BOOKING_HEADERS = [
+    "사이트","상태","고객명","연락처",
+    "예약 인원","차량","예약일",
+    "현장결제 금액","선결제 금액","총 이용료","관리메모","요청사항"
+]
+
+# 이 태그 앞뒤에서 innerText가 줄을 바꿈
+_BLOCK_TAGS = {"div", "p", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "header", "footer"}
+_WS_RE = re.compile(r"[ \t\r\n\f]+")
+
+
+def _has_class(attrs, name):
+    for k, v in attrs:
+        if k == "class" and v and name in v.split():
+            return True
+    return False
+
+
+def _cell_text(parts):
+    """모은 조각 → innerText 근사값 (줄 단위로 공백 정리)"""
+    text = "".join(parts).replace("\u00a0", " ")
+    lines = [_WS_RE.sub(" ", line).strip() for line in text.split("\n")]
+    # 블록 경계가 겹쳐 생긴 빈 줄 제거
+    out = []
+    for line in lines:
+        if line or (out and out[-1]):
+            out.append(line)
+    return "\n".join(out).strip("\n")
+
+
+class _BookingTableParser(HTMLParser):
+    """첫 table.table-bordered(없으면 첫 table)의 tbody tr → [{cls, cells}]"""
+
+    def __init__(self, table_class="table-bordered"):
+        super().__init__(convert_charrefs=True)
+        self.table_class = table_class
+        self.tables = {}          # 후보 표 → tr 목록 ("bordered" / "first")
+        self._stack = []          # 현재 열린 표의 상태들 (중첩 표 대비)
+        self._done = False
+
+    # 표 하나의 파싱 상태
+    def _new_state(self, key):
+        return {"key": key, "in_tbody": False, "tr": None, "td": None, "depth": 0, "rows": []}
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        if tag == "table":
+            bordered = _has_class(attrs, self.table_class) and "bordered" not in self.tables
+            if self._stack and not (bordered and all(st["key"] != "bordered" for st in self._stack)):
+                self._stack[-1]["depth"] += 1
+                return
+            if bordered:
+                self._stack.append(self._new_state("bordered"))
+            elif "first" not in self.tables:
+                self._stack.append(self._new_state("first"))
+            else:
+                self._stack.append(self._new_state(None))
+            return
+        if not self._stack:
+            return
+        st = self._stack[-1]
+        if st["depth"]:
+            # 셀 안의 중첩 표: 텍스트만 셀에 포함
+            if st["td"] is not None and (tag in ("tr", "br") or tag in _BLOCK_TAGS):
+                st["td"].append("\n")
+            return
+        if tag == "tbody":
+            st["in_tbody"] = True
+        elif tag == "tr" and st["in_tbody"]:
+            cls = ""
+            for k, v in attrs:
+                if k == "class":
+                    cls = v or ""
+            st["tr"] = {"cls": cls, "cells": []}
+        elif tag in ("td", "th") and st["tr"] is not None:
+            st["td"] = []
+        elif st["td"] is not None:
+            if tag == "br" or tag in _BLOCK_TAGS:
+                st["td"].append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self._done or not self._stack:
+            return
+        st = self._stack[-1]
+        if tag == "table":
+            if st["depth"]:
+                st["depth"] -= 1
+                return
+            self._close_td(st)
+            self._close_tr(st)
+            self._stack.pop()
+            if st["key"]:
+                self.tables[st["key"]] = st["rows"]
+            if "bordered" in self.tables:
+                self._done = True
+            return
+        if st["depth"]:
+            return
+        if tag in ("td", "th"):
+            self._close_td(st)
+        elif tag == "tr":
+            self._close_tr(st)
+        elif tag == "tbody":
+            self._close_td(st)
+            self._close_tr(st)
+            st["in_tbody"] = False
+        elif st["td"] is not None and tag in _BLOCK_TAGS:
+            st["td"].append("\n")
+
+    def handle_data(self, data):
+        if self._stack and self._stack[-1]["td"] is not None:
+            self._stack[-1]["td"].append(data)
+
+    def _close_td(self, st):
+        if st["td"] is not None and st["tr"] is not None:
+            st["tr"]["cells"].append(_cell_text(st["td"]))
+        st["td"] = None
+
+    def _close_tr(self, st):
+        if st["tr"] is not None:
+            st["rows"].append(st["tr"])
+        st["tr"] = None
+
+    def result(self):
+        # 닫히지 않은 표(잘린 소스)도 모은 만큼은 사용
+        for st in reversed(self._stack):
+            self._close_td(st)
+            self._close_tr(st)
+            if st["key"] and st["key"] not in self.tables:
+                self.tables[st["key"]] = st["rows"]
+        if "bordered" in self.tables:
+            return self.tables["bordered"]
+        return self.tables.get("first")
+
+
+def parse_table_cells(html):
+    """HTML → tr별 [{cls, cells}] (표가 없으면 None)"""
+    parser = _BookingTableParser()
+    parser.feed(html)
+    parser.close()
+    return parser.result()
+
+
+def build_booking_rows(tr_cells):
+    """tr별 {cls, cells} 목록 → 예약 row dict 목록 (본 행 + text-muted 관리메모/요청사항 보조 행)"""
+    rows = []
+    i = 0
+    while i < len(tr_cells):
+        cells = tr_cells[i]["cells"]
+        if len(cells) >= 11:
+            raw_site = cells[0].strip()
+            site = raw_site.split('>')[-1].replace("애견존","").strip() if '>' in raw_site else raw_site.replace("애견존","").strip()
+            texts = [c.strip().replace("포함","").strip() for c in cells]
+            status_raw = texts[1]
+            if "이용중" in status_raw: status="이용중"
+            elif "체크인" in status_raw: status="체크인"
+            elif "체크아웃" in status_raw: status="체크아웃"
+            else: status=""
+            row = {
+                "사이트": site,
+                "상태": status,
+                "고객명": texts[2],
+                "연락처": texts[3],
+                "예약 인원": texts[4],
+                "차량": texts[5],
+                "예약일": texts[6],
+                "현장결제 금액": texts[7],
+                "선결제 금액": texts[8],
+                "총 이용료": texts[10],
+                "관리메모": [],
+                "요청사항": ""
+            }
+            j = i+1
+            while j < len(tr_cells):
+                next_tr = tr_cells[j]
+                next_cells = next_tr["cells"]
+                if len(next_cells) >= 3 and 'text-muted' in (next_tr.get("cls") or ""):
+                    label = next_cells[1].strip()
+                    value = next_cells[2].strip()
+                    if "관리메모" in label:
+                        # 관리메모는 항상 리스트로 변환, 여러 줄 메모는 줄바꿈 기준 분리
+                        row["관리메모"] = [s.strip() for s in value.split("\n") if s.strip()]
+                    elif "요청사항" in label:
+                        row["요청사항"] = value
+                    else:
+                        break
+                    j += 1
+                else:
+                    break
+            i = j - 1
+            rows.append(row)
+        i += 1
+    return rows
+
+
+def parse_booking_html(html):
+    """page_source/표 HTML → (headers, rows). 표가 없으면 ValueError"""
+    tr_cells = parse_table_cells(html)
+    if tr_cells is None:
+        raise ValueError("table.table-bordered tbody 없음")
+    return BOOKING_HEADERS[:], build_booking_rows(tr_cells)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        with open(path, "r", encoding="utf-8") as f:
+            headers, rows = parse_booking_html(f.read())
+        print(json.dumps({"file": path, "rows": len(rows), "sheet": rows}, ensure_ascii=False, indent=2))
@@ -10,11 +10,16 @@ import traceback
 from datetime import datetime, timedelta
 import atexit
 import requests
+import requests.adapters
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from nas_backup import save_json_with_backup
+from booking_parser import BOOKING_HEADERS, build_booking_rows, parse_table_cells
+import api_client
+import session_cache
+from api_client import fetch_sheet_version
 from selenium.common.exceptions import (
     WebDriverException,
     NoSuchElementException,
@@ -30,16 +35,22 @@ import hashlib
 import re
 
 # 환경 변수 및 설정
-API_BASE = os.environ.get("API_BASE", "http://localhost:8000")
+API_BASE = api_client.API_BASE
 NAS_FOLDER = os.environ.get("NAS_FOLDER")
 if not NAS_FOLDER:
     raise RuntimeError("환경변수 NAS_FOLDER가 필요합니다. 예: E:\\ 또는 \\server\\share\\DAY")
 RESTORE_AFTER_SCRAPE = os.environ.get("RESTORE_AFTER_SCRAPE", "0") == "1"
 CHROME_BIN = os.environ.get("CHROME_BIN", r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe")
 CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH", r"C:\\Chrome140\\driver\\chromedriver.exe")
-DAYS_TO_FETCH = 1
+# 오늘부터 며칠치를 수집할지 (1이면 오늘만)
+DAYS_TO_FETCH = max(1, int(os.environ.get("DAYS_TO_FETCH", "1")))
+# 여러 날짜 수집 시 동시에 띄울 브라우저 수 (기본 드라이버 포함)
+SCRAPE_POOL_SIZE = max(1, int(os.environ.get("SCRAPE_POOL_SIZE", "3")))
 LOG_FILE = "camfit_booking_table.log"
 STATUS_FILE = "day_status.json"
+# 날짜별 마지막 업로드 기록 {date: {version, rows_digest, json_path}} — delta 업로드 기준점
+PUSH_STATE_FILE = os.environ.get("PUSH_STATE_FILE", "day_push_state.json")
+DELTA_UPLOAD = os.environ.get("DELTA_UPLOAD", "1") == "1"
 
 logging.basicConfig(
     filename=LOG_FILE,
@@ -58,12 +69,23 @@ try:
     MAX_WAIT_FOR_NEXT_DAY = getattr(_cc, 'MAX_WAIT_FOR_NEXT_DAY', 60)
     STABLE_CHECKS = getattr(_cc, 'STABLE_CHECKS', 2)
     STABLE_INTERVAL = getattr(_cc, 'STABLE_INTERVAL', 1.2)
+    BOOKING_API_URL = getattr(_cc, 'BOOKING_API_URL', None)
 except Exception:
     SPINNER_SELECTORS = [".spinner-border"]
     EMPTY_TEXT_PATTERNS = ["예약이 없습니다", "데이터 없음"]
     MAX_WAIT_FOR_NEXT_DAY = 60
     STABLE_CHECKS = 2
     STABLE_INTERVAL = 1.2
+    BOOKING_API_URL = None
+
+# Camfit 관리자 SPA가 사용하는 예약 JSON 엔드포인트 ({date} 자리에 YYYY-MM-DD 치환)
+# 설정되지 않으면 browser_fetch_bookings는 건너뛰고 DOM 스크래핑만 사용
+BOOKING_API_URL = os.environ.get("CAMFIT_BOOKING_API_URL", BOOKING_API_URL)
+# 로그인 후 SPA가 토큰을 보관하는 localStorage 키 (있으면 Authorization: Bearer 로 전달)
+CAMFIT_TOKEN_STORAGE_KEY = os.environ.get("CAMFIT_TOKEN_STORAGE_KEY", "accessToken")
+# 캠핑장 전체 사이트 수 (상단 요약 "예약 수/전체"의 전체). 0이면 화면 상단 요약을 처음 읽을 때 알아낸 값 사용
+CAMFIT_TOTAL_SITES = int(os.environ.get("CAMFIT_TOTAL_SITES", "0"))
+_site_total = {"count": CAMFIT_TOTAL_SITES}
 
 
 # 상태 관리
@@ -73,6 +95,7 @@ _status = {
     "started_at": None,
     "ended_at": None,
     "processed_dates": [],
+    "days": {},
     "error": None
 }
 
@@ -82,6 +105,8 @@ def set_status_running():
         _status["started_at"] = datetime.utcnow().isoformat()
         _status["ended_at"] = None
         _status["processed_dates"] = []
+        _status["days"] = {}
+        _status["page_load"] = {"profile": SCRAPE_BLOCK_PROFILE, "block_effect": _block_effect, "navigations": []}
         _status["error"] = None
     write_status()
 
@@ -112,6 +137,12 @@ def append_processed(date_str):
             _status["processed_dates"].append(date_str)
     write_status()
 
+def record_day_result(date_str, **info):
+    """날짜별 결과(상태/소요시간/오류/담당 브라우저)를 STATUS_FILE의 days에 기록"""
+    with _status_lock:
+        _status.setdefault("days", {})[date_str] = info
+    write_status()
+
 def save_empty_day(date_for_filename):
     save_to_files(
         headers=[
@@ -136,7 +167,18 @@ def save_empty_day(date_for_filename):
     )
 
 def process_today_sheet(driver, wait, today, prev_day_date, prev_day_map):
-    date_str = today.strftime("%Y-%m-%d")
+    return process_day_sheet(driver, wait, today.strftime("%Y-%m-%d"), prev_day_map)
+
+def process_day_sheet(driver, wait, date_str, prev_day_map, prev_sig=None, upload_empty=True):
+    """
+    현재 화면(또는 API)에서 date_str 예약표를 추출해 저장/업로드.
+    prev_sig: 직전 날짜 표의 서명 (다음 날짜로 넘어온 경우 표가 바뀔 때까지 기다리기 위해)
+    upload_empty: 추출에 끝내 실패했을 때 빈 예약표를 올릴지 (오늘만 True — 기존 동작).
+                  실패 시 빈 업로드는 서버에서 그 날짜 행 전체 삭제가 되므로 이후 날짜는 건너뜀("skipped").
+                  화면이 빈 데이터 표시(EMPTY_TEXT_PATTERNS)를 보여 준 경우("empty")는 실패가 아니라
+                  정말 예약이 없는 날(전부 취소 등)이므로 어느 날짜든 바로 빈 예약표를 올림
+    반환: "simulated" | "api" | "ok" | "empty" | "skipped" | "error"
+    """
     try:
         log_info(f"[day.py] 예약표 추출 시작: {date_str}")
         # 시뮬레이트 모드: 환경변수 SIMULATE_SCRAPE=1 이면 실제 스크랩 대신 더미 데이터를 업로드
@@ -180,26 +222,30 @@ def process_today_sheet(driver, wait, today, prev_day_date, prev_day_map):
                 prev_day_map=prev_day_map,
                 option_cols=None
             )
-            return
+            return "simulated"
         # 실제 스크래핑 로직이 비어 있으면 진단 및 재시도 로직을 넣어 업로드 전에 검증합니다.
         # 드라이버가 세팅되어 있지 않으면 바로 빈 업로드로 처리
         if not driver:
+            if not upload_empty:
+                log_error(f"WebDriver 미설정: {date_str} 업로드 건너뜀")
+                return "skipped"
             log_error("WebDriver 미설정: 실제 스크래핑을 시도할 수 없습니다. 빈 예약표 업로드 예정.")
             save_empty_day(date_str)
-            return
+            return "empty"
 
         # 시도 1: 브라우저 내 fetch를 사용하여 API에서 바로 예약정보를 가져와 본다 (SPA가 사용하는 엔드포인트)
-        prev_sig = None
         try:
             bf_headers, bf_bookings = browser_fetch_bookings(driver, date_str)
             if bf_bookings:
-                log_info(f"{date_str} browser_fetch_bookings succeeded bookings_count={len(bf_bookings)}")
-                save_to_files(headers=bf_headers or [
-                    "사이트","상태","고객명","연락처",
-                    "예약 인원","차량","예약일",
-                    "현장결제 금액","선결제 금액","총 이용료","관리메모","요청사항"
-                ], bookings=bf_bookings, top_summary={"updated_at": datetime.now().strftime("%Y/%m/%d %H:%M"), "display_date": date_str, "booked_count": len(bf_bookings), "total_count": len(bf_bookings), "percent": 100, "summary": {}}, footer_info="", stats_info={}, output_folder=None, date_for_filename=date_str, prev_day_map=prev_day_map)
-                return
+                # 상단 요약은 API 행으로 계산 → 화면(표 변경/상단 요약)을 기다리지 않음
+                top_summary = _top_summary_from_bookings(date_str, bf_bookings)
+                if top_summary is None:
+                    # 전체 사이트 수를 아직 모름 → 이번만 화면에서 읽음 (못 읽으면 DOM 추출로 대체)
+                    top_summary = _page_top_summary(driver, date_str, prev_sig)
+                if top_summary is not None:
+                    log_info(f"{date_str} browser_fetch_bookings succeeded bookings_count={len(bf_bookings)}")
+                    save_to_files(headers=bf_headers or BOOKING_HEADERS[:], bookings=bf_bookings, top_summary=top_summary, footer_info="", stats_info={}, output_folder=None, date_for_filename=date_str, prev_day_map=prev_day_map)
+                    return "api"
         except Exception as e:
             log_error(f"browser_fetch_bookings 예외: {e}")
 
@@ -207,7 +253,11 @@ def process_today_sheet(driver, wait, today, prev_day_date, prev_day_map):
         status, headers, bookings = wait_for_next_day_table(driver, date_str, prev_sig)
         if status == "ok" and bookings:
             save_to_files(headers=headers, bookings=bookings, top_summary=extract_top_summary(driver), footer_info=extract_footer_info(driver), stats_info={}, output_folder=None, date_for_filename=date_str, prev_day_map=prev_day_map)
-            return
+            return "ok"
+        if status == "empty":
+            # 페이지의 빈 데이터 표시 → 예약 없는 날. 재시도/진단 없이 빈 예약표 업로드 (취소된 행이 서버에 남지 않도록)
+            save_empty_day(date_str)
+            return "empty"
 
         # 빈 데이터 또는 실패인 경우: 상세 진단을 남기고 1회 재시도
         log_error(f"{date_str} 첫 번째 추출 결과: {status} bookings_count={len(bookings) if bookings else 0}")
@@ -221,7 +271,10 @@ def process_today_sheet(driver, wait, today, prev_day_date, prev_day_map):
         status2, headers2, bookings2 = wait_for_next_day_table(driver, date_str, prev_sig)
         if status2 == "ok" and bookings2:
             save_to_files(headers=headers2, bookings=bookings2, top_summary=extract_top_summary(driver), footer_info=extract_footer_info(driver), stats_info={}, output_folder=None, date_for_filename=date_str, prev_day_map=prev_day_map)
-            return
+            return "ok"
+        if status2 == "empty":
+            save_empty_day(date_str)
+            return "empty"
 
         # 두 번째 시도도 실패하면 진단을 남기고 빈 업로드 수행
         log_error(f"{date_str} 두 번째 추출 결과: {status2} bookings_count={len(bookings2) if bookings2 else 0}")
@@ -230,19 +283,15 @@ def process_today_sheet(driver, wait, today, prev_day_date, prev_day_map):
         except Exception as e:
             log_error(f"도메인 진단 실패(재시도 후): {e}")
 
+        if not upload_empty:
+            log_error(f"{date_str} 추출 실패 → 빈 예약표 업로드 대신 건너뜀 (서버 데이터 유지)")
+            return "skipped"
         save_empty_day(date_str)
+        return "empty"
     except Exception as e:
         log_error(f"[day.py] {date_str} 추출 실패: {e}")
         traceback.print_exc()
-
-def process_next_day_sheet(driver, wait, today, prev_day_map):
-    next_date = (today + timedelta(days=1)).strftime("%Y-%m-%d")
-    try:
-        # ... 내일 예약표 추출 및 저장 로직 ...
-        save_empty_day(next_date)  # 예시: 실제 로직은 필요에 따라 구현
-    except Exception as e:
-        log_error(f"[day.py] 내일 예약표 추출 실패: {e}")
-        traceback.print_exc()
+        return "error"
 
 
 # --------------------------------------------------------------------------------
@@ -300,6 +349,7 @@ def extract_top_summary(driver):
         elif "이용중" in t: status['이용중'] = _safe_int(p)
         elif "예약불가" in t: status['예약불가'] = _safe_int(p)
         elif "공실" in t: status['공실'] = _safe_int(p)
+    _site_total["count"] = total_count
     return {
         "updated_at": date_time,
         "display_date": date_label,
@@ -315,70 +365,251 @@ def _safe_int(p_elem):
     except:
         return 0
 
-def extract_reservation_data(driver):
+# 추출 방식: "js"(기본, execute_script 1회) / "html"(page_source 1회 + booking_parser 로컬 파싱) / "dom"(tr/td별 WebDriver 호출)
+EXTRACT_MODE = os.environ.get("EXTRACT_MODE", "js").lower()
+# 1이면 js/dom 두 방식을 모두 실행해 소요시간과 결과 일치 여부를 로그에 남김
+EXTRACT_COMPARE = os.environ.get("EXTRACT_COMPARE", "0") == "1"
+
+# 예약표 tbody의 모든 tr을 [{cls, cells:[td innerText...]}]로 직렬화 (WebDriver 왕복 1회)
+_TABLE_CELLS_JS = """
+var table = document.querySelector("table.table-bordered");
+if (!table) { return null; }
+var tbody = table.querySelector("tbody");
+if (!tbody) { return null; }
+var out = [];
+var trs = tbody.getElementsByTagName("tr");
+for (var i = 0; i < trs.length; i++) {
+    var tds = trs[i].getElementsByTagName("td");
+    var cells = [];
+    for (var k = 0; k < tds.length; k++) {
+        cells.push((tds[k].innerText || "").replace(/\u00a0/g, " "));
+    }
+    out.push({cls: trs[i].getAttribute("class") || "", cells: cells});
+}
+return out;
+"""
+
+def _collect_table_cells_dom(driver):
     table = driver.find_element(By.CSS_SELECTOR, "table.table-bordered")
     tbody = table.find_element(By.TAG_NAME, "tbody")
-    headers = [
-        "사이트","상태","고객명","연락처",
-        "예약 인원","차량","예약일",
-        "현장결제 금액","선결제 금액","총 이용료","관리메모","요청사항"
-    ]
-    rows = []
-    tr_list = tbody.find_elements(By.TAG_NAME, "tr")
-    i = 0
-    while i < len(tr_list):
-        tr = tr_list[i]
+    tr_cells = []
+    for tr in tbody.find_elements(By.TAG_NAME, "tr"):
         tds = tr.find_elements(By.TAG_NAME, "td")
-        if len(tds) >= 11:
-            raw_site = tds[0].text.strip()
-            site = raw_site.split('>')[-1].replace("애견존","").strip() if '>' in raw_site else raw_site.replace("애견존","").strip()
-            texts = [td.text.replace("포함","").strip() for td in tds]
-            status_raw = texts[1]
-            if "이용중" in status_raw: status="이용중"
-            elif "체크인" in status_raw: status="체크인"
-            elif "체크아웃" in status_raw: status="체크아웃"
-            else: status=""
-            row = {
-                "사이트": site,
-                "상태": status,
-                "고객명": texts[2],
-                "연락처": texts[3],
-                "예약 인원": texts[4],
-                "차량": texts[5],
-                "예약일": texts[6],
-                "현장결제 금액": texts[7],
-                "선결제 금액": texts[8],
-                "총 이용료": texts[10],
-                "관리메모": [],
-                "요청사항": ""
-            }
-            j = i+1
-            while j < len(tr_list):
-                next_tr = tr_list[j]
-                next_tds = next_tr.find_elements(By.TAG_NAME, "td")
-                if len(next_tds) >= 3 and next_tr.get_attribute("class") and 'text-muted' in next_tr.get_attribute("class"):
-                    label = next_tds[1].text.strip()
-                    value = next_tds[2].text.strip()
-                    if "관리메모" in label:
-                        # 관리메모는 항상 리스트로 변환
-                        if isinstance(value, list):
-                            row["관리메모"] = [str(v).strip() for v in value if str(v).strip()]
-                        elif value is None or value == "":
-                            row["관리메모"] = []
-                        else:
-                            # 여러 줄 메모는 줄바꿈 기준 분리
-                            row["관리메모"] = [s.strip() for s in str(value).split("\n") if s.strip()]
-                    elif "요청사항" in label:
-                        row["요청사항"] = value
-                    else:
-                        break
-                    j += 1
-                else:
-                    break
-            i = j - 1
-            rows.append(row)
-        i += 1
-    return headers, rows
+        cells = [td.text for td in tds]
+        # 보조 행 판별에만 class가 필요하므로 td가 3개 이상인 행만 조회
+        cls = (tr.get_attribute("class") or "") if len(tds) >= 3 else ""
+        tr_cells.append({"cls": cls, "cells": cells})
+    return tr_cells
+
+def _collect_table_cells_js(driver):
+    tr_cells = driver.execute_script(_TABLE_CELLS_JS)
+    if tr_cells is None:
+        raise NoSuchElementException("table.table-bordered tbody 없음")
+    return tr_cells
+
+def extract_reservation_data_dom(driver):
+    return BOOKING_HEADERS[:], build_booking_rows(_collect_table_cells_dom(driver))
+
+def extract_reservation_data_js(driver):
+    return BOOKING_HEADERS[:], build_booking_rows(_collect_table_cells_js(driver))
+
+def _collect_table_cells_html(driver):
+    tr_cells = parse_table_cells(driver.page_source)
+    if tr_cells is None:
+        raise NoSuchElementException("table.table-bordered tbody 없음")
+    return tr_cells
+
+def extract_reservation_data_html(driver):
+    return BOOKING_HEADERS[:], build_booking_rows(_collect_table_cells_html(driver))
+
+def compare_extraction_modes(driver):
+    """js/html/dom 추출을 모두 실행해 소요시간(ms)과 결과 일치 여부를 반환/로그"""
+    t0 = time.perf_counter()
+    js_result = extract_reservation_data_js(driver)
+    t1 = time.perf_counter()
+    html_result = extract_reservation_data_html(driver)
+    t2 = time.perf_counter()
+    dom_result = extract_reservation_data_dom(driver)
+    t3 = time.perf_counter()
+    report = {
+        "rows": len(js_result[1]),
+        "js_ms": round((t1 - t0) * 1000, 1),
+        "html_ms": round((t2 - t1) * 1000, 1),
+        "dom_ms": round((t3 - t2) * 1000, 1),
+        "same_rows": js_result[1] == dom_result[1],
+        "same_rows_html": html_result[1] == dom_result[1],
+    }
+    log_info(f"추출 방식 비교: {report}")
+    return js_result, report
+
+def extract_reservation_data(driver):
+    if EXTRACT_COMPARE:
+        result, _ = compare_extraction_modes(driver)
+        return result
+    if EXTRACT_MODE in ("js", "html"):
+        try:
+            if EXTRACT_MODE == "html":
+                return extract_reservation_data_html(driver)
+            return extract_reservation_data_js(driver)
+        except NoSuchElementException:
+            raise
+        except Exception as e:
+            log_error(f"{EXTRACT_MODE} 일괄 추출 실패 → DOM 추출로 대체: {e}")
+    return extract_reservation_data_dom(driver)
+
+# --------------------------------------------------------------------------------
+# 예약 JSON 직접 조회 (Selenium 세션 쿠키/토큰 재사용)
+# --------------------------------------------------------------------------------
+# API 응답 필드 → 예약표 컬럼. CAMFIT_BOOKING_FIELD_MAP(JSON)으로 덮어쓸 수 있음
+BOOKING_API_FIELD_MAP = {
+    "사이트": ["siteName", "site_name", "site"],
+    "상태": ["statusName", "status"],
+    "고객명": ["userName", "customerName", "name"],
+    "연락처": ["userPhone", "phone", "phoneNumber"],
+    "예약 인원": ["peopleText", "people", "numOfPeople"],
+    "차량": ["carText", "car", "numOfCar"],
+    "예약일": ["reservationDateText", "dateText", "reservationDate"],
+    "현장결제 금액": ["onsitePrice", "onsiteAmount"],
+    "선결제 금액": ["prepaidPrice", "paidAmount"],
+    "총 이용료": ["totalPrice", "totalAmount"],
+    "관리메모": ["adminMemo", "memo", "managerMemo"],
+    "요청사항": ["requestNote", "request", "userRequest"],
+}
+try:
+    BOOKING_API_FIELD_MAP.update(json.loads(os.environ.get("CAMFIT_BOOKING_FIELD_MAP", "{}")))
+except Exception as _e:
+    log_error(f"CAMFIT_BOOKING_FIELD_MAP 파싱 실패: {_e}")
+
+# 병렬 수집(scrape_days)에서는 스레드마다 자기 드라이버를 쓰므로 쿠키 jar도 스레드별로 둠
+_booking_http_local = threading.local()
+
+def _booking_http():
+    http = getattr(_booking_http_local, "session", None)
+    if http is None:
+        http = requests.Session()
+        http.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        _booking_http_local.session = http
+    return http
+
+def _harvest_driver_auth(driver, http):
+    """드라이버의 쿠키/토큰/UA를 (이 스레드의) requests.Session에 옮겨 담음"""
+    http.cookies.clear()
+    for c in driver.get_cookies():
+        http.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+    auth = driver.execute_script(
+        "return {ua: navigator.userAgent, token: window.localStorage.getItem(arguments[0]), origin: location.origin};",
+        CAMFIT_TOKEN_STORAGE_KEY,
+    ) or {}
+    headers = {"Accept": "application/json"}
+    if auth.get("ua"):
+        headers["User-Agent"] = auth["ua"]
+    if auth.get("origin"):
+        headers["Origin"] = auth["origin"]
+        headers["Referer"] = auth["origin"] + "/"
+    token = auth.get("token")
+    if token:
+        token = token.strip('"')
+        headers["Authorization"] = token if token.lower().startswith("bearer ") else f"Bearer {token}"
+    return headers
+
+def _pick(item, keys):
+    for k in keys:
+        if k in item and item[k] is not None:
+            return item[k]
+    return ""
+
+def _booking_row_from_api(item):
+    if "사이트" in item:
+        row = dict(item)
+    else:
+        row = {col: _pick(item, keys) for col, keys in BOOKING_API_FIELD_MAP.items()}
+    raw_site = str(row.get("사이트", "")).strip()
+    row["사이트"] = raw_site.split('>')[-1].replace("애견존","").strip()
+    status_raw = str(row.get("상태", ""))
+    if "이용중" in status_raw: row["상태"] = "이용중"
+    elif "체크인" in status_raw: row["상태"] = "체크인"
+    elif "체크아웃" in status_raw: row["상태"] = "체크아웃"
+    else: row["상태"] = ""
+    return row
+
+def _top_summary_from_bookings(date_str, bookings):
+    """
+    API 행으로 만든 상단 요약 (extract_top_summary와 같은 형태). 전체 사이트 수를 모르면 None.
+    예약불가(막아 둔 사이트)는 예약 JSON에 없으므로 0 → 공실 = 전체 - 예약된 사이트
+    """
+    total_count = _site_total["count"]
+    if not total_count:
+        return None
+    status = { '체크인':0, '체크아웃':0, '이용중':0, '예약불가':0, '공실':0 }
+    for b in bookings:
+        if b.get("상태") in status:
+            status[b["상태"]] += 1
+    booked_count = len({b.get("사이트") for b in bookings if b.get("사이트")})
+    status['공실'] = max(total_count - booked_count, 0)
+    return {
+        "updated_at": datetime.now().strftime("%Y/%m/%d %H:%M"),
+        "display_date": date_str,
+        "booked_count": booked_count,
+        "total_count": total_count,
+        "percent": round(booked_count * 100 / total_count),
+        "summary": status
+    }
+
+def _page_top_summary(driver, date_str, prev_sig=None):
+    """화면의 상단 요약. 다음 날짜로 넘어온 직후면 표가 바뀐 뒤에 읽음 (이전 날짜 요약 방지). 실패 시 None"""
+    try:
+        if prev_sig is not None and not _wait_for_table_change(driver, prev_sig):
+            log_error(f"{date_str} 화면이 바뀌지 않아 상단 요약을 읽지 못함")
+            return None
+        return extract_top_summary(driver)
+    except Exception as e:
+        log_error(f"{date_str} 상단 요약 추출 실패: {e}")
+        return None
+
+def _booking_items(data):
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for k in ("data", "items", "list", "bookings", "reservations", "content"):
+            v = data.get(k)
+            if isinstance(v, list):
+                return v
+            if isinstance(v, dict):
+                inner = _booking_items(v)
+                if inner:
+                    return inner
+    return []
+
+def browser_fetch_bookings(driver, date_str):
+    """
+    로그인된 드라이버의 세션으로 예약 JSON을 직접 조회 (DOM 스크래핑보다 훨씬 빠름).
+    extract_reservation_data와 같은 row dict 형태로 (headers, bookings) 반환.
+    엔드포인트 미설정/실패 시 (None, []) → 호출 측에서 DOM 스크래핑으로 대체.
+    """
+    if not BOOKING_API_URL:
+        log_debug("CAMFIT_BOOKING_API_URL 미설정: browser_fetch_bookings 건너뜀")
+        return None, []
+    t0 = time.perf_counter()
+    try:
+        http = _booking_http()
+        headers = _harvest_driver_auth(driver, http)
+        r = http.get(BOOKING_API_URL.format(date=date_str), headers=headers, timeout=15)
+        if r.status_code in (401, 403):
+            log_error(f"{date_str} 예약 JSON 인증 실패({r.status_code}) → DOM 스크래핑으로 대체")
+            return None, []
+        r.raise_for_status()
+        bookings = normalize_bookings([_booking_row_from_api(it) for it in _booking_items(r.json()) if isinstance(it, dict)])
+        # 필드 매핑이 응답과 안 맞으면 키가 빈 행이 나옴 → 그대로 올리면 서버의 실제 행이 전부 삭제되므로 통째로 버림
+        bad = sum(1 for b in bookings if not str(b.get("사이트") or "").strip() or not str(b.get("예약일") or "").strip())
+        if bad:
+            log_error(f"{date_str} 예약 JSON {len(bookings)}건 중 {bad}건이 사이트/예약일 없음 "
+                      f"(CAMFIT_BOOKING_FIELD_MAP 확인) → DOM 스크래핑으로 대체")
+            return None, []
+        log_info(f"{date_str} 예약 JSON 조회 {len(bookings)}건 ({(time.perf_counter() - t0) * 1000:.0f}ms)")
+        return BOOKING_HEADERS[:], bookings
+    except Exception as e:
+        log_error(f"{date_str} 예약 JSON 조회 실패 → DOM 스크래핑으로 대체: {e}")
+        return None, []
 
 def extract_footer_info(driver):
     try:
@@ -409,7 +640,97 @@ def _any_spinner_present(driver):
             continue
     return False
 
+# 준비 상태 감지 방식: "observer"(기본, MutationObserver) / "poll"(기존 sleep 폴링)
+READINESS_MODE = os.environ.get("READINESS_MODE", "observer").lower()
+# DOM 변경이 이 시간(ms) 동안 없으면 "조용해졌다"고 판단
+TABLE_QUIET_MS = int(os.environ.get("TABLE_QUIET_MS", "500"))
+
+# 페이지에 MutationObserver를 붙여 스피너가 사라지고 DOM이 quietMs 동안 잠잠해지면 resolve
+# arguments: spinnerSelectors, quietMs, timeoutMs, emptyPatterns, requireTable, requireMutation, callback
+_WAIT_QUIET_JS = """
+var spinnerSelectors = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2];
+var emptyPatterns = arguments[3], requireTable = arguments[4], requireMutation = arguments[5];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), timer = null, deadline = null, observer = null, finished = false;
+function spinnerPresent() {
+    for (var i = 0; i < spinnerSelectors.length; i++) {
+        if (document.querySelector(spinnerSelectors[i])) { return true; }
+    }
+    return false;
+}
+function currentState() {
+    if (spinnerPresent()) { return null; }
+    var tbody = document.querySelector("table.table-bordered tbody");
+    var rows = tbody ? tbody.getElementsByTagName("tr").length : 0;
+    if (rows === 0) {
+        var text = ((document.body && document.body.innerText) || "").toLowerCase();
+        for (var k = 0; k < emptyPatterns.length; k++) {
+            if (text.indexOf(emptyPatterns[k].toLowerCase()) >= 0) { return {status: "empty", rows: 0}; }
+        }
+    }
+    if (tbody) { return {status: "table", rows: rows}; }
+    if (!requireTable) { return {status: "ready", rows: 0}; }
+    return null;
+}
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(timer);
+    clearTimeout(deadline);
+    result.elapsed_ms = Date.now() - start;
+    done(result);
+}
+function arm() {
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+        var state = currentState();
+        if (state) { finish(state); }
+    }, quietMs);
+}
+observer = new MutationObserver(arm);
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true, attributes: true});
+deadline = setTimeout(function () { finish({status: "timeout", rows: 0}); }, timeoutMs);
+if (!requireMutation) { arm(); }
+"""
+
+def wait_for_table_quiet(driver, timeout=MAX_WAIT_FOR_NEXT_DAY, quiet_ms=None, require_table=True, require_mutation=False):
+    """
+    브라우저 안에서 DOM 변경을 감시하다가 준비되면 즉시 반환 (execute_async_script).
+    반환: {"status": "table"|"empty"|"ready"|"timeout", "rows": n, "elapsed_ms": ms}
+    """
+    quiet_ms = TABLE_QUIET_MS if quiet_ms is None else quiet_ms
+    timeout = max(timeout, 0.1)
+    # 공유 드라이버의 스크립트 타임아웃을 잠시 바꿨다가 원래대로 (이후 execute_async_script에 영향 없게)
+    try:
+        prev_timeout = driver.timeouts.script
+    except Exception:
+        prev_timeout = None
+    driver.set_script_timeout(timeout + 5)
+    try:
+        return driver.execute_async_script(
+            _WAIT_QUIET_JS,
+            list(SPINNER_SELECTORS),
+            quiet_ms,
+            int(timeout * 1000),
+            list(EMPTY_TEXT_PATTERNS),
+            require_table,
+            require_mutation,
+        ) or {"status": "timeout", "rows": 0}
+    finally:
+        try:
+            # 이전 값을 못 읽었으면 WebDriver 기본값(30초)으로
+            driver.set_script_timeout(prev_timeout if prev_timeout is not None else 30)
+        except Exception:
+            pass
+
 def _wait_spinners(driver, max_wait=30):
+    if READINESS_MODE == "observer":
+        try:
+            state = wait_for_table_quiet(driver, timeout=max_wait, require_table=False)
+            return state.get("status") != "timeout"
+        except Exception as e:
+            log_debug(f"MutationObserver 대기 실패 → 폴링으로 대체: {e}")
     end = time.time() + max_wait
     while time.time() < end:
         if not _any_spinner_present(driver):
@@ -511,6 +832,43 @@ def click_next_day_button(driver, wait):
         return False
 
 def wait_for_next_day_table(driver, target_date, prev_table_sig):
+    if READINESS_MODE == "observer":
+        try:
+            return _wait_for_next_day_table_observer(driver, target_date, prev_table_sig)
+        except Exception as e:
+            log_error(f"{target_date} MutationObserver 대기 실패 → 폴링으로 대체: {e}")
+    return _wait_for_next_day_table_poll(driver, target_date, prev_table_sig)
+
+def _wait_for_next_day_table_observer(driver, target_date, prev_table_sig):
+    deadline = time.time() + MAX_WAIT_FOR_NEXT_DAY
+    require_mutation = False
+    while time.time() < deadline:
+        state = wait_for_table_quiet(driver, timeout=deadline - time.time(), require_mutation=require_mutation)
+        status = state.get("status")
+        if status == "timeout":
+            break
+        if status == "empty":
+            log_info(f"{target_date} 빈 데이터 감지 ({state.get('elapsed_ms')}ms)")
+            return "empty", None, None
+        if prev_table_sig is not None:
+            tbl, _ = _get_table_and_rows(driver)
+            if tbl is not None and _table_signature(tbl) == prev_table_sig:
+                # 아직 이전 날짜 표 그대로 → 다음 DOM 변경부터 다시 대기
+                require_mutation = True
+                continue
+        log_info(f"{target_date} 표 준비 감지 rows={state.get('rows')} ({state.get('elapsed_ms')}ms)")
+        try:
+            headers, bookings = extract_reservation_data(driver)
+            return "ok", headers, bookings
+        except Exception as e:
+            log_error(f"표 추출 실패: {e}")
+            return "fail", None, None
+    # 감시 스크립트가 준비 신호를 못 잡은 경우(변경 없이 이미 바뀐 표, 빈 데이터 문구 차이 등)에도
+    # 바로 실패하지 않고 폴링 방식으로 한 번 더 확인
+    log_error(f"{target_date} MutationObserver 대기 타임아웃 → 폴링으로 대체")
+    return _wait_for_next_day_table_poll(driver, target_date, prev_table_sig)
+
+def _wait_for_next_day_table_poll(driver, target_date, prev_table_sig):
     deadline = time.time() + MAX_WAIT_FOR_NEXT_DAY
     last_row_count = None
     stable_count = 0
@@ -701,11 +1059,7 @@ def push_sheet_to_api(date_str, top, headers, stats, bookings, option_cols=None,
     }
     log_debug(f"클라이언트가 저장 시도하는 버전: {payload['version']}")
     try:
-        r = requests.post(
-            f"{API_BASE}/api/update-daily-sheet",
-            json=payload,
-            timeout=20
-        )
+        r = api_client.post_json("/api/update-daily-sheet", payload, timeout=20)
         # 기록: 서버 응답을 NAS_FOLDER(/app) 아래에 저장하여 문제 진단에 사용
         try:
             out_folder = NAS_FOLDER or os.getcwd()
@@ -728,7 +1082,7 @@ def push_sheet_to_api(date_str, top, headers, stats, bookings, option_cols=None,
             log_debug(f"서버의 최신 버전(응답): {server_ver}")
             log_error(f"{date_str} 예약표 업로드 실패(버전 충돌): {r.text}")
             try:
-                srv = requests.get(f"{API_BASE}/api/daily-sheet?date={date_str}", timeout=10)
+                srv = api_client.get("/api/daily-sheet", params={"date": date_str}, timeout=10)
                 if srv.ok:
                     srv_json = srv.json()
                     server_sheet = srv_json.get('sheet', [])
@@ -748,7 +1102,7 @@ def push_sheet_to_api(date_str, top, headers, stats, bookings, option_cols=None,
                     payload['sheet'] = merged
                     payload['version'] = server_ver or 0
                     # 재시도
-                    rr = requests.post(f"{API_BASE}/api/update-daily-sheet", json=payload, timeout=20)
+                    rr = api_client.post_json("/api/update-daily-sheet", payload, timeout=20)
                     try:
                         merged_resp_path = os.path.join(out_folder, f"push_response_{date_str}_merged.json")
                     except Exception:
@@ -801,6 +1155,7 @@ def push_sheet_to_api(date_str, top, headers, stats, bookings, option_cols=None,
         else:
             log_info(f"{date_str} 업로드 성공: {r.json()}")
             log_info(f"[day.py] {date_str} 업로드 성공!")
+            return r.json()
     except Exception as e:
         log_error(f"{date_str} 예약표 업로드 예외: {e}")
         log_error(f"[day.py] {date_str} 업로드 예외: {e}")
@@ -808,9 +1163,107 @@ def push_sheet_to_api(date_str, top, headers, stats, bookings, option_cols=None,
         with open(f"fail_backup_{date_str}.json", "w", encoding="utf-8") as f:
             json.dump(payload, f, ensure_ascii=False, indent=2)
 
+# --------------------------------------------------------------------------------
+# delta 업로드: 직전에 업로드한 JSON과 비교해서 바뀐 행만 전송
+# --------------------------------------------------------------------------------
+_push_state_lock = threading.Lock()
+
+def _load_push_state():
+    try:
+        with open(PUSH_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        log_error(f"업로드 기록 파일 읽기 실패: {e}")
+        return {}
+
+def record_push_state(date_str, version, bookings, json_path):
+    """업로드 성공 후 호출. version=None이면 기록 삭제 (다음 업로드는 전체 전송)"""
+    with _push_state_lock:
+        state = _load_push_state()
+        if version is None:
+            state.pop(date_str, None)
+        else:
+            state[date_str] = {"version": version, "rows_digest": _rows_digest(bookings), "json_path": json_path}
+        try:
+            with open(PUSH_STATE_FILE, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            log_error(f"업로드 기록 파일 저장 실패: {e}")
+
+def _row_key(row):
+    # 서버 uix_sheet_site_resvdate와 같은 키 (사이트, 예약일)
+    return (str(row.get("사이트", "")), str(row.get("예약일", "")))
+
+def _rows_digest(bookings):
+    rows = sorted((json.dumps(r, ensure_ascii=False, sort_keys=True) for r in bookings or []))
+    return hashlib.sha256("\n".join(rows).encode("utf-8")).hexdigest()
+
+def compute_sheet_delta(prev_rows, new_rows):
+    """(upserted 행 목록, deleted 키 목록[{사이트, 예약일}])"""
+    prev_map = {_row_key(r): r for r in prev_rows or []}
+    new_map = {_row_key(r): r for r in new_rows or []}
+    upserted = [row for key, row in new_map.items() if prev_map.get(key) != row]
+    deleted = [{"사이트": key[0], "예약일": key[1]} for key in prev_map if key not in new_map]
+    return upserted, deleted
+
+def _load_delta_base(date_str, version):
+    """
+    서버가 아직 직전 업로드 상태 그대로일 때만 그 JSON을 반환 (아니면 None → 전체 업로드).
+    기준: 기록된 version == 현재 서버 version, 그리고 직전 JSON 내용이 기록된 digest와 같음.
+    """
+    if not DELTA_UPLOAD or not version:
+        return None
+    entry = _load_push_state().get(date_str)
+    if not entry or entry.get("version") != version or not entry.get("json_path"):
+        return None
+    try:
+        with open(entry["json_path"], "r", encoding="utf-8") as f:
+            prev = json.load(f)
+    except Exception:
+        return None
+    if _rows_digest(prev.get("sheet")) != entry.get("rows_digest"):
+        return None
+    return prev
+
+def push_sheet_delta(date_str, prev_payload, payload):
+    """
+    바뀐 행만 /api/daily-sheet/delta로 전송.
+    반환: 서버 응답 dict (변경 없으면 업로드 생략하고 {"unchanged": True, ...}), 전체 업로드가 필요하면 None
+    """
+    upserted, deleted = compute_sheet_delta(prev_payload.get("sheet"), payload.get("sheet"))
+    meta_same = all(prev_payload.get(k) == payload.get(k) for k in ("headers", "stats", "optionCols"))
+    if not upserted and not deleted and meta_same:
+        log_info(f"[day.py] {date_str} 변경 없음 → 업로드 생략 (version={payload['version']})")
+        return {"ok": True, "unchanged": True, "skipped": True, "version": payload["version"]}
+    body = {
+        "date": date_str,
+        "version": payload["version"],
+        "top": payload.get("top"),
+        "headers": payload.get("headers"),
+        "stats": payload.get("stats"),
+        "optionCols": payload.get("optionCols") or {},
+        "upserted": upserted,
+        "deleted": deleted,
+    }
+    try:
+        r = api_client.post_json("/api/daily-sheet/delta", body, timeout=20)
+    except Exception as e:
+        log_error(f"{date_str} delta 업로드 예외 → 전체 업로드로 대체: {e}")
+        return None
+    if not r.ok:
+        log_error(f"{date_str} delta 업로드 실패 HTTP {r.status_code} → 전체 업로드로 대체: {r.text[:300]}")
+        return None
+    res = r.json()
+    log_info(f"[day.py] {date_str} delta 업로드 성공: upserted={len(upserted)} deleted={len(deleted)} → {res}")
+    return res
+
 def save_to_files(headers, bookings, top_summary, footer_info, stats_info, output_folder, date_for_filename, prev_day_map, option_cols=None):
     # 서버 버전을 조회해서 항상 최신 version으로 저장 시도!
     version = fetch_sheet_version(date_for_filename)
+    # 새 JSON이 덮어쓰기 전에 직전 업로드 JSON을 읽어 둠 (delta 기준)
+    prev_payload = _load_delta_base(date_for_filename, version)
 
     # 0) JSON 저장 + 백업(E:\YYYY-MM-DD.json, 기존 있으면 E:\bak\YYYY-MM-DD_HHMMSS.json)
     try:
@@ -834,16 +1287,22 @@ def save_to_files(headers, bookings, top_summary, footer_info, stats_info, outpu
     except Exception as e:
         log_error(f"JSON 저장/백업 실패: {e}")
 
-    # 1) API 업로드(DB 저장)
-    push_sheet_to_api(
-        date_str=date_for_filename,
-        top=top_summary,
-        headers=headers,
-        stats=stats_info,
-        bookings=bookings,
-        option_cols=option_cols,
-        version=version
-    )
+    # 1) API 업로드(DB 저장): 가능하면 바뀐 행만, 아니면 전체
+    res = None
+    if prev_payload is not None and 'payload' in locals():
+        res = push_sheet_delta(date_for_filename, prev_payload, payload)
+    if res is None:
+        res = push_sheet_to_api(
+            date_str=date_for_filename,
+            top=top_summary,
+            headers=headers,
+            stats=stats_info,
+            bookings=bookings,
+            option_cols=option_cols,
+            version=version
+        )
+    saved_to = save_res.get("saved_to") if 'save_res' in locals() else None
+    record_push_state(date_for_filename, (res or {}).get("version") if saved_to else None, bookings, saved_to)
 
     # 2) (옵션) JSON으로 강제 복원
     if RESTORE_AFTER_SCRAPE:
@@ -899,17 +1358,6 @@ def safe_quit(driver):
 # 메인
 # --------------------------------------------------------------------------------
 
-def fetch_sheet_version(date_str):
-    try:
-        r = requests.get(f"{API_BASE}/api/daily-sheet?date={date_str}", timeout=8)
-        if r.ok:
-            data = r.json()
-            return data.get("version", 0)
-    except Exception as e:
-        log_error(f"{date_str} 버전 조회 실패: {e}")
-    return 0
-
-
 def _build_payload_for_day(date_for_filename, top_summary, headers, stats_info, footer_info, option_cols, bookings, version):
     # Minimal payload builder used by save_to_files; mirrors expected API shape
     try:
@@ -941,8 +1389,7 @@ def _force_restore_via_api(date_for_filename, json_path):
     try:
         if not os.path.exists(json_path):
             return {"ok": False, "error": "json not found", "path": json_path}
-        files = {"file": open(json_path, "rb")}
-        r = requests.post(f"{API_BASE}/api/restore-from-json", files=files, timeout=30)
+        r = api_client.post_file("/api/restore-from-json", json_path, timeout=30)
         try:
             return r.json()
         except Exception:
@@ -950,135 +1397,492 @@ def _force_restore_via_api(date_for_filename, json_path):
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
-def main():
-    set_status_running()
+# --------------------------------------------------------------------------------
+# 리소스 차단 (CDP Network.setBlockedURLs)
+# --------------------------------------------------------------------------------
+# 추출에 쓰지 않는 이미지/폰트/분석 스크립트(aggressive는 CSS/미디어까지)를 브라우저가 받지 않도록 차단
+# SCRAPE_BLOCK_PROFILE: off / default / aggressive
+# SCRAPE_BLOCK_ALLOW: 쉼표 구분 문자열. 이 문자열이 들어간 차단 패턴은 제외 (예: "svg,fonts.googleapis")
+# SCRAPE_BLOCK_EXTRA: 쉼표 구분 추가 차단 패턴 (CDP 와일드카드 * 사용)
+# SCRAPE_BLOCK_MEASURE=1: 드라이버 준비 후 같은 페이지를 차단 없이/차단하고 한 번씩 로드해 차이를 상태 파일에 기록
+SCRAPE_BLOCK_PROFILE = os.environ.get("SCRAPE_BLOCK_PROFILE", "default").lower()
+SCRAPE_BLOCK_ALLOW = [x.strip() for x in os.environ.get("SCRAPE_BLOCK_ALLOW", "").split(",") if x.strip()]
+SCRAPE_BLOCK_EXTRA = [x.strip() for x in os.environ.get("SCRAPE_BLOCK_EXTRA", "").split(",") if x.strip()]
+SCRAPE_BLOCK_MEASURE = os.environ.get("SCRAPE_BLOCK_MEASURE", "0") == "1"
+
+_BLOCK_IMAGES = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"]
+_BLOCK_FONTS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+_BLOCK_TRACKERS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*connect.facebook.net*",
+    "*hotjar.com*", "*clarity.ms*", "*channel.io*", "*sentry.io*", "*amplitude.com*", "*mixpanel.com*",
+]
+_BLOCK_HEAVY = ["*.css", "*.mp4", "*.webm", "*.mp3"]
+BLOCK_PROFILES = {
+    "off": [],
+    "default": _BLOCK_IMAGES + _BLOCK_FONTS + _BLOCK_TRACKERS,
+    "aggressive": _BLOCK_IMAGES + _BLOCK_FONTS + _BLOCK_TRACKERS + _BLOCK_HEAVY,
+}
+
+# 페이지 로드 시간(Navigation Timing): responseEnd/DOMContentLoaded/load 기준 ms
+_NAV_TIMING_JS = """
+var e = performance.getEntriesByType("navigation")[0];
+if (!e) { return null; }
+var res = performance.getEntriesByType("resource");
+return {dcl_ms: Math.round(e.domContentLoadedEventEnd), load_ms: Math.round(e.loadEventEnd),
+        resources: res.length, transfer_kb: Math.round(res.reduce(function (a, r) { return a + (r.transferSize || 0); }, 0) / 1024)};
+"""
+
+_block_effect = None  # 마지막 차단 전/후 측정 결과 (SCRAPE_BLOCK_MEASURE)
+
+def blocked_url_patterns(profile=None):
+    patterns = BLOCK_PROFILES.get(profile or SCRAPE_BLOCK_PROFILE)
+    if patterns is None:
+        log_error(f"알 수 없는 SCRAPE_BLOCK_PROFILE={profile or SCRAPE_BLOCK_PROFILE} → default 사용")
+        patterns = BLOCK_PROFILES["default"]
+    patterns = patterns + SCRAPE_BLOCK_EXTRA
+    return [p for p in patterns if not any(a in p for a in SCRAPE_BLOCK_ALLOW)]
+
+def apply_resource_blocking(driver, patterns=None):
+    """CDP로 차단 패턴 적용 (Chrome 전용, 실패해도 스크래핑은 계속)"""
+    patterns = blocked_url_patterns() if patterns is None else patterns
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        if patterns:
+            log_info(f"리소스 차단 적용: profile={SCRAPE_BLOCK_PROFILE} patterns={len(patterns)}")
+        return True
+    except Exception as e:
+        log_error(f"리소스 차단 적용 실패(무시): {e}")
+        return False
+
+def page_load_timing(driver):
+    try:
+        return driver.execute_script(_NAV_TIMING_JS)
+    except Exception:
+        return None
+
+def record_navigation(kind, ms, **extra):
+    """페이지 로드/다음 날짜 전환 소요시간을 STATUS_FILE의 page_load.navigations에 기록 (최근 100건)"""
+    with _status_lock:
+        page_load = _status.setdefault("page_load", {"profile": SCRAPE_BLOCK_PROFILE, "navigations": []})
+        navs = page_load.setdefault("navigations", [])
+        navs.append({"kind": kind, "ms": round(ms, 1), **extra})
+        del navs[:-100]
+
+def measure_block_effect(driver, url=None):
+    """같은 페이지를 차단 없이 → 차단하고 한 번씩 로드해 로드 시간/리소스 수를 비교"""
+    global _block_effect
+    url = url or driver.current_url
+    result = {"profile": SCRAPE_BLOCK_PROFILE, "url": url}
+    for label, patterns in (("unblocked", []), ("blocked", blocked_url_patterns())):
+        apply_resource_blocking(driver, patterns)
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        except Exception:
+            pass
+        t0 = time.perf_counter()
+        driver.get(url)
+        _wait_spinners(driver)
+        result[label] = {"wall_ms": round((time.perf_counter() - t0) * 1000, 1), **(page_load_timing(driver) or {})}
+    _block_effect = result
+    with _status_lock:
+        _status.setdefault("page_load", {})["block_effect"] = result
+    write_status()
+    log_info(f"리소스 차단 효과: {result}")
+    return result
+
+def build_logged_in_driver():
+    """camfit_combined로 드라이버를 만들고 CAMFIT_ID/CAMFIT_PW로 로그인. 실패해도 (driver|None, wait|None) 반환"""
     driver = None
     wait = None
+    # 실제 드라이버 생성: camfit_combined의 helper 사용
     try:
-        log_info("[day.py] 예약표 수집 시작")
-        # 실제 드라이버 생성: camfit_combined의 helper 사용
+        import camfit_combined as cc
+        # 강제 헤드리스 모드로 실행(컨테이너 환경 대비)
         try:
-            import camfit_combined as cc
-            # 강제 헤드리스 모드로 실행(컨테이너 환경 대비)
+            cc.HEADLESS = True
+        except Exception:
+            pass
+        driver = cc.build_driver()
+        if driver:
+            apply_resource_blocking(driver)
+            wait = WebDriverWait(driver, 30)
+            # 안전하게 종료되도록 등록
+            atexit.register(safe_quit, driver)
+            # 저장된 세션이 살아 있으면 로그인 생략
+            restored = restore_session_cache(driver)
+            # 로그인 시도
             try:
-                cc.HEADLESS = True
-            except Exception:
-                pass
-            driver = cc.build_driver()
-            if driver:
-                wait = WebDriverWait(driver, 30)
-                # 안전하게 종료되도록 등록
-                atexit.register(safe_quit, driver)
-                # 로그인 시도
-                try:
-                    login_id = os.environ.get("CAMFIT_ID")
-                    login_pw = os.environ.get("CAMFIT_PW")
-                    if not login_id or not login_pw:
-                        log_error("환경변수 CAMFIT_ID/CAMFIT_PW 미설정: 로그인하지 않습니다.")
-                    else:
+                login_id = os.environ.get("CAMFIT_ID")
+                login_pw = os.environ.get("CAMFIT_PW")
+                if restored:
+                    log_debug("세션 캐시 사용: camfit_login 생략")
+                elif not login_id or not login_pw:
+                    log_error("환경변수 CAMFIT_ID/CAMFIT_PW 미설정: 로그인하지 않습니다.")
+                else:
+                    try:
+                        ok = cc.camfit_login(driver, wait, login_id, login_pw)
+                        if ok:
+                            save_session_cache(driver)
+                        if not ok:
+                            log_error("로그인 실패: 실제 스크래핑을 계속하지 않습니다.")
+                            try:
+                                log_info("로그인 실패 -> log_dom_diagnostics 호출 전")
+                                # 로그인 실패 시 화면/DOM 덤프
+                                log_dom_diagnostics(driver, datetime.now().strftime("%Y-%m-%d"), prefix="login")
+                                log_info("로그인 실패 -> log_dom_diagnostics 호출 후")
+                            except Exception as _e:
+                                log_error(f"로그인 실패 후 DOM 진단 실패: {_e}")
+                    except Exception as exc:
+                        # unexpected exception from login; log traceback and force diag dump
+                        tb = traceback.format_exc()
+                        log_error(f"camfit_login 예외 발생: {exc}\n{tb}")
+                        # ensure /app exists if possible, and also write to cwd as fallback
+                        date_str = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+                        trace_name_app = f"/app/camfit_login_trace_{date_str}.txt"
+                        trace_name_cwd = os.path.join(os.getcwd(), f"camfit_login_trace_{date_str}.txt")
                         try:
-                            ok = cc.camfit_login(driver, wait, login_id, login_pw)
-                            if not ok:
-                                log_error("로그인 실패: 실제 스크래핑을 계속하지 않습니다.")
-                                try:
-                                    log_info("로그인 실패 -> log_dom_diagnostics 호출 전")
-                                    # 로그인 실패 시 화면/DOM 덤프
-                                    log_dom_diagnostics(driver, datetime.now().strftime("%Y-%m-%d"), prefix="login")
-                                    log_info("로그인 실패 -> log_dom_diagnostics 호출 후")
-                                except Exception as _e:
-                                    log_error(f"로그인 실패 후 DOM 진단 실패: {_e}")
-                        except Exception as exc:
-                            # unexpected exception from login; log traceback and force diag dump
-                            tb = traceback.format_exc()
-                            log_error(f"camfit_login 예외 발생: {exc}\n{tb}")
-                            # ensure /app exists if possible, and also write to cwd as fallback
-                            date_str = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-                            trace_name_app = f"/app/camfit_login_trace_{date_str}.txt"
-                            trace_name_cwd = os.path.join(os.getcwd(), f"camfit_login_trace_{date_str}.txt")
                             try:
-                                try:
-                                    os.makedirs('/app', exist_ok=True)
-                                except Exception:
-                                    pass
-                                with open(trace_name_app, 'w', encoding='utf-8') as tf:
-                                    tf.write(tb)
-                                log_info(f"로그인 예외 스택 저장: {trace_name_app}")
+                                os.makedirs('/app', exist_ok=True)
                             except Exception:
+                                pass
+                            with open(trace_name_app, 'w', encoding='utf-8') as tf:
+                                tf.write(tb)
+                            log_info(f"로그인 예외 스택 저장: {trace_name_app}")
+                        except Exception:
+                            try:
+                                with open(trace_name_cwd, 'w', encoding='utf-8') as tf:
+                                    tf.write(tb)
+                                log_info(f"로그인 예외 스택 저장(대체): {trace_name_cwd}")
+                            except Exception as _e:
+                                log_error(f"로그인 예외 스택 저장 실패: {_e}")
+                                # Attempt to capture browser state: current URL, cookies, console logs
                                 try:
-                                    with open(trace_name_cwd, 'w', encoding='utf-8') as tf:
-                                        tf.write(tb)
-                                    log_info(f"로그인 예외 스택 저장(대체): {trace_name_cwd}")
-                                except Exception as _e:
-                                    log_error(f"로그인 예외 스택 저장 실패: {_e}")
-                                    # Attempt to capture browser state: current URL, cookies, console logs
+                                    url = None
+                                    cookies = None
+                                    console_logs = None
                                     try:
-                                        url = None
+                                        url = driver.current_url
+                                    except Exception:
+                                        url = '<no-url>'
+                                    try:
+                                        cookies = driver.get_cookies()
+                                    except Exception:
                                         cookies = None
+                                    try:
+                                        # not all drivers support get_log; wrap in try
                                         console_logs = None
                                         try:
-                                            url = driver.current_url
-                                        except Exception:
-                                            url = '<no-url>'
-                                        try:
-                                            cookies = driver.get_cookies()
-                                        except Exception:
-                                            cookies = None
-                                        try:
-                                            # not all drivers support get_log; wrap in try
-                                            console_logs = None
-                                            try:
-                                                console_logs = driver.get_log('browser')
-                                            except Exception:
-                                                console_logs = None
+                                            console_logs = driver.get_log('browser')
                                         except Exception:
                                             console_logs = None
+                                    except Exception:
+                                        console_logs = None
 
-                                        state = {
-                                            'url': url,
-                                            'cookies': cookies,
-                                            'console_logs_sample': (console_logs[:50] if console_logs and isinstance(console_logs, list) else None)
-                                        }
-                                        state_path_app = f"/app/camfit_login_state_{date_str}.json"
-                                        state_path_cwd = os.path.join(os.getcwd(), f"camfit_login_state_{date_str}.json")
+                                    state = {
+                                        'url': url,
+                                        'cookies': cookies,
+                                        'console_logs_sample': (console_logs[:50] if console_logs and isinstance(console_logs, list) else None)
+                                    }
+                                    state_path_app = f"/app/camfit_login_state_{date_str}.json"
+                                    state_path_cwd = os.path.join(os.getcwd(), f"camfit_login_state_{date_str}.json")
+                                    try:
+                                        with open(state_path_app, 'w', encoding='utf-8') as sf:
+                                            json.dump(state, sf, ensure_ascii=False, indent=2)
+                                        log_info(f"로그인 상태 저장: {state_path_app}")
+                                    except Exception:
                                         try:
-                                            with open(state_path_app, 'w', encoding='utf-8') as sf:
+                                            with open(state_path_cwd, 'w', encoding='utf-8') as sf:
                                                 json.dump(state, sf, ensure_ascii=False, indent=2)
-                                            log_info(f"로그인 상태 저장: {state_path_app}")
-                                        except Exception:
-                                            try:
-                                                with open(state_path_cwd, 'w', encoding='utf-8') as sf:
-                                                    json.dump(state, sf, ensure_ascii=False, indent=2)
-                                                log_info(f"로그인 상태 저장(대체): {state_path_cwd}")
-                                            except Exception as _e:
-                                                log_error(f"로그인 상태 저장 실패: {_e}")
-                                    except Exception as _e:
-                                        log_error(f"로그인 상태 캡처 실패: {_e}")
+                                            log_info(f"로그인 상태 저장(대체): {state_path_cwd}")
+                                        except Exception as _e:
+                                            log_error(f"로그인 상태 저장 실패: {_e}")
+                                except Exception as _e:
+                                    log_error(f"로그인 상태 캡처 실패: {_e}")
 
-                                    try:
-                                        log_info("로그인 예외 -> 강제 DOM 진단 호출 전")
-                                        log_dom_diagnostics(driver, datetime.now().strftime("%Y-%m-%d"), prefix="login-exception")
-                                        log_info("로그인 예외 -> 강제 DOM 진단 호출 후")
-                                    except Exception as _e:
-                                        log_error(f"로그인 예외 후 DOM 진단 실패: {_e}")
+                                try:
+                                    log_info("로그인 예외 -> 강제 DOM 진단 호출 전")
+                                    log_dom_diagnostics(driver, datetime.now().strftime("%Y-%m-%d"), prefix="login-exception")
+                                    log_info("로그인 예외 -> 강제 DOM 진단 호출 후")
+                                except Exception as _e:
+                                    log_error(f"로그인 예외 후 DOM 진단 실패: {_e}")
+            except Exception as e:
+                log_error(f"로그인 예외: {e}")
+            if SCRAPE_BLOCK_MEASURE and _is_logged_in(driver):
+                try:
+                    measure_block_effect(driver)
                 except Exception as e:
-                    log_error(f"로그인 예외: {e}")
-        except Exception as e:
-            log_error(f"camfit_combined 모듈 로드/드라이버 생성 실패: {e}")
-        # continue main flow even if driver/login failed (process_today_sheet will handle missing driver)
-        today = datetime.now()
+                    log_error(f"리소스 차단 효과 측정 실패: {e}")
+    except Exception as e:
+        log_error(f"camfit_combined 모듈 로드/드라이버 생성 실패: {e}")
+    return driver, wait
+
+def _is_logged_in(driver):
+    """로그인 페이지로 튕겼거나 비밀번호 입력란이 보이면 세션 만료로 판단"""
+    try:
+        url = (driver.current_url or "").lower()
+        if "login" in url or "signin" in url:
+            return False
+        return not driver.find_elements(By.CSS_SELECTOR, "input[type='password']")
+    except WebDriverException:
+        return False
+
+def relogin(driver, wait):
+    """이미 떠 있는 드라이버로 다시 로그인 (세션 만료 시)"""
+    login_id = os.environ.get("CAMFIT_ID")
+    login_pw = os.environ.get("CAMFIT_PW")
+    if not login_id or not login_pw:
+        log_error("환경변수 CAMFIT_ID/CAMFIT_PW 미설정: 재로그인 불가")
+        return False
+    try:
+        import camfit_combined as cc
+        ok = bool(cc.camfit_login(driver, wait, login_id, login_pw))
+    except Exception as e:
+        log_error(f"재로그인 실패: {e}")
+        return False
+    if ok:
+        save_session_cache(driver)
+    else:
+        session_cache.clear()
+    return ok
+
+# --------------------------------------------------------------------------------
+# 여러 날짜 병렬 수집 (DAYS_TO_FETCH > 1)
+# --------------------------------------------------------------------------------
+_LOCAL_STORAGE_DUMP_JS = """
+var o = {};
+for (var i = 0; i < localStorage.length; i++) { var k = localStorage.key(i); o[k] = localStorage.getItem(k); }
+return o;
+"""
+
+def _inject_session(driver, home_url, cookies, storage):
+    """쿠키/localStorage를 드라이버에 넣음 (같은 origin 페이지를 먼저 열어야 쿠키를 넣을 수 있음)"""
+    driver.get(home_url)
+    for c in cookies:
+        c = dict(c)
+        c.pop("sameSite", None)
+        try:
+            driver.add_cookie(c)
+        except WebDriverException as e:
+            log_debug(f"쿠키 복사 실패 {c.get('name')}: {e}")
+    for k, v in (storage or {}).items():
+        driver.execute_script("localStorage.setItem(arguments[0], arguments[1]);", k, v)
+
+def save_session_cache(driver):
+    """로그인 직후 호출: 쿠키/localStorage를 암호화 캐시에 저장 (캐시 비활성이면 아무것도 안 함)"""
+    if not session_cache.enabled():
+        return False
+    try:
+        cookies = driver.get_cookies()
+        storage = driver.execute_script(_LOCAL_STORAGE_DUMP_JS) or {}
+        ok = session_cache.save(cookies, storage, driver.current_url, os.environ.get("CAMFIT_ID"))
+        if ok:
+            log_info(f"로그인 세션 캐시 저장: cookies={len(cookies)} storage_keys={len(storage)}")
+        return ok
+    except Exception as e:
+        log_error(f"로그인 세션 캐시 저장 실패: {e}")
+        return False
+
+def restore_session_cache(driver):
+    """캐시된 세션을 복원하고 로그인 상태가 확인되면 True. 거부되면 캐시 삭제 + 브라우저 상태 정리 후 False"""
+    cached = session_cache.load(os.environ.get("CAMFIT_ID"))
+    if not cached:
+        return False
+    t0 = time.perf_counter()
+    try:
+        _inject_session(driver, cached["home_url"], cached["cookies"], cached.get("local_storage"))
+        driver.get(cached["home_url"])
+        _wait_spinners(driver, max_wait=15)
+        if _is_logged_in(driver):
+            age_min = (time.time() - cached.get("saved_at", time.time())) / 60
+            log_info(f"로그인 세션 캐시 복원 성공 ({time.perf_counter() - t0:.1f}s, {age_min:.0f}분 전 저장) → 로그인 생략")
+            return True
+        log_info("로그인 세션 캐시 거부됨(로그인 화면) → 캐시 삭제 후 로그인")
+    except Exception as e:
+        log_error(f"로그인 세션 캐시 복원 실패: {e}")
+    session_cache.clear()
+    try:
+        driver.delete_all_cookies()
+        driver.execute_script("localStorage.clear();")
+    except Exception:
+        pass
+    return False
+
+def clone_logged_in_driver(primary, home_url):
+    """기본 드라이버의 쿠키/localStorage를 복사해 같은 로그인 세션의 드라이버를 하나 더 생성. 실패 시 None"""
+    driver = None
+    try:
+        import camfit_combined as cc
+        cookies = primary.get_cookies()
+        storage = primary.execute_script(_LOCAL_STORAGE_DUMP_JS) or {}
+        driver = cc.build_driver()
+        if not driver:
+            return None
+        atexit.register(safe_quit, driver)
+        apply_resource_blocking(driver)
+        _inject_session(driver, home_url, cookies, storage)
+        t0 = time.perf_counter()
+        driver.get(home_url)
+        record_navigation("page_load", (time.perf_counter() - t0) * 1000, **(page_load_timing(driver) or {}))
+        wait = WebDriverWait(driver, 30)
+        if not _is_logged_in(driver) and not relogin(driver, wait):
+            log_error("복제 드라이버 로그인 실패")
+            safe_quit(driver)
+            return None
+        _wait_spinners(driver)
+        return driver
+    except Exception as e:
+        log_error(f"복제 드라이버 생성 실패: {e}")
+        if driver:
+            safe_quit(driver)
+        return None
+
+def _current_table_sig(driver):
+    tbl, _ = _get_table_and_rows(driver)
+    return _table_signature(tbl) if tbl is not None else None
+
+def _wait_for_table_change(driver, prev_sig, timeout=MAX_WAIT_FOR_NEXT_DAY):
+    """중간 날짜를 건너뛸 때: 추출 없이 표가 prev_sig에서 바뀌고 안정될 때까지만 대기"""
+    deadline = time.time() + timeout
+    require_mutation = False
+    while time.time() < deadline:
+        if READINESS_MODE == "observer":
+            try:
+                state = wait_for_table_quiet(driver, timeout=deadline - time.time(), require_mutation=require_mutation)
+            except Exception:
+                state = {"status": "table"}
+                time.sleep(STABLE_INTERVAL)
+        else:
+            _wait_spinners(driver, max_wait=deadline - time.time())
+            state = {"status": "table"}
+            time.sleep(STABLE_INTERVAL)
+        if state.get("status") == "timeout":
+            return False
+        if state.get("status") == "empty" or _current_table_sig(driver) != prev_sig:
+            return True
+        require_mutation = True
+    return False
+
+def _scrape_day_offsets(driver, wait, today, offsets, prev_day_map, worker, pos=0):
+    """
+    한 드라이버로 offsets(오늘 기준 일수, 오름차순)를 차례로 수집.
+    pos: 드라이버 화면이 현재 보고 있는 날짜의 offset. 다음 날짜 버튼으로만 앞으로 이동.
+    반환: 마지막 화면 offset (이동 실패 시 None)
+    """
+    for n, offset in enumerate(offsets):
+        date_str = (today + timedelta(days=offset)).strftime("%Y-%m-%d")
+        prev_sig = None
+        moved = True
+        while pos < offset:
+            prev_sig = _current_table_sig(driver)
+            if not click_next_day_button(driver, wait):
+                moved = False
+                break
+            pos += 1
+            if pos < offset:
+                t0 = time.perf_counter()
+                if not _wait_for_table_change(driver, prev_sig):
+                    log_error(f"[{worker}] offset {pos} 표 전환 대기 타임아웃")
+                record_navigation("next_day", (time.perf_counter() - t0) * 1000, worker=worker)
+        if not moved:
+            for rest in offsets[n:]:
+                rest_date = (today + timedelta(days=rest)).strftime("%Y-%m-%d")
+                record_day_result(rest_date, status="error", error="다음 날짜 버튼 없음", worker=worker)
+            return None
+        t0 = time.perf_counter()
+        result = process_day_sheet(driver, wait, date_str, prev_day_map, prev_sig=prev_sig, upload_empty=(offset == 0))
+        elapsed = round(time.perf_counter() - t0, 2)
+        log_info(f"[{worker}] {date_str} {result} ({elapsed}s)")
+        record_day_result(date_str, status=result, elapsed_sec=elapsed, worker=worker)
+    return pos
+
+def _split_offsets(count, parts):
+    """0..count-1을 parts개의 연속 구간으로 분할 (앞 구간부터 하나씩 더 큼)"""
+    parts = max(1, min(parts, count))
+    size, extra = divmod(count, parts)
+    chunks, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(list(range(start, end)))
+        start = end
+    return chunks
+
+def scrape_days(driver, wait, today, days, prev_day_map):
+    """
+    오늘부터 days일치를 SCRAPE_POOL_SIZE개 브라우저에 나눠 동시에 수집.
+    - 첫 구간(오늘 포함)은 기본 드라이버, 나머지 구간은 로그인 세션을 복사한 드라이버가 담당
+    - 각 드라이버는 자기 구간 시작일까지 다음 날짜 버튼으로 이동한 뒤 하루씩 추출/업로드
+    - 복제 드라이버를 만들지 못한 구간은 기본 드라이버가 이어서 순차 처리
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    chunks = _split_offsets(days, SCRAPE_POOL_SIZE if driver else 1)
+    if len(chunks) == 1:
+        _scrape_day_offsets(driver, wait, today, chunks[0], prev_day_map, "main")
+        return
+    home_url = driver.current_url
+
+    def run_clone(idx, offsets):
+        clone = clone_logged_in_driver(driver, home_url)
+        if clone is None:
+            return offsets
+        try:
+            _scrape_day_offsets(clone, WebDriverWait(clone, 30), today, offsets, prev_day_map, f"pool-{idx}")
+            return []
+        finally:
+            safe_quit(clone)
+
+    with ThreadPoolExecutor(max_workers=len(chunks) - 1) as pool:
+        futures = [pool.submit(run_clone, i, c) for i, c in enumerate(chunks[1:], start=1)]
+        pos = _scrape_day_offsets(driver, wait, today, chunks[0], prev_day_map, "main")
+        leftovers = []
+        for f in futures:
+            try:
+                leftovers.extend(f.result())
+            except Exception as e:
+                log_error(f"병렬 수집 작업 실패: {e}")
+    if not leftovers:
+        return
+    if pos is None:
+        for offset in leftovers:
+            date_str = (today + timedelta(days=offset)).strftime("%Y-%m-%d")
+            record_day_result(date_str, status="error", error="복제 드라이버 생성 실패", worker="main")
+        return
+    log_info(f"복제 드라이버 없이 남은 날짜 순차 처리: {len(leftovers)}일")
+    _scrape_day_offsets(driver, wait, today, sorted(leftovers), prev_day_map, "main", pos=pos)
+
+def run_scrape(driver, wait, today=None, mark_running=True):
+    """로그인된(또는 None) 드라이버로 예약표 수집/업로드 1회 실행. 상태는 STATUS_FILE에 기록"""
+    if mark_running:
+        set_status_running()
+    try:
+        today = today or datetime.now()
         prev_day_date = (today - timedelta(days=1)).strftime("%Y-%m-%d")
         prev_day_map = {}
-        process_today_sheet(driver, wait, today, prev_day_date, prev_day_map)
         if DAYS_TO_FETCH > 1:
-            process_next_day_sheet(driver, wait, today, prev_day_map)
+            scrape_days(driver, wait, today, DAYS_TO_FETCH, prev_day_map)
+        else:
+            t0 = time.perf_counter()
+            result = process_today_sheet(driver, wait, today, prev_day_date, prev_day_map)
+            record_day_result(today.strftime("%Y-%m-%d"), status=result, elapsed_sec=round(time.perf_counter() - t0, 2), worker="main")
         set_status_finished()
     except Exception as e:
         log_error(f"전체 실행 오류: {e}")
         traceback.print_exc()
         set_status_error(str(e))
 
-if __name__ == "__main__":
-    main()
+def main():
+    set_status_running()
+    try:
+        log_info("[day.py] 예약표 수집 시작")
+        driver, wait = build_logged_in_driver()
+        # continue main flow even if driver/login failed (process_today_sheet will handle missing driver)
+        run_scrape(driver, wait, mark_running=False)
+    except Exception as e:
+        log_error(f"전체 실행 오류: {e}")
+        traceback.print_exc()
+        set_status_error(str(e))
+
 
 
 def log_dom_diagnostics(driver, date_str, prefix="diag"):
@@ -1175,14 +1979,6 @@ def log_dom_diagnostics(driver, date_str, prefix="diag"):
     except Exception as e:
         log_error(f"log_dom_diagnostics 실패: {e}")
 
-def fetch_sheet_version(date_str):
-    try:
-        r = requests.get(f"{API_BASE}/api/daily-sheet?date={date_str}", timeout=8)
-        if r.ok:
-            data = r.json()
-            return data.get("version", 0)
-    except Exception as e:
-        log_error(f"{date_str} 버전 조회 실패: {e}")
-    return 0
-
 
+if __name__ == "__main__":
+    main()
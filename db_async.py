@@ -0,0 +1,35 @@
+"""
+비동기 DB 세션 (SQLAlchemy asyncio + asyncpg).
+
+- DATABASE_URL(동기용, psycopg2)을 asyncpg 드라이버 URL로 바꿔서 사용
+- ASYNC_DATABASE_URL이 있으면 그 값을 그대로 사용
+- FastAPI async 엔드포인트에서는 Depends(get_async_db)로 받아서
+  이벤트 루프를 막지 않고 DB 작업을 수행
+"""
+import os
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+
+def _to_async_url(url: str) -> str:
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL") or _to_async_url(os.environ.get("DATABASE_URL", ""))
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=int(os.environ.get("ASYNC_DB_POOL_SIZE", "10")),
+    max_overflow=int(os.environ.get("ASYNC_DB_MAX_OVERFLOW", "10")),
+    pool_pre_ping=True,
+)
+
+# commit 후 속성 접근 시 lazy load(=동기 I/O)가 일어나지 않도록 expire_on_commit=False
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
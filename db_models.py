@@ -1,9 +1,9 @@
 from sqlalchemy import (
-    Column, Integer, Text, DateTime, ForeignKey,
-    UniqueConstraint, Boolean, Date
+    Column, Integer, BigInteger, Text, DateTime, ForeignKey,
+    UniqueConstraint, Boolean, Date, Index, Float
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID, ARRAY
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import uuid
 from db import Base
 
@@ -20,6 +20,8 @@ class DailySheet(Base):
     option_cols = Column(JSONB, nullable=True)
     sheet_hash = Column(Text, nullable=True)
     e10 = Column(Boolean, nullable=True)
+    # daily_sheet_changes가 이 version 이후의 변경을 빠짐없이 담고 있음 (NULL이면 로그 없음)
+    changes_since_version = Column(Integer, nullable=True)
 
     # Backwards-compatible aliases for legacy attribute names used elsewhere in the codebase.
     # These map older names (e.g. top_json) to the new columns (top, headers, stats, footer, option_cols).
@@ -90,11 +92,28 @@ class DailySheetRow(Base):
     custom = Column("custom_values", JSONB, nullable=True)
     original = Column("original_values", JSONB, nullable=True)
     history = Column("history", JSONB, nullable=True)
+    # 행 내용 해시(sha256). daily_sheets.sheet_hash는 이 값들의 합 mod 2^256
+    row_hash = Column("row_hash", Text, nullable=True)
 
     __table_args__ = (
         UniqueConstraint("sheet_date", "site", "reservation_date", name="uix_sheet_site_resvdate"),
     )
 
+class DailySheetChange(Base):
+    # 날짜별 행 변경 로그 (delta 조회용). version = 변경이 반영된 시트 버전
+    __tablename__ = "daily_sheet_changes"
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    sheet_date = Column(Date, ForeignKey("daily_sheets.date", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    site = Column(Text, nullable=False)
+    reservation_date = Column(Text, nullable=True)
+    op = Column(Text, nullable=False)            # 'upsert' or 'delete'
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_daily_sheet_changes_date_version", "sheet_date", "version"),
+    )
+
 class MemoQueue(Base):
     __tablename__ = "memo_queue"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -106,12 +125,38 @@ class MemoQueue(Base):
     mode = Column(Text, nullable=False)          # 'append' or 'replace'
     status = Column(Text, nullable=False, default="pending")
     tries = Column(Integer, nullable=False, default=0)
+    # 이 시각 이후에만 워커가 가져감 (실패 시 지수 백오프만큼 뒤로). MEMO_SYNC_MAX_TRIES번 실패하면 status='dead'
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     added_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # 예약별 pending 항목은 하나 → 적재 시 INSERT ... ON CONFLICT로 합침
+        Index("uix_memo_queue_pending_key", "site", "reservation_date", "phone",
+              unique=True, postgresql_where=text("status = 'pending'")),
+        Index("ix_memo_queue_pending_due", "next_attempt_at", postgresql_where=text("status = 'pending'")),
+    )
+
 class MemoSyncFlag(Base):
     __tablename__ = "memo_sync_flag"
     id = Column(Integer, primary_key=True, default=1)
     sync_required = Column(Boolean, nullable=False, default=False)
-    requested_at = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
+    requested_at = Column(DateTime(timezone=True), nullable=True)
+
+class MemoSyncState(Base):
+    # memo_sync_worker 실행 상태 (한 행, id=1). 워커가 UPSERT로 갱신, /api/memo-sync-status가 조회
+    __tablename__ = "memo_sync_state"
+    id = Column(Integer, primary_key=True, default=1)
+    running = Column(Boolean, nullable=False, default=False)
+    listening = Column(Boolean, nullable=False, default=False)
+    processed = Column(BigInteger, nullable=False, default=0)
+    failed = Column(BigInteger, nullable=False, default=0)
+    last_run_started_at = Column(DateTime(timezone=True), nullable=True)
+    last_run_finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_batch_size = Column(Integer, nullable=True)
+    last_batch_seconds = Column(Float, nullable=True)
+    effective_batch_size = Column(Integer, nullable=True)
+    effective_wait_ms = Column(Integer, nullable=True)
+    last_wakeup_notifies = Column(Integer, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
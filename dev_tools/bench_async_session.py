@@ -0,0 +1,156 @@
+"""
+async def 엔드포인트 안의 동기 Session vs AsyncSession — 업로드 중 다른 GET 지연 비교 (DB 서버 없이 실행 가능).
+
+api.py의 예전 update_daily_sheet처럼 "async def 안에서 동기 SQLAlchemy Session으로 큰 시트 쓰기"와
+db_async.get_async_db처럼 "AsyncSession으로 await"를 같은 앱에 나란히 두고,
+큰 업로드를 반복하는 동안 가벼운 async GET(/ping)의 지연을 p50/p95/max(ms)로 출력.
+
+- DB는 임시 SQLite 파일 (동기: sqlite3 드라이버, 비동기: aiosqlite). 실제 운영(Postgres + psycopg2/asyncpg)과
+  드라이버는 다르지만, 측정하려는 것(쓰기 동안 이벤트 루프가 막히는지)은 같은 구조
+- 실제 API/DB로 비교하려면 bench_async_upload.py 사용
+
+    pip install fastapi uvicorn aiosqlite requests
+    python dev_tools/bench_async_session.py --rows 2000 --uploads 10 --pollers 8
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import requests
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import Column, Integer, Text, create_engine, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+
+Base = declarative_base()
+
+
+class BenchRow(Base):
+    __tablename__ = "bench_rows"
+    id = Column(Integer, primary_key=True)
+    sheet = Column(Integer, nullable=False)
+    data = Column(Text, nullable=False)
+
+
+def make_rows(n, salt):
+    return [
+        {"sheet": 1, "data": json.dumps({"사이트": f"B{i:04d}", "고객명": f"고객{i}", "메모": f"bench {salt}"}, ensure_ascii=False)}
+        for i in range(n)
+    ]
+
+
+def build_app(db_path, rows):
+    sync_engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(sync_engine)
+    SyncSessionLocal = sessionmaker(sync_engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    def get_db():
+        db = SyncSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    counter = {"n": 0}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/upload-sync")
+    async def upload_sync(db: Session = Depends(get_db)):
+        # 변경 전 구조: async def 안에서 동기 Session → 쓰는 동안 이벤트 루프 정지
+        counter["n"] += 1
+        db.execute(delete(BenchRow).where(BenchRow.sheet == 1))
+        db.execute(insert(BenchRow), make_rows(rows, counter["n"]))
+        db.commit()
+        return {"ok": True}
+
+    @app.post("/upload-async")
+    async def upload_async(db: AsyncSession = Depends(get_async_db)):
+        # 변경 후 구조: AsyncSession으로 await
+        counter["n"] += 1
+        await db.execute(delete(BenchRow).where(BenchRow.sheet == 1))
+        await db.execute(insert(BenchRow), make_rows(rows, counter["n"]))
+        await db.commit()
+        return {"ok": True}
+
+    return app
+
+
+def poll(base, stop, latencies):
+    s = requests.Session()
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            s.get(f"{base}/ping", timeout=30)
+        except Exception:
+            continue
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+
+def measure(base, pollers, path=None, uploads=0, duration=2.0):
+    stop = threading.Event()
+    latencies = []
+    threads = [threading.Thread(target=poll, args=(base, stop, latencies), daemon=True) for _ in range(pollers)]
+    for t in threads:
+        t.start()
+    upload_ms = []
+    if path:
+        s = requests.Session()
+        for _ in range(uploads):
+            t0 = time.perf_counter()
+            s.post(f"{base}{path}", timeout=120).raise_for_status()
+            upload_ms.append((time.perf_counter() - t0) * 1000)
+    else:
+        time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join(timeout=30)
+    return latencies, upload_ms
+
+
+def summary(label, lat, upload_ms=None):
+    lat = sorted(lat)
+    p95 = lat[int(len(lat) * 0.95) - 1] if lat else 0
+    extra = f" upload median={statistics.median(upload_ms):7.1f}ms" if upload_ms else ""
+    print(f"{label:>16}: n={len(lat):6d} p50={statistics.median(lat):7.1f}ms p95={p95:7.1f}ms max={max(lat):7.1f}ms{extra}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--uploads", type=int, default=10)
+    ap.add_argument("--pollers", type=int, default=8)
+    ap.add_argument("--port", type=int, default=8799)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"), args.rows)
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+        base = f"http://127.0.0.1:{args.port}"
+        print(f"rows={args.rows} uploads={args.uploads} pollers={args.pollers}")
+        summary("baseline", *measure(base, args.pollers))
+        summary("sync Session", *measure(base, args.pollers, "/upload-sync", args.uploads))
+        summary("AsyncSession", *measure(base, args.pollers, "/upload-async", args.uploads))
+        server.should_exit = True
+        time.sleep(0.3)
+
+
+if __name__ == "__main__":
+    main()
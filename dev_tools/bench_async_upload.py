@@ -0,0 +1,120 @@
+"""
+대용량 업로드 중 GET 지연 측정 (async DB 경로 전/후 비교용).
+
+실행 중인 API 서버(API_BASE)에 대해:
+  1) 업로드 없이 GET /api/daily-sheet/meta 지연을 측정 (baseline)
+  2) 큰 시트를 반복 업로드하면서 같은 GET 지연을 측정 (during upload)
+결과를 p50/p95/max(ms)로 출력합니다. 비교하려면 변경 전/후 커밋으로 서버를 띄우고 각각 실행하세요.
+
+    python dev_tools/bench_async_upload.py --rows 2000 --uploads 5 --pollers 8
+
+주의: --date 날짜(기본 2099-01-01)의 시트를 덮어씁니다. 운영 DB에서 실행하지 마세요.
+
+측정 현황: 이 스크립트는 아직 Postgres(psycopg2 → asyncpg) 위의 API에 대해 실행된 적이 없음.
+AsyncSession 전환의 근거는 bench_async_session.py의 SQLite/aiosqlite 대역 수치뿐이고,
+운영 구성에서 GET 지연이 줄어드는지/업로드가 얼마나 느려지는지는 측정되지 않았음.
+Postgres로 변경 전/후 서버를 띄워 이 스크립트를 돌린 뒤 결과를 여기에 기록할 것.
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+import requests
+
+API_BASE = os.environ.get("API_BASE", "http://127.0.0.1:8000")
+
+
+def make_rows(n, date_str, salt):
+    return [
+        {
+            "사이트": f"B{i:04d}",
+            "상태": "체크인",
+            "고객명": f"고객{i}",
+            "연락처": f"010-0000-{i:04d}",
+            "예약 인원": "2",
+            "차량": "1",
+            "예약일": date_str,
+            "현장결제 금액": "0",
+            "선결제 금액": "0",
+            "총 이용료": str(10000 + i),
+            "관리메모": [f"bench {salt}"],
+            "요청사항": "",
+        }
+        for i in range(n)
+    ]
+
+
+def current_version(s, date_str):
+    r = s.get(f"{API_BASE}/api/daily-sheet/meta", params={"date": date_str}, timeout=10)
+    return r.json().get("version", 0) if r.ok else 0
+
+
+def poll(stop, latencies, date_str):
+    s = requests.Session()
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            s.get(f"{API_BASE}/api/daily-sheet/meta", params={"date": date_str}, timeout=30)
+        except Exception:
+            continue
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+
+def measure(date_str, pollers, duration=None, uploads=0, rows=0):
+    stop = threading.Event()
+    latencies = []
+    threads = [threading.Thread(target=poll, args=(stop, latencies, date_str), daemon=True) for _ in range(pollers)]
+    for t in threads:
+        t.start()
+    upload_ms = []
+    if uploads:
+        s = requests.Session()
+        for k in range(uploads):
+            payload = {
+                "date": date_str,
+                "version": current_version(s, date_str),
+                "top": {}, "headers": [], "stats": {}, "optionCols": {},
+                "sheet": make_rows(rows, date_str, f"{time.time()}-{k}"),
+            }
+            t0 = time.perf_counter()
+            r = s.post(f"{API_BASE}/api/update-daily-sheet", json=payload, timeout=120)
+            upload_ms.append((time.perf_counter() - t0) * 1000)
+            if not r.ok:
+                print("upload failed:", r.status_code, r.text[:200])
+    else:
+        time.sleep(duration or 5)
+    stop.set()
+    for t in threads:
+        t.join(timeout=35)
+    return latencies, upload_ms
+
+
+def summary(label, values):
+    if not values:
+        print(f"{label}: no samples")
+        return
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    print(f"{label}: n={len(values)} p50={statistics.median(values):.1f}ms p95={p95:.1f}ms max={values[-1]:.1f}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--date", default="2099-01-01")
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--uploads", type=int, default=5)
+    ap.add_argument("--pollers", type=int, default=8)
+    ap.add_argument("--baseline-seconds", type=float, default=5)
+    args = ap.parse_args()
+
+    base, _ = measure(args.date, args.pollers, duration=args.baseline_seconds)
+    during, upload_ms = measure(args.date, args.pollers, uploads=args.uploads, rows=args.rows)
+    summary("GET meta (idle)", base)
+    summary("GET meta (during upload)", during)
+    summary("POST update-daily-sheet", upload_ms)
+
+
+if __name__ == "__main__":
+    main()
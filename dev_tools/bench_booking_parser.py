@@ -0,0 +1,117 @@
+"""
+booking_parser(오프라인 HTML 파서) 벤치마크 + 회귀 확인.
+
+- 합성 fixture: 예약 N행(+관리메모/요청사항 보조 행)짜리 관리자 페이지 HTML을 만들어 파싱 시간 측정
+  생성한 행과 파싱 결과가 같은지도 검사 (다르면 종료 코드 1)
+- 실제 fixture: log_dom_diagnostics가 저장한 dom_source_*.html / dom_table_sample_*.html을 인자로 주면
+  같은 방식으로 파싱 시간과 행 수를 출력
+
+    python dev_tools/bench_booking_parser.py
+    python dev_tools/bench_booking_parser.py --sizes 10,100,2000 --repeat 20 /app/dom_source_*.html
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from html import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from booking_parser import parse_booking_html  # noqa: E402
+
+
+def make_rows(n):
+    rows = []
+    for i in range(n):
+        rows.append({
+            "사이트": f"A{i:04d}",
+            "상태": ("체크인", "이용중", "체크아웃")[i % 3],
+            "고객명": f"고객{i}",
+            "연락처": f"010-0000-{i:04d}",
+            "예약 인원": str(2 + i % 3),
+            "차량": str(i % 2),
+            "예약일": "9/7 ~ 9/8",
+            "현장결제 금액": "0",
+            "선결제 금액": f"{10000 + i:,}",
+            "총 이용료": f"{10000 + i:,}",
+            "관리메모": [f"메모 {i}", "늦게 도착"] if i % 4 == 0 else [],
+            "요청사항": f"요청 {i}" if i % 5 == 0 else "",
+        })
+    return rows
+
+
+def make_html(rows):
+    """관리자 페이지 구조를 흉내 낸 HTML (사이트 구역 접두어, 상태 div, &nbsp;, 보조 행 포함)"""
+    out = ['<html><head><title>bench</title></head><body><div class="card">',
+           '<table class="table table-bordered table-hover"><thead><tr>',
+           "".join(f"<th>{h}</th>" for h in range(11)),
+           "</tr></thead><tbody>"]
+    for r in rows:
+        out.append(
+            "<tr>"
+            f'<td><span class="zone">A구역</span> &gt; <b>{escape(r["사이트"])}</b></td>'
+            f'<td><div class="badge">{r["상태"]}</div></td>'
+            f'<td>{escape(r["고객명"])}</td><td>{r["연락처"]}</td><td>{r["예약 인원"]}</td>'
+            f'<td>{r["차량"]}</td><td>{r["예약일"]}</td><td>{r["현장결제 금액"]}</td>'
+            f'<td>{r["선결제 금액"]}&nbsp;포함</td><td><button>보기</button></td><td>{r["총 이용료"]}</td>'
+            "</tr>"
+        )
+        if r["관리메모"]:
+            memo = "<br>".join(escape(m) for m in r["관리메모"])
+            out.append(f'<tr class="text-muted"><td></td><td>관리메모</td><td colspan="9">{memo}</td></tr>')
+        if r["요청사항"]:
+            out.append(f'<tr class="text-muted"><td></td><td>요청사항</td><td colspan="9">{escape(r["요청사항"])}</td></tr>')
+    out.append("</tbody></table></div></body></html>")
+    return "\n".join(out)
+
+
+def time_parse(html, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = parse_booking_html(html)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return result, samples
+
+
+def report(label, html, rows, samples):
+    print(f"{label:>32}: rows={rows:5d} html={len(html) / 1024:8.1f}KB "
+          f"median={statistics.median(samples):8.2f}ms min={min(samples):8.2f}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10,100,500,1000,2000")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("files", nargs="*", help="저장된 dom_source_*.html / dom_table_sample_*.html")
+    args = ap.parse_args()
+
+    ok = True
+    for n in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        expected = make_rows(n)
+        html = make_html(expected)
+        (_, parsed), samples = time_parse(html, args.repeat)
+        report(f"synthetic {n}", html, len(parsed), samples)
+        if parsed != expected:
+            ok = False
+            bad = next((i for i, (a, b) in enumerate(zip(parsed, expected)) if a != b), min(len(parsed), len(expected)))
+            print(f"  MISMATCH at row {bad}: parsed={parsed[bad] if bad < len(parsed) else None} "
+                  f"expected={expected[bad] if bad < len(expected) else None}")
+
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        try:
+            (_, parsed), samples = time_parse(html, args.repeat)
+        except ValueError as e:
+            print(f"{os.path.basename(path):>32}: {e}")
+            continue
+        report(os.path.basename(path), html, len(parsed), samples)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+memo_sync_worker 처리기: 로드 + process_items가 없는 memo_sync.py용 상주 스크립트 처리기 (DB 의존 없음).
+
+처리기 규약 (MEMO_SYNC_PROCESSOR="모듈" 또는 "모듈:객체", 기본 memo_sync):
+    open_session() -> session              (선택) 워커 스레드 시작 시 1회
+    process_items(session, items) -> dict  items: [{id, site, reservation_date, customer_name, phone, memo, mode, tries}]
+                                           반환: {id: None(성공) | "오류 메시지"}  (빠진 id는 실패로 처리)
+    close_session(session)                 (선택) 종료 시
+
+process_items가 없으면 ScriptProcessor: memo_sync.py를 `--serve`로 워커 스레드마다 한 번 띄워 두고 배치를 넘김.
+    워커 → 스크립트 (stdin, 배치마다 한 줄):  {"items": [item, ...]}
+    스크립트 → 워커 (stdout, 배치마다 한 줄): MEMO_SYNC_RESULT {"<id>": null | "오류 메시지", ...}
+    그 밖의 stdout/stderr 줄은 그대로 로그. stdin이 닫히면 스크립트는 정리 후 종료
+스크립트는 받은 항목만 처리하고 memo_queue를 직접 읽거나 고치지 않아야 함
+(가져간 항목은 처리 내내 processing → 다른 워커가 다시 가져가지 않고, 결과/백오프/dead는 워커가 반영).
+
+환경 변수:
+    MEMO_SYNC_PROCESSOR        처리기 모듈 (기본 memo_sync)
+    MEMO_SYNC_PATH             memo_sync.py 경로 (스크립트 처리기용)
+    MEMO_SYNC_SCRIPT_TIMEOUT   배치 하나의 응답 대기 상한(초, 기본 300) — 넘으면 스크립트를 죽이고 배치 실패
+"""
+import importlib
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+MEMO_SYNC_PROCESSOR = os.environ.get("MEMO_SYNC_PROCESSOR", "memo_sync")
+MEMO_SYNC_PATH = os.environ.get("MEMO_SYNC_PATH", os.path.join(os.getcwd(), "memo_sync.py"))
+MEMO_SYNC_SCRIPT_TIMEOUT = float(os.environ.get("MEMO_SYNC_SCRIPT_TIMEOUT", "300"))
+
+RESULT_PREFIX = "MEMO_SYNC_RESULT "
+ITEM_FIELDS = ("site", "reservation_date", "customer_name", "phone", "memo", "mode", "tries")
+
+
+class _ScriptSession:
+    """--serve로 띄운 스크립트 하나 + 결과 줄을 받는 큐 (출력은 읽기 스레드가 계속 비움)"""
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.results = queue.Queue()
+        self.reader = threading.Thread(target=self._read, name="memo-sync-script-out", daemon=True)
+        self.reader.start()
+
+    def _read(self):
+        for line in self.proc.stdout:
+            line = line.rstrip("\r\n")
+            if line.startswith(RESULT_PREFIX):
+                self.results.put(line[len(RESULT_PREFIX):])
+            else:
+                logging.info(f"[memo_sync] {line}")
+        # EOF: 스크립트 종료
+        self.results.put(None)
+
+
+class ScriptProcessor:
+    """
+    process_items가 없는 memo_sync.py용 상주 처리기: 워커 스레드마다 `memo_sync.py --serve` 프로세스 하나를 띄워 두고
+    배치를 stdin으로 넘김 → 인터프리터/브라우저 기동은 워커 시작(또는 스크립트가 죽은 뒤) 한 번뿐.
+    스크립트가 죽거나 MEMO_SYNC_SCRIPT_TIMEOUT 안에 결과를 안 주면 예외 → 워커가 배치를 실패로 세고 세션을 다시 염
+    """
+
+    def __init__(self, path=MEMO_SYNC_PATH, timeout=MEMO_SYNC_SCRIPT_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+
+    def open_session(self):
+        env = os.environ.copy()
+        env["PYTHONIOENCODING"] = "utf-8"
+        env["PYTHONUNBUFFERED"] = "1"
+        proc = subprocess.Popen(
+            [sys.executable, self.path, "--serve"],
+            cwd=os.path.dirname(self.path) or os.getcwd(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            env=env,
+        )
+        logging.info(f"[MEMO_SYNC] memo_sync.py --serve 시작 (pid={proc.pid})")
+        return _ScriptSession(proc)
+
+    def process_items(self, session, items):
+        batch = [{"id": it["id"], **{f: it.get(f) for f in ITEM_FIELDS}} for it in items]
+        try:
+            session.proc.stdin.write(json.dumps({"items": batch}, ensure_ascii=False, default=str) + "\n")
+            session.proc.stdin.flush()
+        except OSError as e:
+            raise RuntimeError(f"memo_sync.py에 배치 전달 실패 (종료 코드 {session.proc.poll()}): {e}")
+        try:
+            line = session.results.get(timeout=self.timeout)
+        except queue.Empty:
+            session.proc.kill()
+            raise TimeoutError(f"memo_sync.py 응답 없음 ({self.timeout:.0f}s) → 종료")
+        if line is None:
+            raise RuntimeError(f"memo_sync.py 종료 (코드 {session.proc.wait()})")
+        return {str(k): v for k, v in (json.loads(line) or {}).items()}
+
+    def close_session(self, session):
+        try:
+            session.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            session.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            session.proc.kill()
+            session.proc.wait()
+        session.reader.join(timeout=5)
+
+
+def load_processor(spec=MEMO_SYNC_PROCESSOR):
+    module_name, _, attr = spec.partition(":")
+    try:
+        obj = importlib.import_module(module_name)
+    except ImportError as e:
+        logging.error(f"[MEMO_SYNC] 처리기 모듈 로드 실패({spec}): {e} → memo_sync.py --serve 상주 스크립트 사용")
+        return ScriptProcessor()
+    if attr:
+        obj = getattr(obj, attr)
+    if not hasattr(obj, "process_items"):
+        logging.warning(f"[MEMO_SYNC] {spec}에 process_items 없음 → memo_sync.py --serve 상주 스크립트 사용")
+        return ScriptProcessor()
+    return obj
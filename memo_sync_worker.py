@@ -0,0 +1,492 @@
+"""
+상주 메모 싱크 워커 (memo_queue → Camfit).
+
+    python memo_sync_worker.py
+
+- API는 memo_queue에 적재만 하고, 이 워커가 계속 떠 있으면서 pending 항목을 가져가 처리
+- 가져가기(claim): SELECT ... FOR UPDATE SKIP LOCKED 로 배치를 잠그고 status='processing'으로 바꾼 뒤 바로 커밋
+  → 워커를 여러 개 띄워도 같은 항목을 두 번 처리하지 않고, Camfit 작업 중에는 행 잠금을 잡고 있지 않음
+- 처리 결과는 성공/실패별로 한 번의 UPDATE로 status/tries/completed_at 갱신
+- 같은 예약(site, reservation_date, phone)의 pending 항목은 하나뿐 (API가 적재할 때 합침, uix_memo_queue_pending_key)
+  → 메모를 여러 번 고쳐도 Camfit 작업은 예약마다 한 번. 합쳐져 없어진 항목은 status='coalesced'
+- 처리기(processor)는 워커 스레드마다 한 번 열어 둔 세션(브라우저 등)을 계속 재사용
+- 워커가 죽어서 processing으로 남은 항목은 MEMO_SYNC_LEASE_SECONDS가 지나면 다시 가져감
+- 실패한 항목은 next_attempt_at을 지수 백오프(+지터)만큼 미뤄서 pending으로 되돌림
+  (claim은 next_attempt_at이 지난 항목만) → Camfit 장애 때 같은 항목을 계속 두드리지 않음
+  MEMO_SYNC_MAX_TRIES번 실패하면 dead로 옮기고 더 이상 시도하지 않음
+- 깨우기: API가 memo_queue에 넣을 때 NOTIFY memo_queue → 여기서 LISTEN 후 적응형 디바운스
+  (한동안 조용했으면 바로 처리, 연달아 들어오면 대기 시간을 늘려 모아서 큰 배치로 처리)
+  LISTEN 연결이 끊긴 동안에는 MEMO_SYNC_FALLBACK_POLL_SECONDS 간격 폴링
+- 실행 상태(처리/실패 누계, 마지막 배치, listening 등)는 memo_sync_state 테이블 한 행에 UPSERT
+  → API 프로세스가 몇 개든 같은 값을 조회 (예전 memo_sync_state.json 대체)
+
+처리기: memo_processor.load_processor (규약과 memo_sync.py --serve 상주 스크립트 방식은 memo_processor.py 참고)
+가져간 항목은 처리가 끝날 때까지 processing 그대로 (처리기가 memo_queue를 직접 건드리지 않음).
+
+환경 변수:
+    MEMO_SYNC_WORKERS          워커 스레드 수 (기본 1)
+    MEMO_SYNC_BATCH_SIZE       한 번에 가져갈 항목 수 (기본 20)
+    MEMO_SYNC_MAX_BATCH_SIZE   몰릴 때 늘어나는 배치 상한 (기본 200)
+    MEMO_SYNC_MAX_WAIT         몰릴 때 모으는 최대 대기 시간(초, 기본 2)
+    MEMO_SYNC_IDLE_GAP         이 시간(초) 이상 조용했으면 대기 없이 바로 처리 (기본 1)
+    MEMO_SYNC_POLL_SECONDS     LISTEN 중 안전용 재확인 간격 (기본 30)
+    MEMO_SYNC_FALLBACK_POLL_SECONDS  LISTEN 불가 시 폴링 간격 (기본 0.5)
+    MEMO_SYNC_LEASE_SECONDS    processing 항목 회수 기준 (기본 600)
+    MEMO_SYNC_MAX_TRIES        이 횟수만큼 실패하면 status='dead' (기본 8, /api/memo-queue/requeue-dead로 되살림)
+    MEMO_SYNC_BACKOFF_BASE     첫 재시도 대기(초, 기본 5) — 실패할 때마다 2배
+    MEMO_SYNC_BACKOFF_MAX      재시도 대기 상한(초, 기본 1800)
+    MEMO_SYNC_PROCESSOR / MEMO_SYNC_PATH / MEMO_SYNC_SCRIPT_TIMEOUT  처리기 설정 (memo_processor.py)
+"""
+import logging
+import os
+import select as _select
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+from db import SessionLocal
+from db_models import MemoQueue, MemoSyncState
+from memo_processor import ITEM_FIELDS, load_processor
+
+MEMO_SYNC_WORKERS = int(os.environ.get("MEMO_SYNC_WORKERS", "1"))
+MEMO_SYNC_BATCH_SIZE = int(os.environ.get("MEMO_SYNC_BATCH_SIZE", "20"))
+MEMO_SYNC_MAX_BATCH_SIZE = int(os.environ.get("MEMO_SYNC_MAX_BATCH_SIZE", "200"))
+MEMO_SYNC_MAX_WAIT = float(os.environ.get("MEMO_SYNC_MAX_WAIT", "2"))
+MEMO_SYNC_IDLE_GAP = float(os.environ.get("MEMO_SYNC_IDLE_GAP", "1"))
+MEMO_SYNC_POLL_SECONDS = float(os.environ.get("MEMO_SYNC_POLL_SECONDS", "30"))
+MEMO_SYNC_FALLBACK_POLL_SECONDS = float(os.environ.get("MEMO_SYNC_FALLBACK_POLL_SECONDS", "0.5"))
+MEMO_QUEUE_CHANNEL = os.environ.get("MEMO_QUEUE_CHANNEL", "memo_queue")
+MEMO_SYNC_LEASE_SECONDS = int(os.environ.get("MEMO_SYNC_LEASE_SECONDS", "600"))
+MEMO_SYNC_MAX_TRIES = int(os.environ.get("MEMO_SYNC_MAX_TRIES", "8"))
+MEMO_SYNC_BACKOFF_BASE = float(os.environ.get("MEMO_SYNC_BACKOFF_BASE", "5"))
+MEMO_SYNC_BACKOFF_MAX = float(os.environ.get("MEMO_SYNC_BACKOFF_MAX", "1800"))
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _update_state(increments=None, **changes):
+    """memo_sync_state(id=1) 행을 UPSERT 한 번으로 갱신.
+    changes는 그대로 덮어쓰고, increments(processed/failed 등)는 현재 값에 더함
+    → 워커 프로세스가 여러 개여도 카운터가 서로 덮어쓰지 않음"""
+    increments = increments or {}
+    table = MemoSyncState.__table__
+    now = _utcnow()
+    stmt = pg_insert(table).values(id=1, **changes, **increments, updated_at=now)
+    set_ = {k: stmt.excluded[k] for k in changes}
+    set_.update({k: table.c[k] + v for k, v in increments.items()})
+    set_["updated_at"] = now
+    try:
+        with SessionLocal() as db:
+            db.execute(stmt.on_conflict_do_update(index_elements=["id"], set_=set_))
+            db.commit()
+    except Exception as e:
+        logging.error(f"memo_sync_state 저장 실패: {e}")
+
+
+# ------------------ 같은 예약 항목 합치기 ------------------
+def memo_key(item):
+    return (item["site"], item["reservation_date"], item["phone"])
+
+
+def merge_memo(base_memo, base_mode, memo, mode):
+    """같은 예약에 이어서 들어온 메모 작업을 하나로 → (memo, mode)
+    replace는 앞 내용을 덮어쓰고, append는 줄바꿈으로 이어 붙임 (앞이 replace면 replace 유지)
+    api._enqueue_memo_stmt의 ON CONFLICT 식과 같은 규칙"""
+    if mode == "replace":
+        return memo, "replace"
+    if not memo:
+        return base_memo, base_mode
+    if not base_memo:
+        return memo, base_mode
+    return f"{base_memo}\n{memo}", base_mode
+
+
+def _collapse_claimed(db, items, now):
+    """가져간 배치 안에 같은 예약이 여러 개면(lease 회수 항목 + 새 pending 등) 가장 최근 항목 하나로 합침
+    나머지는 coalesced로 닫음 → 한 배치에서 예약마다 Camfit 작업은 한 번"""
+    groups = {}
+    for it in items:
+        groups.setdefault(memo_key(it), []).append(it)
+    out = []
+    for group in groups.values():
+        head = group[-1]
+        if len(group) > 1:
+            memo, mode = group[0]["memo"], group[0]["mode"]
+            for it in group[1:]:
+                memo, mode = merge_memo(memo, mode, it["memo"], it["mode"])
+            head = {**head, "memo": memo, "mode": mode}
+            db.execute(
+                update(MemoQueue).where(MemoQueue.id == head["id"])
+                .values(memo=memo, mode=mode, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(
+                update(MemoQueue).where(MemoQueue.id.in_([it["id"] for it in group[:-1]]))
+                .values(status="coalesced", completed_at=now, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        out.append(head)
+    out.sort(key=lambda it: it["added_at"])
+    return out
+
+
+# ------------------ 큐 claim / 결과 반영 ------------------
+def claim_batch(db, limit=MEMO_SYNC_BATCH_SIZE):
+    """재시도 시각이 된 pending(또는 lease가 지난 processing) 항목을 잠그고 processing으로 표시 → 항목 dict 목록"""
+    now = _utcnow()
+    due = (
+        select(MemoQueue.id)
+        .where(or_(
+            (MemoQueue.status == "pending") & (MemoQueue.next_attempt_at <= now),
+            (MemoQueue.status == "processing") & (MemoQueue.updated_at < now - timedelta(seconds=MEMO_SYNC_LEASE_SECONDS)),
+        ))
+        .order_by(MemoQueue.added_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        update(MemoQueue)
+        .where(MemoQueue.id.in_(due.scalar_subquery()))
+        .values(status="processing", updated_at=now)
+        .returning(MemoQueue.id, MemoQueue.added_at, *[getattr(MemoQueue, f) for f in ITEM_FIELDS])
+        .execution_options(synchronize_session=False)
+    ).all()
+    items = [{"id": str(r.id), "added_at": r.added_at, **{f: getattr(r, f) for f in ITEM_FIELDS}} for r in rows]
+    items.sort(key=lambda it: it["added_at"])
+    items = _collapse_claimed(db, items, now)
+    db.commit()
+    return items
+
+
+def next_due_seconds(db):
+    """가장 빠른 pending 항목의 재시도까지 남은 초 (없으면 None, 이미 됐으면 0)"""
+    due = db.execute(
+        select(func.min(MemoQueue.next_attempt_at)).where(MemoQueue.status == "pending")
+    ).scalar()
+    if due is None:
+        return None
+    return max(0.0, (due - _utcnow()).total_seconds())
+
+
+def _retry_delay_expr():
+    # 지수 백오프 + 지터: min(상한, base * 2^tries) * [0.5, 1.0)
+    # (SET 안의 tries는 이번 실패를 더하기 전 값 → 첫 실패는 base초 전후)
+    return (
+        func.least(MEMO_SYNC_BACKOFF_MAX, MEMO_SYNC_BACKOFF_BASE * func.power(2, MemoQueue.tries))
+        * (0.5 + func.random() * 0.5)
+    )
+
+
+def requeue_batch(db, ids):
+    """실패한 processing 항목을 다시 pending으로.
+    실패 1회로 세어 재시도 시각을 백오프만큼 미루고, MEMO_SYNC_MAX_TRIES번째 실패면 dead로.
+    처리하는 동안 같은 예약의 pending 항목이 새로 쌓였으면(uix_memo_queue_pending_key) 되돌리는 대신
+    그 항목 앞에 합치고 이쪽은 coalesced로 닫음"""
+    if not ids:
+        return
+    for attempt in range(3):
+        try:
+            now = _utcnow()
+            old = aliased(MemoQueue)
+            merged = {str(r[0]) for r in db.execute(
+                update(MemoQueue)
+                .where(
+                    old.id.in_(ids),
+                    MemoQueue.status == "pending",
+                    MemoQueue.site == old.site,
+                    MemoQueue.reservation_date == old.reservation_date,
+                    MemoQueue.phone == old.phone,
+                )
+                .values(
+                    memo=case(
+                        (or_(MemoQueue.mode == "replace", old.memo == ""), MemoQueue.memo),
+                        (MemoQueue.memo == "", old.memo),
+                        else_=old.memo + "\n" + MemoQueue.memo,
+                    ),
+                    mode=case((MemoQueue.mode == "replace", "replace"), else_=old.mode),
+                    updated_at=now,
+                )
+                .returning(old.id)
+                .execution_options(synchronize_session=False)
+            ).all()}
+            if merged:
+                db.execute(
+                    update(MemoQueue).where(MemoQueue.id.in_(list(merged)))
+                    .values(status="coalesced", completed_at=now, updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            rest = [i for i in ids if i not in merged]
+            dead = []
+            if rest:
+                dead = db.execute(
+                    update(MemoQueue).where(MemoQueue.id.in_(rest))
+                    .values(
+                        status=case((MemoQueue.tries + 1 >= MEMO_SYNC_MAX_TRIES, "dead"), else_="pending"),
+                        tries=MemoQueue.tries + 1,
+                        next_attempt_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, _retry_delay_expr()),
+                        updated_at=now,
+                    )
+                    .returning(MemoQueue.id, MemoQueue.status, MemoQueue.site, MemoQueue.reservation_date)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                dead = [r for r in dead if r.status == "dead"]
+            db.commit()
+            for r in dead:
+                logging.error(f"[MEMO_SYNC] {MEMO_SYNC_MAX_TRIES}회 실패 → dead: {r.site} {r.reservation_date} ({r.id})")
+            return
+        except IntegrityError:
+            # 합친 뒤 되돌리기 전에 API가 같은 예약을 새로 넣음 → 다시 합치기
+            db.rollback()
+            if attempt == 2:
+                raise
+
+
+def complete_batch(db, items, results):
+    """성공 항목은 done (UPDATE 1회), 실패 항목은 requeue_batch로 다시 pending (tries +1)"""
+    now = _utcnow()
+    ok_ids = [it["id"] for it in items if it["id"] in results and results[it["id"]] is None]
+    failed = [it for it in items if it["id"] not in ok_ids]
+    if ok_ids:
+        db.execute(
+            update(MemoQueue).where(MemoQueue.id.in_(ok_ids))
+            .values(status="done", tries=MemoQueue.tries + 1, completed_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    if failed:
+        requeue_batch(db, [it["id"] for it in failed])
+        for it in failed:
+            logging.error(f"[MEMO_SYNC] 실패 {it['site']} {it['reservation_date']}: {results.get(it['id'], '결과 없음')}")
+    return len(ok_ids), len(failed)
+
+
+# ------------------ 워커 ------------------
+class MemoSyncWorker:
+    def __init__(self, name, processor, batch_size=MEMO_SYNC_BATCH_SIZE):
+        self.name = name
+        self.processor = processor
+        self.batch_size = batch_size
+        self.session = None
+        self.stopped = threading.Event()
+        self.wake = threading.Event()
+        self.poll_seconds = MEMO_SYNC_FALLBACK_POLL_SECONDS
+        self.next_due = None  # 백오프 중인 항목이 다음으로 시도 가능해지기까지 남은 초
+
+    def _ensure_session(self):
+        if self.session is None and hasattr(self.processor, "open_session"):
+            self.session = self.processor.open_session()
+
+    def _reset_session(self):
+        if self.session is not None and hasattr(self.processor, "close_session"):
+            try:
+                self.processor.close_session(self.session)
+            except Exception:
+                pass
+        self.session = None
+
+    def run_once(self):
+        """배치 하나 처리. 처리한 항목 수 반환 (0이면 큐가 비어 있음)"""
+        db = SessionLocal()
+        try:
+            items = claim_batch(db, self.batch_size)
+            if not items:
+                self.next_due = next_due_seconds(db)
+                return 0
+            t0 = time.perf_counter()
+            _update_state(running=True, last_run_started_at=_utcnow())
+            try:
+                self._ensure_session()
+                results = self.processor.process_items(self.session, items) or {}
+            except Exception as e:
+                logging.error(f"[MEMO_SYNC] {self.name} 배치 처리 예외: {e}\n{traceback.format_exc()}")
+                results = {it["id"]: str(e) for it in items}
+                # 세션(브라우저)이 망가졌을 수 있으므로 다음 배치에서 새로 염
+                self._reset_session()
+            ok, failed = complete_batch(db, items, results)
+            _update_state(
+                increments={"processed": ok, "failed": failed},
+                running=False,
+                last_run_finished_at=_utcnow(),
+                last_batch_size=ok + failed,
+                last_batch_seconds=round(time.perf_counter() - t0, 3),
+            )
+            logging.info(f"[MEMO_SYNC] {self.name} batch={ok + failed} ok={ok} failed={failed} ({time.perf_counter() - t0:.2f}s)")
+            if ok + failed < self.batch_size:
+                # 큐를 다 비운 짧은 배치 → 키워 둔 배치 크기를 절반씩 기본값으로
+                self.batch_size = max(MEMO_SYNC_BATCH_SIZE, self.batch_size // 2)
+            return ok + failed
+        finally:
+            db.close()
+
+    def run_forever(self):
+        while not self.stopped.is_set():
+            self.wake.clear()
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logging.error(f"[MEMO_SYNC] {self.name} 오류: {e}\n{traceback.format_exc()}")
+                processed = 0
+                self.stopped.wait(5)
+            if not processed:
+                # 지금 처리할 항목 없음: NOTIFY(→ wake), 백오프 중인 항목의 재시도 시각, 안전용 폴링 간격 중 먼저 오는 때까지 대기
+                wait = self.poll_seconds
+                if self.next_due is not None:
+                    wait = min(wait, max(self.next_due, 0.05))
+                self.wake.wait(wait)
+        self._reset_session()
+
+
+# ------------------ LISTEN / 적응형 디바운스 ------------------
+class AdaptiveDebounce:
+    """
+    알림 간격을 보고 대기 시간을 정함.
+    - 직전 알림 후 idle_gap 이상 지났으면 0 (바로 처리)
+    - 연달아 오면 min_wait부터 두 배씩 늘려 max_wait까지 (버스트는 모아서 한 번에)
+    배치 크기도 같이 정함: 버스트면 모인 알림 수까지 키우고, 잦아들면 절반씩 min_batch로 되돌림
+    (조용해지면 on_idle로 바로 min_batch) → 스파이크 한 번 뒤에도 평소엔 작은 배치로 빠르게 처리
+    """
+    def __init__(self, min_wait=0.05, max_wait=MEMO_SYNC_MAX_WAIT, idle_gap=MEMO_SYNC_IDLE_GAP,
+                 min_batch=MEMO_SYNC_BATCH_SIZE, max_batch=MEMO_SYNC_MAX_BATCH_SIZE):
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.idle_gap = idle_gap
+        self.min_batch = min_batch
+        self.max_batch = max(min_batch, max_batch)
+        self.wait = 0.0
+        self.last_event = 0.0
+        self.batch_size = min_batch
+
+    def on_event(self, now=None):
+        now = time.monotonic() if now is None else now
+        if now - self.last_event >= self.idle_gap:
+            self.wait = 0.0
+        else:
+            self.wait = min(self.max_wait, max(self.min_wait, self.wait * 2))
+        self.last_event = now
+        return self.wait
+
+    def batch_for(self, count):
+        if count > self.batch_size:
+            self.batch_size = min(self.max_batch, count)
+        else:
+            self.batch_size = max(self.min_batch, count, self.batch_size // 2)
+        return self.batch_size
+
+    def on_idle(self):
+        self.wait = 0.0
+        self.batch_size = self.min_batch
+        return self.batch_size
+
+
+def _listen_dsn():
+    url = os.environ.get("DATABASE_URL", "")
+    return url.replace("postgresql+psycopg2://", "postgresql://", 1)
+
+
+class QueueWakeup:
+    """NOTIFY memo_queue를 받아 디바운스 후 워커를 깨움 (배치 크기도 모인 알림 수에 맞춰 조정)"""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.debounce = AdaptiveDebounce()
+
+    def _set_listening(self, listening):
+        for w in self.workers:
+            w.poll_seconds = MEMO_SYNC_POLL_SECONDS if listening else MEMO_SYNC_FALLBACK_POLL_SECONDS
+            w.wake.set()
+        _update_state(listening=listening)
+
+    def _drain(self, conn):
+        conn.poll()
+        n = len(conn.notifies)
+        conn.notifies.clear()
+        return n
+
+    def _wake(self, count, wait):
+        batch = self.debounce.batch_for(count)
+        for w in self.workers:
+            w.batch_size = batch
+            w.wake.set()
+        _update_state(effective_batch_size=batch, effective_wait_ms=round(wait * 1000), last_wakeup_notifies=count)
+
+    def run(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(_listen_dsn())
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{MEMO_QUEUE_CHANNEL}"')
+                logging.info(f"[MEMO_SYNC] LISTEN {MEMO_QUEUE_CHANNEL}")
+                self._set_listening(True)
+                while True:
+                    if _select.select([conn], [], [], MEMO_SYNC_POLL_SECONDS) == ([], [], []):
+                        # 한동안 알림 없음 → 배치 크기를 기본값으로
+                        if self.debounce.batch_size != self.debounce.min_batch:
+                            batch = self.debounce.on_idle()
+                            for w in self.workers:
+                                w.batch_size = batch
+                            _update_state(effective_batch_size=batch, effective_wait_ms=0)
+                        continue
+                    count = self._drain(conn)
+                    if not count:
+                        continue
+                    wait = self.debounce.on_event()
+                    deadline = time.monotonic() + wait
+                    # 대기 창 동안 들어온 알림도 같은 배치로 모음
+                    while True:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        if _select.select([conn], [], [], remaining) != ([], [], []):
+                            got = self._drain(conn)
+                            if got:
+                                count += got
+                                self.debounce.on_event()
+                    self._wake(count, wait)
+            except Exception as e:
+                logging.error(f"[MEMO_SYNC] LISTEN 연결 오류 → 폴링으로 대체 후 재연결: {e}")
+                self._set_listening(False)
+                time.sleep(5)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s:%(message)s")
+    processor = load_processor()
+    workers = [MemoSyncWorker(f"memo-worker-{i}", processor) for i in range(max(1, MEMO_SYNC_WORKERS))]
+    # 이전 실행이 비정상 종료됐으면 running/listening이 true로 남아 있을 수 있음
+    _update_state(running=False, listening=False, effective_batch_size=MEMO_SYNC_BATCH_SIZE, effective_wait_ms=0)
+    threads = [threading.Thread(target=w.run_forever, name=w.name, daemon=True) for w in workers]
+    for t in threads:
+        t.start()
+    threading.Thread(target=QueueWakeup(workers).run, name="memo-listen", daemon=True).start()
+    logging.info(f"[MEMO_SYNC] 워커 {len(workers)}개 시작 (batch={MEMO_SYNC_BATCH_SIZE})")
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for w in workers:
+            w.stopped.set()
+        for t in threads:
+            t.join(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+상주 스크래핑 워커 (로그인된 Chrome을 계속 띄워 둠).
+
+    python scrape_worker.py
+
+- 기동 시 한 번만 day.build_logged_in_driver()로 드라이버 생성 + 로그인
+- API(/api/run-day-py)가 로컬 소켓(multiprocessing.connection)으로 작업을 보내면
+  예약 페이지로 다시 이동해서 day.run_scrape()만 실행 → 매 실행의 import/Chrome 기동/로그인 비용 제거
+- 세션이 만료되어 로그인 화면으로 튕기면 그때만 재로그인, 드라이버가 죽었으면 새로 생성
+- 드라이버는 작업 스레드 하나에서만 사용 (Selenium은 스레드 안전하지 않음)
+
+환경 변수:
+    SCRAPE_WORKER_ADDR     기본 127.0.0.1:8765 — 반드시 loopback(127.0.0.1/localhost)에만 열 것
+    SCRAPE_WORKER_AUTHKEY  필수, API와 같은 값 (python -c "import secrets; print(secrets.token_hex(32))")
+
+보안: multiprocessing.connection은 받은 메시지를 pickle로 풀기 때문에 이 소켓에 접속해 인증을 통과하면
+워커 프로세스에서 임의 코드를 실행할 수 있음. 그래서 authkey 기본값은 없고(미설정이면 기동 거부),
+주소는 외부에서 닿지 않는 loopback에만 바인딩해야 함.
+"""
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from multiprocessing.connection import Listener
+
+from selenium.common.exceptions import WebDriverException
+
+import day
+
+
+def worker_address():
+    host, _, port = os.environ.get("SCRAPE_WORKER_ADDR", "127.0.0.1:8765").rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def worker_authkey():
+    """SCRAPE_WORKER_AUTHKEY (미설정이면 None — 공개 저장소에 있는 기본값은 쓰지 않음)"""
+    key = os.environ.get("SCRAPE_WORKER_AUTHKEY")
+    return key.encode("utf-8") if key else None
+
+
+class ScrapeWorker:
+    def __init__(self):
+        self.driver = None
+        self.wait = None
+        self.home_url = None
+        self.jobs = queue.Queue()
+        self.busy = False
+        self.last_job = None
+        self.last_error = None   # 드라이버 기동 실패/작업 스레드 오류 (status()로 노출)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # ------------------ 드라이버/세션 ------------------
+    def _start_driver(self):
+        if self.driver:
+            day.safe_quit(self.driver)
+            self.driver = None
+        t0 = time.perf_counter()
+        self.driver, self.wait = day.build_logged_in_driver()
+        self.home_url = self.driver.current_url if self.driver else None
+        day.log_info(f"[worker] 드라이버 준비 ({time.perf_counter() - t0:.1f}s) home={self.home_url}")
+
+    def ensure_session(self):
+        if self.driver is None:
+            self._start_driver()
+            return
+        try:
+            # 예약 페이지로 다시 이동 (새 데이터 로드)
+            if self.home_url:
+                t0 = time.perf_counter()
+                self.driver.get(self.home_url)
+                day.record_navigation("page_load", (time.perf_counter() - t0) * 1000, **(day.page_load_timing(self.driver) or {}))
+        except WebDriverException as e:
+            day.log_error(f"[worker] 드라이버 응답 없음 → 재생성: {e}")
+            self._start_driver()
+            return
+        if not day._is_logged_in(self.driver):
+            day.log_info("[worker] 세션 만료 감지 → 재로그인")
+            if day.relogin(self.driver, self.wait):
+                self.home_url = self.driver.current_url
+            else:
+                self._start_driver()
+
+    # ------------------ 작업 처리 ------------------
+    def submit(self, job):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return {"ok": False, "status": "dead", "error": self.last_error}
+            if self.busy or not self.jobs.empty():
+                return {"ok": False, "status": "busy"}
+            self.jobs.put(job)
+            return {"ok": True, "status": "queued"}
+
+    def status(self):
+        with self._lock:
+            return {"ok": True, "busy": self.busy, "queued": self.jobs.qsize(), "last_job": self.last_job,
+                    "driver": self.driver is not None, "last_error": self.last_error,
+                    "alive": self._thread is not None and self._thread.is_alive()}
+
+    def _set_error(self, msg):
+        with self._lock:
+            self.last_error = {"at": datetime.utcnow().isoformat(), "error": msg}
+
+    def run_forever(self):
+        try:
+            self._start_driver()
+        except Exception as e:
+            # 첫 작업의 ensure_session에서 다시 시도
+            day.log_error(f"[worker] 드라이버 기동 실패: {e}\n{traceback.format_exc()}")
+            self._set_error(f"드라이버 기동 실패: {e}")
+            self.driver = None
+        while True:
+            try:
+                self._run_job(self.jobs.get())
+            except Exception as e:
+                # 작업 처리 밖에서 난 예외로 스레드가 조용히 죽지 않도록
+                day.log_error(f"[worker] 작업 루프 오류: {e}\n{traceback.format_exc()}")
+                self._set_error(f"작업 루프 오류: {e}")
+                time.sleep(1)
+
+    def _run_job(self, job):
+        with self._lock:
+            self.busy = True
+        started = time.perf_counter()
+        ok = True
+        try:
+            day.set_status_running()
+            self.ensure_session()
+            day.run_scrape(self.driver, self.wait, mark_running=False)
+        except Exception as e:
+            ok = False
+            day.log_error(f"[worker] 작업 실패: {e}\n{traceback.format_exc()}")
+            day.set_status_error(str(e))
+            self._set_error(f"작업 실패: {e}")
+        finally:
+            with self._lock:
+                self.busy = False
+                self.last_job = {
+                    "finished_at": datetime.utcnow().isoformat(),
+                    "elapsed_sec": round(time.perf_counter() - started, 2),
+                    "ok": ok,
+                }
+
+    # ------------------ 로컬 소켓 ------------------
+    def serve(self):
+        authkey = worker_authkey()
+        if not authkey:
+            day.log_error("[worker] SCRAPE_WORKER_AUTHKEY 미설정 → 기동 거부 (API와 같은 임의 값을 설정할 것)")
+            sys.exit(2)
+        host, _ = worker_address()
+        if host not in LOOPBACK_HOSTS:
+            day.log_error(f"[worker] 경고: {host}에 바인딩 — 이 소켓은 loopback에만 열어야 함")
+        self._thread = threading.Thread(target=self.run_forever, name="scrape-job", daemon=True)
+        self._thread.start()
+        with Listener(worker_address(), authkey=authkey) as listener:
+            day.log_info(f"[worker] listening on {worker_address()}")
+            while True:
+                try:
+                    with listener.accept() as conn:
+                        msg = conn.recv() or {}
+                        cmd = msg.get("cmd")
+                        if cmd == "scrape":
+                            conn.send(self.submit(msg))
+                        elif cmd == "status":
+                            conn.send(self.status())
+                        else:
+                            conn.send({"ok": False, "error": f"unknown cmd: {cmd}"})
+                except Exception as e:
+                    day.log_error(f"[worker] 요청 처리 실패: {e}")
+
+
+if __name__ == "__main__":
+    ScrapeWorker().serve()
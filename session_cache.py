@@ -0,0 +1,114 @@
+"""
+Camfit 로그인 세션 캐시 (암호화 파일).
+
+- 로그인 직후 쿠키 + localStorage + 로그인 후 URL을 Fernet으로 암호화해 저장
+- 다음 실행에서 새 드라이버에 복원해 보고, 로그인 상태가 확인되면 camfit_login 생략
+- 만료(SESSION_CACHE_TTL)되었거나 계정(CAMFIT_ID)이 바뀌었거나 복호화에 실패하면 없는 것으로 취급
+- cryptography 패키지나 SESSION_CACHE_KEY가 없으면 캐시를 쓰지 않음 (매번 로그인, 기존 동작)
+
+환경 변수:
+    SESSION_CACHE_KEY   Fernet 키 (python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())")
+    SESSION_CACHE_PATH  기본 NAS_FOLDER(없으면 ~/.cache/camfit)/camfit_session.bin
+    SESSION_CACHE_TTL   기본 43200 (초, 12시간)
+"""
+import json
+import logging
+import os
+import time
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # 선택 의존성
+    Fernet = None
+    InvalidToken = Exception
+
+SESSION_CACHE_KEY = os.environ.get("SESSION_CACHE_KEY")
+SESSION_CACHE_TTL = int(os.environ.get("SESSION_CACHE_TTL", str(12 * 3600)))
+SESSION_CACHE_PATH = os.environ.get("SESSION_CACHE_PATH") or os.path.join(
+    os.environ.get("NAS_FOLDER") or os.path.join(os.path.expanduser("~"), ".cache", "camfit"),
+    "camfit_session.bin",
+)
+
+_warned = False
+
+
+def _fernet():
+    global _warned
+    if Fernet is None or not SESSION_CACHE_KEY:
+        if not _warned:
+            _warned = True
+            reason = "cryptography 미설치" if Fernet is None else "SESSION_CACHE_KEY 미설정"
+            logging.info(f"로그인 세션 캐시 사용 안 함: {reason}")
+        return None
+    try:
+        return Fernet(SESSION_CACHE_KEY.encode("utf-8"))
+    except Exception as e:
+        if not _warned:
+            _warned = True
+            logging.error(f"SESSION_CACHE_KEY 형식 오류 → 세션 캐시 사용 안 함: {e}")
+        return None
+
+
+def enabled():
+    return _fernet() is not None
+
+
+def save(cookies, local_storage, home_url, login_id=None):
+    f = _fernet()
+    if f is None:
+        return False
+    data = {
+        "saved_at": time.time(),
+        "login_id": login_id,
+        "home_url": home_url,
+        "cookies": cookies,
+        "local_storage": local_storage,
+    }
+    try:
+        os.makedirs(os.path.dirname(SESSION_CACHE_PATH) or ".", exist_ok=True)
+        tmp = SESSION_CACHE_PATH + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(f.encrypt(json.dumps(data, ensure_ascii=False).encode("utf-8")))
+        try:
+            os.chmod(tmp, 0o600)
+        except OSError:
+            pass
+        os.replace(tmp, SESSION_CACHE_PATH)
+        return True
+    except Exception as e:
+        logging.error(f"로그인 세션 캐시 저장 실패: {e}")
+        return False
+
+
+def load(login_id=None):
+    """유효한 캐시 dict 또는 None (없음/만료/계정 변경/복호화 실패)"""
+    f = _fernet()
+    if f is None or not os.path.exists(SESSION_CACHE_PATH):
+        return None
+    try:
+        with open(SESSION_CACHE_PATH, "rb") as fh:
+            data = json.loads(f.decrypt(fh.read(), ttl=SESSION_CACHE_TTL))
+    except InvalidToken:
+        # 키가 바뀌었거나 TTL 초과 (Fernet 토큰 시각 기준)
+        logging.info("로그인 세션 캐시 만료/무효 → 삭제")
+        clear()
+        return None
+    except Exception as e:
+        logging.error(f"로그인 세션 캐시 읽기 실패: {e}")
+        return None
+    if login_id and data.get("login_id") and data["login_id"] != login_id:
+        logging.info("로그인 세션 캐시 계정 불일치 → 삭제")
+        clear()
+        return None
+    if not data.get("home_url") or not data.get("cookies"):
+        return None
+    return data
+
+
+def clear():
+    try:
+        os.remove(SESSION_CACHE_PATH)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.error(f"로그인 세션 캐시 삭제 실패: {e}")
@@ -0,0 +1,163 @@
+"""
+/api/daily-sheet 응답 캐시 (프로세스 내 LRU).
+
+- 키: (date, version) → 직렬화가 끝난 응답 bytes + ETag 등 헤더
+- date별 최신 version을 따로 기억해서, 캐시 적중 시 DB 조회 없이 바로 응답
+- 저장 경로(update_daily_sheet / patch_single_row / restore)에서 invalidate(date) 호출 필수
+- SHEET_CACHE_MAX_BYTES(기본 32MB) 메모리 예산을 넘으면 가장 오래 안 쓴 항목부터 제거
+- 다른 uvicorn 워커/API 프로세스의 저장은 sheet_invalidation(LISTEN/NOTIFY)이 invalidate(date, version)로 전파
+  리스너가 끊긴 동안에는 get_daily_sheet가 checked_at 기준 TTL마다 version을 재확인
+- 날짜 키는 date_key()로 YYYY-MM-DD로 맞춤 (2025-09-28 / 20250928 / date 객체가 같은 항목)
+"""
+import datetime as _dt
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+SHEET_CACHE_MAX_BYTES = int(os.environ.get("SHEET_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+_BASIC_DATE_RE = re.compile(r"^(\d{4})(\d{2})(\d{2})$")
+
+
+def date_key(date: Any) -> str:
+    """캐시/구독 키: 같은 날짜의 여러 표기를 YYYY-MM-DD 하나로 (해석 못 하면 문자열 그대로)"""
+    if isinstance(date, _dt.datetime):
+        return date.date().isoformat()
+    if isinstance(date, _dt.date):
+        return date.isoformat()
+    text = str(date).strip()
+    m = _BASIC_DATE_RE.match(text)
+    if m:
+        text = "-".join(m.groups())
+    try:
+        return _dt.date.fromisoformat(text).isoformat()
+    except ValueError:
+        return text
+
+
+@dataclass
+class CachedSheet:
+    date: str
+    version: int
+    body: bytes
+    headers: Dict[str, str]
+    # 마지막으로 DB version과 맞는지 확인한 시각 (time.monotonic) — 리스너가 끊긴 동안의 TTL 재확인용
+    checked_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+
+class SheetResponseCache:
+    def __init__(self, max_bytes: int = SHEET_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int], CachedSheet]" = OrderedDict()
+        self._latest: Dict[str, int] = {}
+        # invalidate 때마다 증가 — DB를 읽는 사이에 저장이 끼어들면 put을 버리기 위해 사용
+        self._generations: Dict[str, int] = {}
+        # clear 때마다 증가 (모든 날짜의 generation에 더해짐)
+        self._epoch = 0
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_latest(self, date: Any) -> Optional[CachedSheet]:
+        date = date_key(date)
+        with self._lock:
+            version = self._latest.get(date)
+            entry = self._entries.get((date, version)) if version is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((date, version))
+            self.hits += 1
+            return entry
+
+    def get(self, date: Any, version: int) -> Optional[CachedSheet]:
+        date = date_key(date)
+        with self._lock:
+            entry = self._entries.get((date, version))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((date, version))
+            self.hits += 1
+            return entry
+
+    def generation(self, date: Any) -> int:
+        date = date_key(date)
+        with self._lock:
+            return self._epoch + self._generations.get(date, 0)
+
+    def put(self, date: Any, version: int, body: bytes, headers: Dict[str, str], generation: Optional[int] = None) -> None:
+        if self.max_bytes <= 0 or len(body) > self.max_bytes:
+            return
+        date = date_key(date)
+        entry = CachedSheet(date=date, version=version, body=body, headers=dict(headers))
+        with self._lock:
+            if generation is not None and self._epoch + self._generations.get(date, 0) != generation:
+                # 읽는 도중 저장(invalidate)이 있었음 → 오래된 응답일 수 있으므로 캐시하지 않음
+                return
+            # 같은 날짜의 이전 version은 더 이상 쓸 일이 없으므로 같이 정리
+            self._drop_date_locked(date)
+            self._entries[(date, version)] = entry
+            self._latest[date] = version
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes and self._entries:
+                (old_date, _), old = self._entries.popitem(last=False)
+                self._bytes -= old.size
+                self._latest.pop(old_date, None)
+                self.evictions += 1
+
+    def invalidate(self, date: Any, version: Optional[int] = None) -> None:
+        """date 항목 제거. version을 주면(다른 프로세스의 저장 알림) 그보다 오래된 항목일 때만 제거"""
+        date = date_key(date)
+        with self._lock:
+            self._generations[date] = self._generations.get(date, 0) + 1
+            latest = self._latest.get(date)
+            if version is not None and latest is not None and latest >= version:
+                return
+            if self._drop_date_locked(date):
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._latest.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "dates": sorted(self._latest.keys()),
+            }
+
+    def _drop_date_locked(self, date: str) -> bool:
+        version = self._latest.pop(date, None)
+        if version is None:
+            return False
+        entry = self._entries.pop((date, version), None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return True
+
+
+sheet_cache = SheetResponseCache()
@@ -0,0 +1,74 @@
+"""
+예약표 변경 알림 브로드캐스터 (프로세스 내, SSE용).
+
+- /api/daily-sheet/events?date= 구독자마다 asyncio.Queue 하나
+- 저장 경로에서 publish(date, event) → 해당 날짜 구독자 큐에 전달
+- 동기 엔드포인트(스레드풀)에서도 호출할 수 있도록 call_soon_threadsafe로 전달
+- 느린 구독자의 큐가 가득 차면 가장 오래된 이벤트를 버림 (최신 version만 의미 있음)
+- uvicorn 워커를 여러 개 띄우면 같은 워커에서 일어난 저장만 전달됨
+- 날짜 키는 sheet_cache.date_key로 맞춤 (구독 20250928 ↔ 저장 2025-09-28도 전달)
+"""
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Set
+
+from sheet_cache import date_key
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+@dataclass(eq=False)
+class Subscriber:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+
+
+def _offer(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(event)
+
+
+class SheetEventBroadcaster:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+
+    def subscribe(self, date: Any) -> Subscriber:
+        date = date_key(date)
+        sub = Subscriber(loop=asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(date, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, date: Any, sub: Subscriber) -> None:
+        date = date_key(date)
+        with self._lock:
+            subs = self._subscribers.get(date)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    self._subscribers.pop(date, None)
+
+    def publish(self, date: Any, event: Dict[str, Any]) -> int:
+        date = date_key(date)
+        with self._lock:
+            subs = list(self._subscribers.get(date, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(_offer, sub.queue, event)
+            except RuntimeError:
+                # 루프가 이미 닫힘 (연결 종료 직후)
+                self.unsubscribe(date, sub)
+        return len(subs)
+
+    def subscriber_count(self) -> Dict[str, int]:
+        with self._lock:
+            return {d: len(s) for d, s in self._subscribers.items()}
+
+
+sheet_events = SheetEventBroadcaster()
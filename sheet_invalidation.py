@@ -0,0 +1,111 @@
+"""
+예약표 저장 알림 (Postgres LISTEN/NOTIFY) → 프로세스마다 sheet_cache 무효화.
+
+- 저장 경로는 커밋 전에 같은 트랜잭션에서 notify_sql(date, version) 실행
+  → 커밋될 때만 전달, 롤백되면 사라짐 (memo_queue NOTIFY와 같은 방식)
+- API 프로세스(uvicorn 워커)마다 리스너 스레드 하나가 LISTEN 하다가 받으면 sheet_cache.invalidate(date, version)
+  → 캐시 적중은 DB를 전혀 읽지 않고 응답, 다른 워커의 저장도 바로 반영
+- listening이 False인 동안(시작 전/연결 끊김)은 알림을 놓칠 수 있으므로 get_daily_sheet가
+  SHEET_CACHE_REVALIDATE_SECONDS마다 version을 재확인. 다시 연결되면 캐시를 비움 (끊긴 동안 놓친 알림 대비)
+- API를 거치지 않고 daily_sheets를 직접 고치는 스크립트는 같은 채널로 NOTIFY 해야 바로 반영됨
+
+환경 변수:
+    SHEET_NOTIFY_CHANNEL             채널 이름 (기본 daily_sheet)
+    SHEET_CACHE_REVALIDATE_SECONDS   리스너가 없을 때 캐시 적중 재확인 간격(초, 기본 5)
+"""
+import logging
+import os
+import select as _select
+import threading
+from typing import Any, Optional
+
+from sqlalchemy import text
+
+from sheet_cache import SheetResponseCache, date_key, sheet_cache
+
+SHEET_NOTIFY_CHANNEL = os.environ.get("SHEET_NOTIFY_CHANNEL", "daily_sheet")
+SHEET_CACHE_REVALIDATE_SECONDS = float(os.environ.get("SHEET_CACHE_REVALIDATE_SECONDS", "5"))
+
+
+def notify_sql(date: Any, version: int):
+    return text("SELECT pg_notify(:channel, :payload)").bindparams(
+        channel=SHEET_NOTIFY_CHANNEL, payload=f"{date_key(date)}:{version}"
+    )
+
+
+def _listen_dsn() -> str:
+    url = os.environ.get("DATABASE_URL", "")
+    return url.replace("postgresql+psycopg2://", "postgresql://", 1)
+
+
+class SheetInvalidationListener:
+    def __init__(self, cache: SheetResponseCache, channel: str = SHEET_NOTIFY_CHANNEL):
+        self.cache = cache
+        self.channel = channel
+        self.listening = False
+        self.notifications = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def handle(self, payload: str) -> None:
+        """'YYYY-MM-DD:version' 알림 하나 반영 (형식이 다르면 날짜 전체 무효화)"""
+        date, sep, version = payload.rpartition(":")
+        self.notifications += 1
+        try:
+            self.cache.invalidate(date, int(version))
+        except ValueError:
+            self.cache.invalidate(date if sep else payload)
+
+    def start(self, dsn: Optional[str] = None) -> bool:
+        dsn = dsn or _listen_dsn()
+        if not dsn.startswith(("postgresql://", "postgres://")):
+            logging.warning("[SHEET_CACHE] DATABASE_URL이 Postgres가 아님 → 저장 알림 없이 TTL 재확인만 사용")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(dsn,), name="sheet-invalidation", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _set_listening(self, listening: bool) -> None:
+        if listening:
+            # 연결 전/끊긴 동안 놓친 알림이 있을 수 있음
+            self.cache.clear()
+        self.listening = listening
+
+    def _run(self, dsn: str) -> None:
+        import psycopg2
+        import psycopg2.extensions
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.channel}"')
+                self._set_listening(True)
+                logging.info(f"[SHEET_CACHE] LISTEN {self.channel}")
+                while not self._stop.is_set():
+                    if _select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.handle(conn.notifies.pop(0).payload)
+            except Exception as e:
+                logging.error(f"[SHEET_CACHE] LISTEN 연결 오류 → TTL 재확인으로 대체 후 재연결: {e}")
+                self._stop.wait(5)
+            finally:
+                self.listening = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+sheet_invalidation = SheetInvalidationListener(sheet_cache)
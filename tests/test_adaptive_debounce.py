@@ -0,0 +1,36 @@
+"""memo_sync_worker.AdaptiveDebounce — 버스트 때 대기/배치 키우기, 잦아들면 기본값으로 되돌리기"""
+import memo_sync_worker as worker
+
+
+def test_debounce_wait_grows_during_burst_and_resets_after_gap():
+    d = worker.AdaptiveDebounce(min_wait=0.05, max_wait=0.4, idle_gap=1.0, min_batch=10, max_batch=100)
+    assert d.on_event(now=100.0) == 0.0
+    assert d.on_event(now=100.1) == 0.05
+    assert d.on_event(now=100.2) == 0.1
+    assert d.on_event(now=100.3) == 0.2
+    assert d.on_event(now=100.4) == 0.4
+    assert d.on_event(now=100.5) == 0.4
+    assert d.on_event(now=102.0) == 0.0
+
+
+def test_debounce_batch_size_grows_then_decays_to_min():
+    d = worker.AdaptiveDebounce(min_batch=10, max_batch=100)
+    assert d.batch_for(3) == 10
+    assert d.batch_for(80) == 80
+    assert d.batch_for(500) == 100
+    assert d.batch_for(2) == 50
+    assert d.batch_for(2) == 25
+    assert d.batch_for(30) == 30
+    assert d.batch_for(2) == 15
+    assert d.batch_for(2) == 10
+    assert d.batch_for(2) == 10
+
+
+def test_debounce_on_idle_resets_immediately():
+    d = worker.AdaptiveDebounce(min_batch=10, max_batch=100)
+    d.on_event(now=1.0)
+    d.on_event(now=1.1)
+    d.batch_for(90)
+    assert d.on_idle() == 10
+    assert d.batch_size == 10
+    assert d.wait == 0.0
@@ -0,0 +1,24 @@
+"""api_client 재시도 설정 — 이미 커밋됐을 수 있는 POST/PATCH를 읽기 타임아웃/5xx에서 다시 보내지 않는지"""
+import pytest
+from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError
+
+import api_client
+
+
+def _retry():
+    return api_client.session.get_adapter(api_client.api_url("/")).max_retries
+
+
+def test_upload_is_not_replayed_after_read_timeout():
+    retry = _retry()
+    for method in ("POST", "PATCH"):
+        assert not retry.is_retry(method, 503)
+        with pytest.raises(ReadTimeoutError):
+            retry.increment(method, "/api/update-daily-sheet", error=ReadTimeoutError(None, "/", "read timed out"))
+
+
+def test_get_and_connect_failures_are_retried():
+    retry = _retry()
+    assert retry.is_retry("GET", 503)
+    retry.increment("GET", "/api/daily-sheet/meta", error=ReadTimeoutError(None, "/", "read timed out"))
+    retry.increment("POST", "/api/update-daily-sheet", error=ConnectTimeoutError())
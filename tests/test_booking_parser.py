@@ -0,0 +1,66 @@
+"""
+booking_parser 회귀 테스트.
+
+fixtures/booking_table.html: 관리자 페이지 구조를 흉내 낸 예약표 (범례 표, 사이트 구역 접두어, 애견존, &nbsp;포함,
+<br>/<p> 여러 줄 보조 행, 빈 관리메모, 합계 행)
+fixtures/booking_table_expected.json:
+  js_cells — 같은 표에서 day._TABLE_CELLS_JS(td.innerText)가 돌려주는 값
+  rows     — 예약 row 결과 (day.extract_reservation_data_js와 같아야 함)
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from booking_parser import BOOKING_HEADERS, build_booking_rows, parse_booking_html, parse_table_cells
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture(scope="module")
+def html():
+    return (FIXTURES / "booking_table.html").read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="module")
+def expected():
+    return json.loads((FIXTURES / "booking_table_expected.json").read_text(encoding="utf-8"))
+
+
+def test_html_rows_match_js_path(html, expected):
+    js_rows = build_booking_rows(expected["js_cells"])
+    assert js_rows == expected["rows"]
+    assert build_booking_rows(parse_table_cells(html)) == js_rows
+
+
+def test_cells_match_inner_text(html, expected):
+    cells = parse_table_cells(html)
+    assert [tr["cls"] for tr in cells] == [tr["cls"] for tr in expected["js_cells"]]
+    # &nbsp;만 있는 셀은 innerText가 " " → 파서는 "" (build_booking_rows가 strip하므로 결과는 같음)
+    assert [[c.strip() for c in tr["cells"]] for tr in cells] == \
+        [[c.strip() for c in tr["cells"]] for tr in expected["js_cells"]]
+
+
+def test_parse_booking_html(html, expected):
+    headers, rows = parse_booking_html(html)
+    assert headers == BOOKING_HEADERS
+    assert rows == expected["rows"]
+
+
+def test_picks_bordered_table_over_earlier_table(html):
+    cells = parse_table_cells(html)
+    assert cells[0]["cells"][0] == "A구역 > A01"
+    assert all("범례" not in tr["cells"] for tr in cells)
+
+
+def test_truncated_source_keeps_parsed_rows(html):
+    cut = html.index('<tr class="text-muted">')
+    rows = build_booking_rows(parse_table_cells(html[:cut]))
+    assert [r["사이트"] for r in rows] == ["A01"]
+    assert rows[0]["관리메모"] == []
+
+
+def test_no_table():
+    assert parse_table_cells("<html><body><p>예약이 없습니다</p></body></html>") is None
+    with pytest.raises(ValueError):
+        parse_booking_html("<html></html>")
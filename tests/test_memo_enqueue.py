@@ -0,0 +1,25 @@
+"""api memo_queue 적재 — 한 요청 안의 같은 예약 합치기, pending 항목과 ON CONFLICT 합칠 때 재시도 상태 초기화"""
+import re
+
+from sqlalchemy.dialects import postgresql
+
+import api
+
+
+def _values(memo, mode="append", phone="010-1111-2222"):
+    return api._memo_values("A01", "2025-09-28", "홍길동", phone, memo, mode)
+
+
+def test_coalesce_same_reservation_in_one_request():
+    merged = api._coalesce_memo_values([_values("a"), _values("b", phone="010-9999-0000"), _values("c")])
+    assert [(v["phone"], v["memo"]) for v in merged] == [("010-1111-2222", "a\nc"), ("010-9999-0000", "b")]
+
+
+def test_merge_into_pending_resets_retry_state():
+    compiled = api._enqueue_memo_stmt([_values("새 메모")]).compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "ON CONFLICT (site, reservation_date, phone) WHERE status = " in sql
+    # 백오프 중이거나 dead 직전인 pending 항목에 합쳐져도 새 편집은 바로, 처음부터 시도
+    tries_param = re.search(r"DO UPDATE SET .*\btries = %\((\w+)\)s", sql).group(1)
+    assert compiled.params[tries_param] == 0
+    assert "next_attempt_at = now()" in sql
@@ -0,0 +1,83 @@
+"""memo_processor.ScriptProcessor — memo_sync.py --serve 상주 스크립트와 주고받는 줄 규약"""
+import sys
+import textwrap
+import types
+
+import pytest
+
+from memo_processor import ScriptProcessor, load_processor
+
+FAKE_SERVE = textwrap.dedent('''
+    import json, os, sys
+    assert sys.argv[1:] == ["--serve"]
+    print("브라우저 준비", flush=True)
+    for line in sys.stdin:
+        items = json.loads(line)["items"]
+        if any(it["memo"] == "exit" for it in items):
+            sys.exit(3)
+        if any(it["memo"] == "hang" for it in items):
+            continue
+        print(f"처리 {len(items)}건", flush=True)
+        results = {it["id"]: ("실패" if it["memo"] == "fail" else None) for it in items}
+        results["pid"] = os.getpid()
+        print("MEMO_SYNC_RESULT " + json.dumps(results, ensure_ascii=False), flush=True)
+''')
+
+
+def _item(id_, memo):
+    return {"id": id_, "site": "A01", "reservation_date": "2025-09-28", "customer_name": "홍길동",
+            "phone": "010-1111-2222", "memo": memo, "mode": "append", "tries": 0, "added_at": None}
+
+
+@pytest.fixture
+def processor(tmp_path):
+    script = tmp_path / "memo_sync.py"
+    script.write_text(FAKE_SERVE, encoding="utf-8")
+    return ScriptProcessor(path=str(script), timeout=5)
+
+
+def test_session_stays_warm_across_batches(processor):
+    session = processor.open_session()
+    try:
+        first = processor.process_items(session, [_item("1", "a"), _item("2", "fail")])
+        second = processor.process_items(session, [_item("3", "b")])
+    finally:
+        processor.close_session(session)
+    assert first["1"] is None and first["2"] == "실패"
+    assert second["3"] is None
+    # 배치마다 새로 띄우지 않음
+    assert first["pid"] == second["pid"] == session.proc.pid
+    assert session.proc.returncode == 0
+
+
+def test_script_exit_raises(processor):
+    session = processor.open_session()
+    try:
+        with pytest.raises(RuntimeError, match="종료"):
+            processor.process_items(session, [_item("1", "exit")])
+        with pytest.raises(RuntimeError):
+            processor.process_items(session, [_item("2", "a")])
+    finally:
+        processor.close_session(session)
+
+
+def test_no_answer_times_out_and_kills(processor):
+    processor.timeout = 0.5
+    session = processor.open_session()
+    try:
+        with pytest.raises(TimeoutError):
+            processor.process_items(session, [_item("1", "hang")])
+        assert session.proc.wait(timeout=5) is not None
+    finally:
+        processor.close_session(session)
+
+
+def test_load_processor(monkeypatch):
+    assert isinstance(load_processor("no_such_memo_module"), ScriptProcessor)
+    mod = types.ModuleType("fake_memo_sync")
+    mod.process_items = lambda session, items: {}
+    monkeypatch.setitem(sys.modules, "fake_memo_sync", mod)
+    assert load_processor("fake_memo_sync") is mod
+    legacy = types.ModuleType("legacy_memo_sync")
+    monkeypatch.setitem(sys.modules, "legacy_memo_sync", legacy)
+    assert isinstance(load_processor("legacy_memo_sync"), ScriptProcessor)
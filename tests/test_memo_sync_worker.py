@@ -0,0 +1,52 @@
+"""memo_sync_worker 같은 예약 항목 합치기: merge_memo 규칙, 가져간 배치 안 중복 정리(_collapse_claimed)"""
+from datetime import datetime, timezone
+
+import memo_sync_worker as worker
+
+
+class FakeDB:
+    """execute로 들어온 문장만 모아 두는 가짜 세션"""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+
+
+def _item(id_, memo, mode, phone="010-1111-2222", site="A01", added=0):
+    return {
+        "id": id_, "site": site, "reservation_date": "2025-09-28", "phone": phone,
+        "memo": memo, "mode": mode, "added_at": added,
+    }
+
+
+def test_merge_memo():
+    assert worker.merge_memo("a", "append", "b", "append") == ("a\nb", "append")
+    assert worker.merge_memo("a", "replace", "b", "append") == ("a\nb", "replace")
+    assert worker.merge_memo("a", "append", "b", "replace") == ("b", "replace")
+    assert worker.merge_memo("a", "append", "", "append") == ("a", "append")
+    assert worker.merge_memo("", "append", "b", "append") == ("b", "append")
+
+
+def test_collapse_claimed_merges_same_reservation():
+    now = datetime(2025, 9, 28, tzinfo=timezone.utc)
+    db = FakeDB()
+    items = [
+        _item(1, "첫 메모", "append", added=1),
+        _item(2, "다른 예약", "append", phone="010-9999-0000", added=2),
+        _item(3, "둘째 메모", "append", added=3),
+    ]
+    out = worker._collapse_claimed(db, items, now)
+    assert [it["id"] for it in out] == [2, 3]
+    assert out[1]["memo"] == "첫 메모\n둘째 메모"
+    assert out[1]["mode"] == "append"
+    # 합친 항목 갱신 + 나머지 coalesced 처리
+    assert len(db.statements) == 2
+
+
+def test_collapse_claimed_without_duplicates_is_noop():
+    db = FakeDB()
+    items = [_item(1, "a", "append", added=1), _item(2, "b", "replace", site="B02", added=2)]
+    assert worker._collapse_claimed(db, items, datetime.now(timezone.utc)) == items
+    assert db.statements == []
@@ -0,0 +1,21 @@
+"""day._wait_for_next_day_table_observer — 감시 스크립트가 타임아웃이면 실패 대신 폴링으로 다시 확인하는지"""
+import day
+
+
+def test_observer_timeout_falls_back_to_polling(monkeypatch):
+    calls = []
+    monkeypatch.setattr(day, "wait_for_table_quiet", lambda driver, **kw: {"status": "timeout", "rows": 0})
+    monkeypatch.setattr(
+        day,
+        "_wait_for_next_day_table_poll",
+        lambda driver, target_date, prev_sig: calls.append((target_date, prev_sig)) or ("ok", ["사이트"], []),
+    )
+    result = day._wait_for_next_day_table_observer(object(), "2026-10-19", "prev-sig")
+    assert result == ("ok", ["사이트"], [])
+    assert calls == [("2026-10-19", "prev-sig")]
+
+
+def test_observer_empty_does_not_poll(monkeypatch):
+    monkeypatch.setattr(day, "wait_for_table_quiet", lambda driver, **kw: {"status": "empty", "elapsed_ms": 10})
+    monkeypatch.setattr(day, "_wait_for_next_day_table_poll", lambda *a: ("fail", None, None))
+    assert day._wait_for_next_day_table_observer(object(), "2026-10-19", None) == ("empty", None, None)
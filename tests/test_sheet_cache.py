@@ -0,0 +1,60 @@
+"""sheet_cache + sheet_invalidation — 다른 워커의 저장 알림으로만 무효화되는지 (DB 없이)"""
+from sheet_cache import SheetResponseCache, date_key
+from sheet_invalidation import SheetInvalidationListener, notify_sql
+
+
+def _put(cache, date, version, generation=None):
+    cache.put(date, version, f"v{version}".encode(), {"ETag": f'"{version}"'}, generation=generation)
+
+
+def test_date_key_normalizes():
+    assert date_key("20250928") == date_key("2025-09-28") == "2025-09-28"
+
+
+def test_notification_for_newer_version_drops_entry():
+    cache = SheetResponseCache()
+    listener = SheetInvalidationListener(cache)
+    _put(cache, "2025-09-28", 3)
+    listener.handle("2025-09-28:4")
+    assert cache.get_latest("20250928") is None
+    assert listener.notifications == 1
+
+
+def test_own_notification_keeps_fresh_entry():
+    cache = SheetResponseCache()
+    listener = SheetInvalidationListener(cache)
+    # 이 워커가 저장 후 새 version을 이미 캐시함 → 자기 알림은 무시
+    _put(cache, "2025-09-28", 4)
+    listener.handle("2025-09-28:4")
+    assert cache.get_latest("2025-09-28").version == 4
+
+
+def test_notification_rejects_in_flight_put():
+    cache = SheetResponseCache()
+    listener = SheetInvalidationListener(cache)
+    generation = cache.generation("2025-09-28")
+    listener.handle("2025-09-28:5")
+    _put(cache, "2025-09-28", 4, generation=generation)
+    assert cache.get_latest("2025-09-28") is None
+
+
+def test_reconnect_clear_rejects_in_flight_put():
+    cache = SheetResponseCache()
+    _put(cache, "2025-09-28", 1)
+    generation = cache.generation("2025-09-29")
+    cache.clear()
+    _put(cache, "2025-09-29", 2, generation=generation)
+    assert cache.get_latest("2025-09-28") is None
+    assert cache.get_latest("2025-09-29") is None
+
+
+def test_malformed_payload_invalidates_date():
+    cache = SheetResponseCache()
+    _put(cache, "2025-09-28", 3)
+    SheetInvalidationListener(cache).handle("2025-09-28")
+    assert cache.get_latest("2025-09-28") is None
+
+
+def test_notify_sql_payload():
+    params = notify_sql("20250928", 7).compile().params
+    assert params["payload"] == "2025-09-28:7"
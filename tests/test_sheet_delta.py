@@ -0,0 +1,29 @@
+"""day.compute_sheet_delta — (사이트, 예약일) 키 기준으로 바뀐/새 행과 지운 키만 골라내는지"""
+import day
+
+
+def _row(site, date, memo=()):
+    return {"사이트": site, "예약일": date, "고객명": f"고객 {site}", "관리메모": list(memo)}
+
+
+def test_delta_upserts_changed_and_new_rows():
+    prev = [_row("A01", "9/28 ~ 9/29"), _row("D03", "9/27 ~ 9/29")]
+    new = [_row("A01", "9/28 ~ 9/29", ["늦게 도착"]), _row("D03", "9/27 ~ 9/29"), _row("B12", "9/28 ~ 9/30")]
+    upserted, deleted = day.compute_sheet_delta(prev, new)
+    assert upserted == [new[0], new[2]]
+    assert deleted == []
+
+
+def test_delta_deletes_missing_keys():
+    prev = [_row("A01", "9/28 ~ 9/29"), _row("A01", "9/29 ~ 9/30")]
+    new = [_row("A01", "9/29 ~ 9/30")]
+    upserted, deleted = day.compute_sheet_delta(prev, new)
+    assert upserted == []
+    assert deleted == [{"사이트": "A01", "예약일": "9/28 ~ 9/29"}]
+
+
+def test_delta_unchanged_and_empty():
+    rows = [_row("A01", "9/28 ~ 9/29")]
+    assert day.compute_sheet_delta(rows, [dict(r) for r in rows]) == ([], [])
+    assert day.compute_sheet_delta(None, rows) == (rows, [])
+    assert day.compute_sheet_delta(rows, None) == ([], [{"사이트": "A01", "예약일": "9/28 ~ 9/29"}])
@@ -0,0 +1,41 @@
+"""api의 sheet_hash(행 해시 합) — 증분 갱신이 전체 재계산과 같은지"""
+import api
+
+ROWS = [
+    {"사이트": "A01", "예약일": "9/28 ~ 9/29", "고객명": "홍길동", "관리메모": ["늦게 도착"]},
+    {"사이트": "D03", "예약일": "9/27 ~ 9/29", "고객명": "김철수", "관리메모": []},
+    {"사이트": "B12", "예약일": "9/28 ~ 9/30", "고객명": "이영희", "관리메모": []},
+]
+
+
+def _hashes(rows):
+    return [api.compute_row_hash(r) for r in rows]
+
+
+def test_sheet_hash_ignores_row_order():
+    assert api.compute_sheet_hash(ROWS) == api.compute_sheet_hash(list(reversed(ROWS)))
+    assert api.combine_row_hashes(_hashes(ROWS)) == api.compute_sheet_hash(ROWS)
+
+
+def test_empty_sheet_hash():
+    assert api.compute_sheet_hash([]) == "0" * 64
+
+
+def test_adjust_matches_full_recompute():
+    before = api.compute_sheet_hash(ROWS)
+    changed = {**ROWS[1], "관리메모": ["장작 2묶음"]}
+    added = {"사이트": "C07", "예약일": "9/28 ~ 9/29", "고객명": "박민수", "관리메모": []}
+    after_rows = [ROWS[0], changed, added]
+    adjusted = api.adjust_sheet_hash(
+        before,
+        removed=_hashes([ROWS[1], ROWS[2]]),
+        added=_hashes([changed, added]),
+    )
+    assert adjusted == api.compute_sheet_hash(after_rows)
+
+
+def test_adjust_wraps_modulo():
+    h = api.compute_sheet_hash(ROWS)
+    removed = _hashes(ROWS)
+    assert api.adjust_sheet_hash(h, removed=removed) == "0" * 64
+    assert api.adjust_sheet_hash("0" * 64, added=removed) == h
@@ -0,0 +1,105 @@
+"""api 행 diff/upsert — 예약일이 NULL인 행은 ON CONFLICT가 걸리지 않으므로 id로 갱신되는지 (DB 없이 실행될 SQL만 확인)"""
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+import api
+
+SHEET_DATE = date(2025, 9, 28)
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *args):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+
+class FakeSession:
+    """query()는 주어진 기존 행을 돌려주고, execute()로 들어온 문장을 모아 둠"""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.executed = []
+
+    def query(self, *args):
+        return FakeQuery(self.existing)
+
+    def execute(self, stmt, params=None):
+        self.executed.append((stmt, params))
+
+    def sql(self):
+        return [str(stmt.compile(dialect=postgresql.dialect())) for stmt, _ in self.executed]
+
+
+def _values(site, resv, memo):
+    return api._row_values_from_payload(SHEET_DATE, {"사이트": site, "예약일": resv, "고객명": "홍길동", "관리메모": [memo]})
+
+
+def _existing(id_, values, row_hash=None):
+    return SimpleNamespace(id=id_, site=values["site"], reservation_date=values["reservation_date"],
+                           row_hash=row_hash or values["row_hash"])
+
+
+def _incoming(*values):
+    return {(v["site"], v["reservation_date"]): v for v in values}
+
+
+def test_null_reservation_date_updates_existing_row_by_id():
+    old = _values("A01", None, "예전 메모")
+    new = _values("A01", None, "새 메모")
+    db = FakeSession([_existing(7, old)])
+    counts, changes = api._sync_sheet_rows(db, SHEET_DATE, _incoming(new))
+    assert counts == {"inserted": 0, "updated": 1, "deleted": 0, "unchanged": 0}
+    assert changes == [("upsert", ("A01", None))]
+    [sql] = db.sql()
+    assert sql.startswith("UPDATE daily_sheet_rows")
+    assert "WHERE daily_sheet_rows.id = " in sql
+    assert "ON CONFLICT" not in sql
+    assert db.executed[0][0].compile(dialect=postgresql.dialect()).params["id_1"] == 7
+
+
+def test_null_reservation_date_unchanged_row_is_left_alone():
+    row = _values("A01", None, "메모")
+    db = FakeSession([_existing(7, row)])
+    counts, _ = api._sync_sheet_rows(db, SHEET_DATE, _incoming(row))
+    assert counts["unchanged"] == 1
+    assert db.executed == []
+
+
+def test_new_null_reservation_date_row_is_plain_insert():
+    keyed = _values("B02", "2025-09-28", "메모")
+    null_key = _values("A01", None, "메모")
+    db = FakeSession([])
+    counts, _ = api._sync_sheet_rows(db, SHEET_DATE, _incoming(keyed, null_key))
+    assert counts["inserted"] == 2
+    upsert_sql, insert_sql = db.sql()
+    assert "ON CONFLICT ON CONSTRAINT uix_sheet_site_resvdate" in upsert_sql
+    # 속성명(관리메모/people)이 아니라 실제 컬럼 이름으로 나가야 함
+    assert "manage_memo = excluded.manage_memo" in upsert_sql
+    assert "people_raw" in upsert_sql
+    assert "ON CONFLICT" not in insert_sql
+    assert db.executed[1][1] == [api._row_columns(null_key)]
+
+
+def test_duplicate_null_key_rows_are_collapsed():
+    row = _values("A01", None, "메모")
+    db = FakeSession([_existing(9, row), _existing(7, row)])
+    counts, changes = api._sync_sheet_rows(db, SHEET_DATE, _incoming(row))
+    # 가장 오래된 행(id 7)을 남기고 예전 업로드로 중복 삽입된 행은 지움 (키는 남아 있으므로 변경 로그에는 없음)
+    assert counts == {"inserted": 0, "updated": 0, "deleted": 1, "unchanged": 1}
+    assert changes == []
+    [sql] = db.sql()
+    assert sql.startswith("DELETE FROM daily_sheet_rows")
+    assert db.executed[0][0].compile(dialect=postgresql.dialect()).params["id_1"] == [9]
+
+
+def test_row_key_filter_matches_null_with_is_null():
+    sql = str(api._row_key_filter([("A01", "2025-09-28"), ("B02", None)]).compile(dialect=postgresql.dialect()))
+    assert "IN" in sql
+    assert "daily_sheet_rows.reservation_date IS NULL" in sql
@@ -0,0 +1,19 @@
+"""day._top_summary_from_bookings — 예약 JSON 경로에서 화면 없이 상단 요약을 계산하는지"""
+import day
+
+
+def _row(site, status):
+    return {"사이트": site, "상태": status, "예약일": "10/18 ~ 10/19"}
+
+
+def test_summary_from_api_rows(monkeypatch):
+    monkeypatch.setitem(day._site_total, "count", 10)
+    top = day._top_summary_from_bookings("2026-10-18", [_row("A01", "체크인"), _row("A02", "이용중"), _row("A02", "체크아웃"), _row("B01", "")])
+    assert top["display_date"] == "2026-10-18"
+    assert (top["booked_count"], top["total_count"], top["percent"]) == (3, 10, 30)
+    assert top["summary"] == {'체크인':1, '체크아웃':1, '이용중':1, '예약불가':0, '공실':7}
+
+
+def test_summary_unknown_total_falls_back_to_page(monkeypatch):
+    monkeypatch.setitem(day._site_total, "count", 0)
+    assert day._top_summary_from_bookings("2026-10-18", [_row("A01", "체크인")]) is None